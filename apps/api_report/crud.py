@@ -7,11 +7,17 @@
 @Time: 2023/10/24-21:38
 """
 
+import json
+import hashlib
 import datetime
 from typing import List
-from sqlalchemy import func, select, delete
+from collections import Counter
+from sqlalchemy import func, select, delete, insert, update, bindparam
+from sqlalchemy.orm import undefer
 from sqlalchemy.ext.asyncio import AsyncSession
 from apps.api_report import schemas, models
+from tools.read_setting import setting
+from tools.payload_codec import compress_bytes, decompress_json
 
 
 async def create_api_list(db: AsyncSession, data: schemas.ApiReportListInt):
@@ -28,104 +34,618 @@ async def create_api_list(db: AsyncSession, data: schemas.ApiReportListInt):
     return db_data
 
 
-async def get_max_run_number(db: AsyncSession, case_ids: List[int]):
+async def get_api_list(db: AsyncSession, case_id: int, page: int = 1, size: int = 10, cursor: int = None):
     """
-    获取最大的运行编号
+    获取测试报告列表，按id倒序
     :param db:
-    :param case_ids:
+    :param case_id:
+    :param page:
+    :param size:
+    :param cursor: 上一页最后一条的id，传入时按id翻页，忽略page
+    :return:
+    """
+    sql = select(
+        models.ApiReportList
+    ).where(
+        models.ApiReportList.case_id == case_id
+    ).order_by(
+        models.ApiReportList.id.desc()
+    )
+    if cursor is not None:
+        sql = sql.where(models.ApiReportList.id < cursor)
+    else:
+        sql = sql.offset(size * (page - 1))
+
+    result = await db.execute(sql.limit(size))
+    return result.scalars().all()
+
+
+async def create_api_detail(db: AsyncSession, data: List[dict], report_id: int):
+    """
+    创建测试报告详情
+    :param db:
+    :param data:
+    :param report_id:
+    :return:
+    """
+    await bulk_create_api_detail(db=db, data=[(report_id, x) for x in data])
+    await db.commit()
+
+
+async def bulk_create_api_list(db: AsyncSession, data: List[schemas.ApiReportListInt]) -> List[int]:
+    """
+    批量创建测试报告列表，不提交事务
+    :param db:
+    :param data:
+    :return: 按顺序返回报告id
+    """
+    if not data:
+        return []
+    result = await db.execute(
+        insert(models.ApiReportList).returning(models.ApiReportList.id, sort_by_parameter_order=True),
+        [x.dict() for x in data]
+    )
+    return list(result.scalars().all())
+
+
+# 报告详情的字段和默认值
+_DETAIL_FIELDS = tuple((k, v.default) for k, v in schemas.ApiReportDetailInt.__fields__.items())
+# 超过阈值时压缩保存的字段
+_PAYLOAD_FIELDS = ('request_info', 'response_info', 'history')
+
+
+def _pack_detail(row: dict) -> dict:
+    """
+    请求信息、响应信息、历史模板数据序列化后超过阈值时，压缩保存到payload，原字段置空
+    :param row:
+    :return:
+    """
+    raw = json.dumps({k: row[k] for k in _PAYLOAD_FIELDS}, ensure_ascii=False).encode('utf-8')
+    if len(raw) < setting['report_compress']['threshold']:
+        row['payload'] = None
+        return row
+
+    row['payload'] = compress_bytes(raw, level=setting['report_compress']['level'])
+    for k in _PAYLOAD_FIELDS:
+        row[k] = None
+    return row
+
+
+def _detail_summary(row: dict) -> dict:
+    """
+    接口摘要，报告详情列表只读取这一列，不读取请求信息、响应信息
+    :param row:
+    :return:
+    """
+    response = row['response_info'][-1] if row['response_info'] else {}
+    return {
+        'url': (row['request_info'] or {}).get('url'),
+        'method': (row['request_info'] or {}).get('method'),
+        'status_code': response.get('status_code'),
+        'response_time': response.get('response_time'),
+        'request_count': len(row['response_info'] or ()),
+    }
+
+
+def _split_response(row: dict, blobs: dict) -> dict:
+    """
+    响应数据序列化后达到min_size时，按sha256放入blobs，响应信息中只保留其他字段，hash按顺序记录在response_hash
+    :param row:
+    :param blobs: {hash: 序列化后的响应数据}
+    :return:
+    """
+    hashes, response_info = [], []
+    for x in row['response_info'] or []:
+        if not isinstance(x, dict) or 'response' not in x:
+            hashes.append(None)
+            response_info.append(x)
+            continue
+
+        raw = json.dumps(x['response'], ensure_ascii=False).encode('utf-8')
+        if len(raw) < setting['report_blob']['min_size']:
+            hashes.append(None)
+            response_info.append(x)
+            continue
+
+        key = hashlib.sha256(raw).hexdigest()
+        blobs.setdefault(key, raw)
+        hashes.append(key)
+        response_info.append({k: v for k, v in x.items() if k != 'response'})
+
+    row['response_info'] = response_info
+    row['response_hash'] = hashes if any(hashes) else None
+    return row
+
+
+async def save_response_blobs(db: AsyncSession, rows: List[dict], blobs: dict):
+    """
+    保存响应数据：已存在的只增加引用次数，不存在的压缩后写入，不提交事务
+    :param db:
+    :param rows: _split_response处理后的报告详情
+    :param blobs: {hash: 序列化后的响应数据}
+    :return:
+    """
+    refs = Counter(h for x in rows for h in x['response_hash'] or () if h)
+    if not refs:
+        return
+
+    table = models.ApiReportBlob.__table__
+    conn = await db.connection()
+    keys = list(refs)
+    exists = set()
+    for i in range(0, len(keys), 500):
+        exists.update((await conn.execute(
+            select(table.c.hash).where(table.c.hash.in_(keys[i:i + 500]))
+        )).scalars().all())
+
+    if exists:
+        await conn.execute(
+            update(table).where(
+                table.c.hash == bindparam('b_hash')
+            ).values(
+                ref_count=table.c.ref_count + bindparam('b_count'),
+            ),
+            [{'b_hash': k, 'b_count': refs[k]} for k in exists]
+        )
+
+    new = [k for k in keys if k not in exists]
+    if new:
+        await conn.execute(
+            insert(table),
+            [
+                {
+                    'hash': k,
+                    'size': len(blobs[k]),
+                    'ref_count': refs[k],
+                    'data': compress_bytes(blobs[k], level=setting['report_compress']['level']),
+                } for k in new
+            ]
+        )
+
+
+async def release_response_blobs(db: AsyncSession, report_ids: List[int]):
+    """
+    删除报告详情前减少响应数据的引用次数，不再被引用的删除，不提交事务
+    :param db:
+    :param report_ids: 报告id列表或查询报告id的子查询
     :return:
     """
     result = await db.execute(
         select(
-            models.ApiReportList.case_id, func.max(models.ApiReportList.run_number)
-        ).filter(
-            models.ApiReportList.case_id.in_(case_ids),
-        ).group_by(
-            models.ApiReportList.case_id
+            models.ApiReportDetail.response_hash
+        ).where(
+            models.ApiReportDetail.report_id.in_(report_ids),
+            models.ApiReportDetail.response_hash.isnot(None),
         )
     )
-    return result.all()
+    refs = Counter(h for x in result.scalars().all() for h in x if h)
+    if not refs:
+        return
 
+    table = models.ApiReportBlob.__table__
+    conn = await db.connection()
+    await conn.execute(
+        update(table).where(
+            table.c.hash == bindparam('b_hash')
+        ).values(
+            ref_count=table.c.ref_count - bindparam('b_count'),
+        ),
+        [{'b_hash': k, 'b_count': v} for k, v in refs.items()]
+    )
+    keys = list(refs)
+    for i in range(0, len(keys), 500):
+        await conn.execute(
+            delete(table).where(table.c.hash.in_(keys[i:i + 500]), table.c.ref_count <= 0)
+        )
 
-async def get_api_list(db: AsyncSession, case_id: int, page: int = 1, size: int = 10):
+
+async def get_response_blobs(db: AsyncSession, keys: List[str]) -> dict:
     """
-    获取测试报告列表
+    按hash获取响应数据
     :param db:
-    :param case_id:
+    :param keys:
+    :return: {hash: 响应数据}
+    """
+    blobs = {}
+    for i in range(0, len(keys), 500):
+        result = await db.execute(
+            select(
+                models.ApiReportBlob.hash, models.ApiReportBlob.data
+            ).where(
+                models.ApiReportBlob.hash.in_(keys[i:i + 500])
+            )
+        )
+        blobs.update({k: decompress_json(v) for k, v in result.all()})
+    return blobs
+
+
+async def fill_response_blobs(db: AsyncSession, data: List[dict]):
+    """
+    按response_hash把响应数据放回响应信息中
+    :param db:
+    :param data: unpack_api_detail处理后的报告详情
+    :return:
+    """
+    keys = list({h for x in data for h in x.get('response_hash') or () if h})
+    if not keys:
+        return data
+
+    blobs = await get_response_blobs(db=db, keys=keys)
+    for x in data:
+        for response, key in zip(x['response_info'], x.get('response_hash') or ()):
+            if key:
+                response['response'] = blobs.get(key)
+    return data
+
+
+def unpack_api_detail(db_data: models.ApiReportDetail) -> dict:
+    """
+    报告详情转为dict，有压缩数据时解压
+    :param db_data: 需要加载payload列
+    :return:
+    """
+    data = schemas.ApiReportDetailOut.from_orm(db_data).dict()
+    if db_data.payload:
+        data.update(decompress_json(db_data.payload))
+    data['response_hash'] = db_data.response_hash
+    data['summary'] = db_data.summary
+    return data
+
+
+async def bulk_create_api_detail(db: AsyncSession, data: List[tuple]):
+    """
+    批量创建测试报告详情，不提交事务
+    直接按字段取值后executemany写入，不逐条创建ORM对象，响应数据按内容去重后保存到api_report_blob
+    :param db:
+    :param data: [(报告id, 执行后的接口数据)]
+    :return:
+    """
+    if not data:
+        return
+    blobs = {}
+    rows = []
+    for report_id, x in data:
+        row = {'report_id': report_id, **{k: x[k] if k in x else default for k, default in _DETAIL_FIELDS}}
+        row['summary'] = _detail_summary(row)
+        rows.append(_split_response(row, blobs))
+    await save_response_blobs(db=db, rows=rows, blobs=blobs)
+    await db.execute(insert(models.ApiReportDetail), [_pack_detail(x) for x in rows])
+
+
+async def get_api_detail(db: AsyncSession, report_id: int, page: int = 1, size: int = 10, cursor: int = None):
+    """
+    获取测试报告详情，压缩保存的数据在这里解压，去重保存的响应数据在这里放回
+    :param db:
+    :param report_id:
     :param page:
     :param size:
+    :param cursor: 上一页最后一条的id，传入时按id翻页，忽略page
+    :return:
+    """
+    sql = select(
+        models.ApiReportDetail
+    ).options(
+        undefer(models.ApiReportDetail.payload)
+    ).where(
+        models.ApiReportDetail.report_id == report_id
+    ).order_by(
+        models.ApiReportDetail.id
+    )
+    if cursor is not None:
+        sql = sql.where(models.ApiReportDetail.id > cursor)
+    else:
+        sql = sql.offset(size * (page - 1))
+
+    result = await db.execute(sql.limit(size))
+    return await fill_response_blobs(db=db, data=[unpack_api_detail(x) for x in result.scalars().all()])
+
+
+async def get_api_detail_all(db: AsyncSession, report_id: int):
+    """
+    获取测试报告的全部详情，解压但不放回去重保存的响应数据
+    :param db:
+    :param report_id:
     :return:
     """
     result = await db.execute(
         select(
-            models.ApiReportList
+            models.ApiReportDetail
+        ).options(
+            undefer(models.ApiReportDetail.payload)
         ).where(
-            models.ApiReportList.case_id == case_id
+            models.ApiReportDetail.report_id == report_id
         ).order_by(
-            models.ApiReportList.id.desc()
-        ).offset(size * (page - 1)).limit(size)
+            models.ApiReportDetail.id
+        )
     )
-    return result.scalars().all()
+    return [unpack_api_detail(x) for x in result.scalars().all()]
 
 
-async def create_api_detail(db: AsyncSession, data: List[dict], report_id: int):
+async def get_api_detail_summary(db: AsyncSession, report_id: int, size: int = 100, cursor: int = None):
     """
-    创建测试报告详情
+    获取测试报告详情的摘要，只查询接口信息、结果、接口摘要，按id翻页
     :param db:
-    :param data:
     :param report_id:
+    :param size:
+    :param cursor: 上一页最后一条的id
     :return:
     """
-    for x in data:
-        d = schemas.ApiReportDetailInt(**x)
-        db_data = models.ApiReportDetail(**d.dict(), report_id=report_id)
-        db.add(db_data)
-    await db.commit()
-    # db.refresh(db_data)
-    # return db_data
+    sql = select(
+        models.ApiReportDetail.id,
+        models.ApiReportDetail.report_id,
+        models.ApiReportDetail.api_info,
+        models.ApiReportDetail.report,
+        models.ApiReportDetail.summary,
+        models.ApiReportDetail.created_at,
+    ).where(
+        models.ApiReportDetail.report_id == report_id
+    )
+    if cursor is not None:
+        sql = sql.where(models.ApiReportDetail.id > cursor)
+
+    result = await db.execute(sql.order_by(models.ApiReportDetail.id).limit(size))
+    return result.all()
+
+
+async def get_api_detail_step(db: AsyncSession, detail_id: int):
+    """
+    获取单个接口的完整报告详情
+    :param db:
+    :param detail_id:
+    :return:
+    """
+    result = await db.execute(
+        select(
+            models.ApiReportDetail
+        ).options(
+            undefer(models.ApiReportDetail.payload)
+        ).where(
+            models.ApiReportDetail.id == detail_id
+        )
+    )
+    db_data = result.scalars().first()
+    if not db_data:
+        return None
+    return (await fill_response_blobs(db=db, data=[unpack_api_detail(db_data)]))[0]
+
+
+async def get_case_report_count(db: AsyncSession, case_ids: List[int]) -> int:
+    """
+    用例的报告数
+    :param db:
+    :param case_ids:
+    :return:
+    """
+    result = await db.execute(
+        select(func.count(models.ApiReportList.id)).where(models.ApiReportList.case_id.in_(case_ids))
+    )
+    return result.scalar()
+
+
+# delete_case_reports的步骤数
+DELETE_REPORT_STEPS = 4
+DELETE_CASE_REPORT_STEPS = 7
+
+
+async def delete_case_reports(db: AsyncSession, case_ids: List[int], with_case_data: bool = False, job=None) -> dict:
+    """
+    按用例删除测试报告，每张表一条 DELETE ... WHERE ... IN (子查询)，不提交事务
+    :param db:
+    :param case_ids:
+    :param with_case_data: 同时删除汇总数据和性能测试报告，删除用例时使用
+    :param job: tools.background_job.Job，每删除一张表更新一次进度
+    :return: {表名: 删除的行数}
+    """
+    report_ids = select(models.ApiReportList.id).where(models.ApiReportList.case_id.in_(case_ids))
+    perf_ids = select(models.ApiReportPerf.id).where(models.ApiReportPerf.case_id.in_(case_ids))
+    sql_list = [
+        (models.ApiReportDetail, models.ApiReportDetail.report_id.in_(report_ids)),
+        (models.ApiReportStep, models.ApiReportStep.case_id.in_(case_ids)),
+        (models.ApiReportList, models.ApiReportList.case_id.in_(case_ids)),
+    ]
+    if with_case_data:
+        sql_list += [
+            (models.ApiReportRollup, models.ApiReportRollup.case_id.in_(case_ids)),
+            (models.ApiReportPerfStep, models.ApiReportPerfStep.report_id.in_(perf_ids)),
+            (models.ApiReportPerf, models.ApiReportPerf.case_id.in_(case_ids)),
+        ]
+
+    result = {}
+    await release_response_blobs(db=db, report_ids=report_ids)
+    if job:
+        job.advance(models.ApiReportBlob.__tablename__)
+    for model, where in sql_list:
+        rows = await db.execute(
+            delete(model).where(where).execution_options(synchronize_session=False)
+        )
+        result[model.__tablename__] = rows.rowcount
+        if job:
+            job.advance(model.__tablename__, rows.rowcount)
+    return result
+
+
+async def bulk_create_api_step(db: AsyncSession, data: List[dict]):
+    """
+    批量写入接口耗时，不提交事务
+    :param db:
+    :param data: [{case_id, number, run_number, report_id, ts, host, status, status_code, response_time}]
+    :return:
+    """
+    if not data:
+        return
+    await db.execute(insert(models.ApiReportStep), data)
+
+
+async def get_api_step(
+        db: AsyncSession,
+        case_id: int = None,
+        number: int = None,
+        start_ts: float = None,
+        limit: int = None,
+):
+    """
+    获取接口耗时，按用例、接口序号、运行编号排序，limit按每条用例的最近的运行编号截取
+    :param db:
+    :param case_id:
+    :param number:
+    :param start_ts: 开始时间戳
+    :param limit: 最近的运行次数
+    :return: [(case_id, number, run_number, ts, host, status, status_code, response_time)]
+    """
+    table = models.ApiReportStep
+    sql = select(
+        table.case_id, table.number, table.run_number, table.ts,
+        table.host, table.status, table.status_code, table.response_time,
+    )
+    if case_id is not None:
+        sql = sql.where(table.case_id == case_id)
+    if number is not None:
+        sql = sql.where(table.number == number)
+    if start_ts is not None:
+        sql = sql.where(table.ts >= start_ts)
+    if limit and case_id is not None:
+        run_number = await db.execute(
+            select(
+                table.run_number
+            ).where(
+                table.case_id == case_id
+            ).distinct().order_by(
+                table.run_number.desc()
+            ).offset(limit - 1).limit(1)
+        )
+        start = run_number.scalar()
+        if start is not None:
+            sql = sql.where(table.run_number >= start)
+
+    result = await db.execute(sql.order_by(table.case_id, table.number, table.run_number))
+    return result.all()
+
+
+async def get_api_report_by_run(db: AsyncSession, case_id: int, run_numbers: List[int]):
+    """
+    按运行编号获取测试报告
+    :param db:
+    :param case_id:
+    :param run_numbers:
+    :return:
+    """
+    result = await db.execute(
+        select(
+            models.ApiReportList
+        ).where(
+            models.ApiReportList.case_id == case_id,
+            models.ApiReportList.run_number.in_(run_numbers),
+        )
+    )
+    return result.scalars().all()
+
+
+async def get_rollup_watermark(db: AsyncSession) -> int:
+    """
+    已汇总的最大报告id
+    :param db:
+    :return:
+    """
+    result = await db.execute(select(func.max(models.ApiReportRollup.last_report_id)))
+    return result.scalar() or 0
 
 
-async def get_api_detail(db: AsyncSession, report_id: int, page: int = 1, size: int = 10):
+async def get_api_list_after(db: AsyncSession, report_id: int, size: int = 1000):
     """
-    获取测试报告详情
+    按id顺序获取report_id之后的测试报告列表
     :param db:
     :param report_id:
-    :param page:
     :param size:
     :return:
     """
     result = await db.execute(
         select(
-            models.ApiReportDetail
+            models.ApiReportList
         ).where(
-            models.ApiReportDetail.report_id == report_id
-        ).offset(size * (page - 1)).limit(size)
+            models.ApiReportList.id > report_id
+        ).order_by(
+            models.ApiReportList.id
+        ).limit(size)
     )
     return result.scalars().all()
 
 
-async def delete_api_report(db: AsyncSession, case_id: int):
+async def get_rollup(db: AsyncSession, case_ids: List[int], days: List[datetime.date]):
     """
-    删除测试用例报告
+    获取用例、日期对应的汇总数据
     :param db:
-    :param case_id:
+    :param case_ids:
+    :param days:
     :return:
     """
-    await db.execute(
-        delete(models.ApiReportList).filter(models.ApiReportList.case_id == case_id)
+    result = await db.execute(
+        select(
+            models.ApiReportRollup
+        ).where(
+            models.ApiReportRollup.case_id.in_(case_ids),
+            models.ApiReportRollup.day.in_(days),
+        )
     )
-    await db.commit()
+    return result.scalars().all()
 
 
-async def delete_api_detail(db: AsyncSession, report_id: int):
+async def get_case_rollup(db: AsyncSession, case_id: int, start_day: datetime.date = None):
     """
-    删除报告详情
+    获取用例按日期的汇总数据
     :param db:
-    :param report_id: 
+    :param case_id:
+    :param start_day: 开始日期
     :return:
     """
+    sql = select(models.ApiReportRollup).where(models.ApiReportRollup.case_id == case_id)
+    if start_day:
+        sql = sql.where(models.ApiReportRollup.day >= start_day)
+    result = await db.execute(sql.order_by(models.ApiReportRollup.day))
+    return result.scalars().all()
+
+
+async def get_prune_report_ids(db: AsyncSession, keep_runs: int = None, keep_days: int = None, size: int = 100):
+    """
+    获取需要清理详情的报告id：不在每条用例最近keep_runs次内，且早于keep_days天
+    :param db:
+    :param keep_runs: 为空时不按次数保留
+    :param keep_days: 为空时不按天数保留
+    :param size:
+    :return:
+    """
+    sub = select(
+        models.ApiReportList.id,
+        models.ApiReportList.created_at,
+        models.ApiReportList.pruned,
+        func.row_number().over(
+            partition_by=models.ApiReportList.case_id,
+            order_by=models.ApiReportList.id.desc()
+        ).label('rn')
+    ).subquery()
+
+    sql = select(sub.c.id).where(sub.c.pruned == 0)
+    if keep_runs:
+        sql = sql.where(sub.c.rn > keep_runs)
+    if keep_days:
+        sql = sql.where(sub.c.created_at < datetime.datetime.now() - datetime.timedelta(days=keep_days))
+
+    result = await db.execute(sql.order_by(sub.c.id).limit(size))
+    return result.scalars().all()
+
+
+async def prune_api_detail(db: AsyncSession, report_ids: List[int]):
+    """
+    清理报告详情，只保留报告列表，不提交事务
+    :param db:
+    :param report_ids:
+    :return:
+    """
+    await release_response_blobs(db=db, report_ids=report_ids)
+    await db.execute(
+        delete(models.ApiReportDetail).filter(models.ApiReportDetail.report_id.in_(report_ids))
+    )
     await db.execute(
-        delete(models.ApiReportDetail).filter(models.ApiReportDetail.report_id == report_id)
+        update(models.ApiReportList).where(models.ApiReportList.id.in_(report_ids)).values(pruned=1)
     )
 
 
@@ -144,3 +664,96 @@ async def get_report_count(db: AsyncSession, today: bool = False):
         select(func.count(models.ApiReportList.id))
     )
     return result.scalar()
+
+
+async def create_perf_report(
+        db: AsyncSession,
+        data: schemas.ApiReportPerfInt,
+        steps: List[schemas.ApiReportPerfStepInt]
+):
+    """
+    创建性能测试报告和接口统计
+    :param db:
+    :param data:
+    :param steps:
+    :return:
+    """
+    db_data = models.ApiReportPerf(**data.dict())
+    db.add(db_data)
+    await db.flush()
+    db.add_all([models.ApiReportPerfStep(**x.dict(), report_id=db_data.id) for x in steps])
+    await db.commit()
+    await db.refresh(db_data)
+    return db_data
+
+
+async def get_perf_list(db: AsyncSession, case_id: int, page: int = 1, size: int = 10):
+    """
+    获取性能测试报告列表
+    :param db:
+    :param case_id:
+    :param page:
+    :param size:
+    :return:
+    """
+    result = await db.execute(
+        select(
+            models.ApiReportPerf
+        ).where(
+            models.ApiReportPerf.case_id == case_id
+        ).order_by(
+            models.ApiReportPerf.id.desc()
+        ).offset(size * (page - 1)).limit(size)
+    )
+    return result.scalars().all()
+
+
+async def get_perf_report(db: AsyncSession, report_id: int):
+    """
+    获取性能测试报告
+    :param db:
+    :param report_id:
+    :return:
+    """
+    result = await db.execute(
+        select(models.ApiReportPerf).where(models.ApiReportPerf.id == report_id)
+    )
+    return result.scalars().first()
+
+
+async def get_perf_step(db: AsyncSession, report_ids: List[int], number: int = None):
+    """
+    获取性能测试报告的接口统计
+    :param db:
+    :param report_ids:
+    :param number: 接口序号
+    :return:
+    """
+    sql = select(
+        models.ApiReportPerfStep
+    ).where(
+        models.ApiReportPerfStep.report_id.in_(report_ids)
+    )
+    if number is not None:
+        sql = sql.where(models.ApiReportPerfStep.number == number)
+
+    result = await db.execute(
+        sql.order_by(models.ApiReportPerfStep.report_id, models.ApiReportPerfStep.number)
+    )
+    return result.scalars().all()
+
+
+async def delete_perf_report(db: AsyncSession, report_id: int):
+    """
+    删除性能测试报告
+    :param db:
+    :param report_id:
+    :return:
+    """
+    await db.execute(
+        delete(models.ApiReportPerfStep).filter(models.ApiReportPerfStep.report_id == report_id)
+    )
+    await db.execute(
+        delete(models.ApiReportPerf).filter(models.ApiReportPerf.id == report_id)
+    )
+    await db.commit()
@@ -7,8 +7,9 @@
 @Time: 2023/10/24-21:38
 """
 
+import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey, Integer, JSON
+from sqlalchemy import ForeignKey, Integer, JSON, String, Float, LargeBinary, Date, UniqueConstraint, Index
 from apps.base_model import Base
 
 
@@ -25,6 +26,7 @@ class ApiReportList(Base):
     fail_stop: Mapped[int] = mapped_column(Integer, comment='失败停止')
     result: Mapped[dict] = mapped_column(JSON, comment='结果')
     time: Mapped[dict] = mapped_column(JSON, comment='耗时')
+    pruned: Mapped[int] = mapped_column(Integer, default=0, comment='报告详情已按保留策略清理')
 
 
 class ApiReportDetail(Base):
@@ -44,3 +46,98 @@ class ApiReportDetail(Base):
     check: Mapped[dict] = mapped_column(JSON, comment='预期校验信息')
     jsonpath_info: Mapped[list] = mapped_column(JSON, comment='jsonpath信息')
     other_info: Mapped[dict] = mapped_column(JSON, comment='其他信息')
+    payload: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, comment='压缩后的请求信息、响应信息、历史模板数据'
+    )
+    summary: Mapped[dict] = mapped_column(
+        JSON(none_as_null=True), nullable=True, comment='接口摘要：请求地址、请求方法、状态码、响应耗时'
+    )
+    response_hash: Mapped[list] = mapped_column(
+        JSON(none_as_null=True), nullable=True, comment='响应信息中每次响应数据的hash，数据保存在api_report_blob'
+    )
+
+
+class ApiReportStep(Base):
+    """
+    每次执行的接口耗时，只追加，用于查询单个接口的耗时趋势
+    """
+    __tablename__ = 'api_report_step'
+    __table_args__ = (Index('ix_api_report_step_case_number_run', 'case_id', 'number', 'run_number'),)
+
+    case_id: Mapped[int] = mapped_column(Integer, comment='用例id')
+    number: Mapped[int] = mapped_column(Integer, comment='接口序号')
+    run_number: Mapped[int] = mapped_column(Integer, comment='运行编号')
+    report_id: Mapped[int] = mapped_column(Integer, comment='报告id')
+    ts: Mapped[float] = mapped_column(Float, comment='写入时间戳')
+    host: Mapped[str] = mapped_column(String, nullable=True, comment='请求域名')
+    status: Mapped[int] = mapped_column(Integer, comment='结果：成功0、失败1、跳过2')
+    status_code: Mapped[int] = mapped_column(Integer, nullable=True, comment='状态码')
+    response_time: Mapped[float] = mapped_column(Float, nullable=True, comment='响应耗时')
+
+
+class ApiReportRollup(Base):
+    """
+    测试报告按用例、日期汇总，由后台任务增量计算
+    """
+    __tablename__ = 'api_report_rollup'
+    __table_args__ = (UniqueConstraint('case_id', 'day'),)
+
+    case_id: Mapped[int] = mapped_column(Integer, index=True, comment='用例id')
+    day: Mapped[datetime.date] = mapped_column(Date, comment='日期')
+    runs: Mapped[int] = mapped_column(Integer, default=0, comment='执行次数')
+    success: Mapped[int] = mapped_column(Integer, default=0, comment='成功次数')
+    fail: Mapped[int] = mapped_column(Integer, default=0, comment='失败次数')
+    run_api: Mapped[int] = mapped_column(Integer, default=0, comment='执行的接口数')
+    fail_api: Mapped[int] = mapped_column(Integer, default=0, comment='失败的接口数')
+    total_time: Mapped[float] = mapped_column(Float, default=0, comment='接口耗时合计')
+    max_total_time: Mapped[float] = mapped_column(Float, default=0, comment='单次执行的最大耗时')
+    max_api_time: Mapped[float] = mapped_column(Float, default=0, comment='接口最大耗时')
+    last_report_id: Mapped[int] = mapped_column(Integer, default=0, comment='已汇总的最大报告id')
+
+
+class ApiReportBlob(Base):
+    """
+    测试报告的响应数据，按内容hash去重，多个报告详情共用
+    """
+    __tablename__ = 'api_report_blob'
+
+    hash: Mapped[str] = mapped_column(String(64), unique=True, index=True, comment='sha256')
+    size: Mapped[int] = mapped_column(Integer, comment='压缩前的字节数')
+    ref_count: Mapped[int] = mapped_column(Integer, comment='引用次数')
+    data: Mapped[bytes] = mapped_column(LargeBinary, comment='压缩后的响应数据')
+
+
+class ApiReportPerf(Base):
+    """
+    性能测试报告
+    """
+    __tablename__ = 'api_report_perf'
+
+    case_id: Mapped[int] = mapped_column(Integer, ForeignKey('test_case.id'), index=True, comment='用例id')
+    run_id: Mapped[str] = mapped_column(String, index=True, comment='运行id')
+    mode: Mapped[str] = mapped_column(String, comment='压测模式')
+    status: Mapped[str] = mapped_column(String, comment='运行状态')
+    message: Mapped[str] = mapped_column(String, nullable=True, comment='异常信息')
+    config: Mapped[dict] = mapped_column(JSON, comment='压测参数')
+    start_time: Mapped[float] = mapped_column(Float, nullable=True, comment='开始时间戳')
+    end_time: Mapped[float] = mapped_column(Float, nullable=True, comment='结束时间戳')
+    elapsed: Mapped[float] = mapped_column(Float, comment='运行时长')
+    result: Mapped[dict] = mapped_column(JSON, comment='结果')
+    generator: Mapped[dict] = mapped_column(JSON, comment='施压端统计')
+    seconds: Mapped[dict] = mapped_column(JSON, comment='按秒统计，按列存储')
+
+
+class ApiReportPerfStep(Base):
+    """
+    性能测试报告的接口统计
+    """
+    __tablename__ = 'api_report_perf_step'
+
+    report_id: Mapped[int] = mapped_column(Integer, ForeignKey('api_report_perf.id'), index=True, comment='报告id')
+    number: Mapped[int] = mapped_column(Integer, comment='接口序号')
+    path: Mapped[str] = mapped_column(String, comment='接口路径')
+    method: Mapped[str] = mapped_column(String, comment='请求方法')
+    result: Mapped[dict] = mapped_column(JSON, comment='结果')
+    time: Mapped[dict] = mapped_column(JSON, comment='耗时')
+    histogram: Mapped[bytes] = mapped_column(LargeBinary, comment='耗时直方图')
+    series: Mapped[dict] = mapped_column(JSON, comment='按秒统计，按列存储')
@@ -8,11 +8,15 @@
 """
 
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from depends import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from apps.api_report import schemas, crud
+from apps.api_report.tool import REPORT_RETENTION, diff_report, delete_reports, delete_reports_job
 from apps import response_code
+from tools.read_setting import setting
+from tools.latency_histogram import LatencyHistogram
+from tools.background_job import BACKGROUND_JOBS
 
 api_report = APIRouter()
 
@@ -26,42 +30,207 @@ async def report_list(
         case_id: int,
         page: int = 1,
         size: int = 10,
+        cursor: int = None,
         db: AsyncSession = Depends(get_db)
 ):
-    return await crud.get_api_list(db=db, case_id=case_id, page=page, size=size)
+    """
+    cursor传上一页最后一条的id时按id翻页，忽略page
+    """
+    return await crud.get_api_list(db=db, case_id=case_id, page=page, size=size, cursor=cursor)
 
 
 @api_report.get(
     '/detail/{report_id}',
-    name='查看用例的报告详情'
+    name='查看用例的报告详情',
+    response_model=List[schemas.ApiReportDetailOut]
 )
 async def report_detail(
         report_id: int,
         page: int = 1,
         size: int = 10,
+        cursor: int = None,
         db: AsyncSession = Depends(get_db)
 ):
-    return await crud.get_api_detail(db=db, report_id=report_id, page=page, size=size)
+    """
+    cursor传上一页最后一条的id时按id翻页，忽略page
+    """
+    return await crud.get_api_detail(db=db, report_id=report_id, page=page, size=size, cursor=cursor)
+
+
+@api_report.get(
+    '/detail/summary/{report_id}',
+    name='查看用例的报告详情摘要',
+    description='只返回接口信息、结果和耗时，不读取请求、响应数据；cursor传上一页最后一条的id',
+    response_model=List[schemas.ApiReportDetailSummaryOut]
+)
+async def report_detail_summary(
+        report_id: int,
+        size: int = 100,
+        cursor: int = None,
+        db: AsyncSession = Depends(get_db)
+):
+    return await crud.get_api_detail_summary(db=db, report_id=report_id, size=size, cursor=cursor)
+
+
+@api_report.get(
+    '/detail/step/{detail_id}',
+    name='查看单个接口的报告详情',
+    response_model=schemas.ApiReportDetailOut
+)
+async def report_detail_step(
+        detail_id: int,
+        db: AsyncSession = Depends(get_db)
+):
+    data = await crud.get_api_detail_step(db=db, detail_id=detail_id)
+    if not data:
+        return await response_code.resp_400(message='没有这个报告详情')
+    return data
+
+
+@api_report.get(
+    '/diff',
+    name='对比用例两次执行的报告',
+    description='按接口序号对齐，对比结果、状态码、耗时、断言信息和响应数据，run_a为旧报告、run_b为新报告',
+    response_class=response_code.MyJSONResponse,
+)
+async def report_diff(
+        case_id: int,
+        run_a: int,
+        run_b: int,
+        db: AsyncSession = Depends(get_db)
+):
+    reports = {
+        x.run_number: x for x in await crud.get_api_report_by_run(db=db, case_id=case_id, run_numbers=[run_a, run_b])
+    }
+    for run_number in (run_a, run_b):
+        if run_number not in reports:
+            return await response_code.resp_400(message=f'没有运行编号为{run_number}的报告')
+
+    return await response_code.resp_200(data=await diff_report(db=db, report_a=reports[run_a], report_b=reports[run_b]))
 
 
 @api_report.delete(
     '/del/report/{case_id}',
     name='删除用例的报告',
+    description='报告数超过delete_job.report_threshold时在后台删除，返回任务信息，通过/report/job/{job_id}查看进度',
+    response_class=response_code.MyJSONResponse,
 )
 async def del_report(
         case_id: int,
         db: AsyncSession = Depends(get_db)
 ):
-    report_id = await crud.get_api_list(db=db, case_id=case_id)
-    if not report_id:
-        return
+    count = await crud.get_case_report_count(db=db, case_ids=[case_id])
+    if not count:
+        return await response_code.resp_200(message='没有报告')
 
-    # 删除报告列表
-    for i in report_id:
-        await crud.delete_api_detail(db=db, report_id=i.id)
-    else:
-        await db.commit()
+    if count <= setting['delete_job']['report_threshold']:
+        await delete_reports(db=db, case_ids=[case_id])
+        return await response_code.resp_200(message='删除成功')
 
-    await crud.delete_api_report(db=db, case_id=case_id)
+    job = BACKGROUND_JOBS.submit(
+        name=f'删除用例{case_id}的{count}个报告',
+        func=lambda x: delete_reports_job(case_ids=[case_id], job=x),
+        total=crud.DELETE_REPORT_STEPS,
+    )
+    return await response_code.resp_200(data=job.info(), message='报告较多，已在后台删除')
 
-    await response_code.resp_200(message='删除成功')
+
+@api_report.get(
+    '/job/{job_id}',
+    name='查看后台任务进度',
+    response_class=response_code.MyJSONResponse,
+)
+async def job_info(job_id: str):
+    job = BACKGROUND_JOBS.get(job_id)
+    if not job:
+        return await response_code.resp_400(message='没有这个任务')
+    return await response_code.resp_200(data=job.info())
+
+
+@api_report.get(
+    '/perf/list/{case_id}',
+    name='查看用例的性能测试报告列表',
+    response_model=List[schemas.ApiReportPerfOut]
+)
+async def perf_report_list(
+        case_id: int,
+        page: int = 1,
+        size: int = 10,
+        db: AsyncSession = Depends(get_db)
+):
+    return await crud.get_perf_list(db=db, case_id=case_id, page=page, size=size)
+
+
+@api_report.get(
+    '/perf/detail/{report_id}',
+    name='查看性能测试报告详情',
+    response_model=schemas.ApiReportPerfDetailOut
+)
+async def perf_report_detail(
+        report_id: int,
+        db: AsyncSession = Depends(get_db)
+):
+    report = await crud.get_perf_report(db=db, report_id=report_id)
+    if not report:
+        return await response_code.resp_400(message='没有这个性能测试报告')
+
+    return {
+        **schemas.ApiReportPerfOut.from_orm(report).dict(),
+        'steps': await crud.get_perf_step(db=db, report_ids=[report_id]),
+    }
+
+
+@api_report.get(
+    '/perf/merge',
+    name='合并多个性能测试报告的接口耗时',
+    description='按接口序号合并耗时直方图，重新计算百分位耗时',
+    response_class=response_code.MyJSONResponse,
+)
+async def perf_report_merge(
+        report_ids: List[int] = Query(...),
+        number: int = None,
+        db: AsyncSession = Depends(get_db)
+):
+    merge = {}
+    for x in await crud.get_perf_step(db=db, report_ids=report_ids, number=number):
+        if x.number not in merge:
+            merge[x.number] = {
+                'number': x.number,
+                'path': x.path,
+                'method': x.method,
+                'report_ids': [],
+                'histogram': LatencyHistogram(),
+            }
+        merge[x.number]['report_ids'].append(x.report_id)
+        merge[x.number]['histogram'].merge(LatencyHistogram.from_bytes(x.histogram))
+
+    return await response_code.resp_200(data=[
+        {**{k: v for k, v in x.items() if k != 'histogram'}, 'time': x['histogram'].summary()}
+        for x in merge.values()
+    ])
+
+
+@api_report.delete(
+    '/perf/del/{report_id}',
+    name='删除性能测试报告',
+    response_class=response_code.MyJSONResponse,
+)
+async def del_perf_report(
+        report_id: int,
+        db: AsyncSession = Depends(get_db)
+):
+    if not await crud.get_perf_report(db=db, report_id=report_id):
+        return await response_code.resp_400(message='没有这个性能测试报告')
+
+    await crud.delete_perf_report(db=db, report_id=report_id)
+    return await response_code.resp_200(message='删除成功')
+
+
+@api_report.post(
+    '/retention/run',
+    name='执行测试报告汇总和清理',
+    description='按保留策略立即执行一次，后台任务也会定时执行',
+    response_class=response_code.MyJSONResponse,
+)
+async def run_report_retention():
+    return await response_code.resp_200(data=await REPORT_RETENTION.run_once())
@@ -7,9 +7,9 @@
 @Time: 2023/10/24-21:38
 """
 
-from datetime import datetime
+from datetime import datetime, date
 from pydantic import BaseModel
-from typing import Union, Optional
+from typing import Union, Optional, List
 
 
 class ReportResult(BaseModel):
@@ -41,6 +41,7 @@ class ApiReportListInt(BaseModel):
 
 class ApiReportListOut(ApiReportListInt):
     id: int
+    pruned: Optional[int] = 0  # 报告详情已按保留策略清理
     created_at: datetime
     updated_at: datetime
 
@@ -67,3 +68,97 @@ class ApiReportDetailOut(ApiReportDetailInt):
 
     created_at: datetime
     updated_at: datetime
+
+
+class ApiReportDetailSummaryOut(BaseModel):
+    id: int
+    report_id: int
+    api_info: Optional[dict] = {}
+    report: Optional[dict] = {}
+    summary: Optional[dict] = {}  # url、method、status_code、response_time、request_count
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class ApiReportRollupOut(BaseModel):
+    case_id: int
+    day: date
+    runs: int
+    success: int
+    fail: int
+    run_api: int
+    fail_api: int
+    total_time: float
+    max_total_time: float
+    max_api_time: float
+    pass_rate: float  # 成功次数/执行次数
+    avg_time: float  # 单次执行的平均耗时
+    avg_api_time: float  # 接口平均耗时
+
+
+class PerfTime(BaseModel):
+    count: int
+    min_time: Union[float, int]
+    max_time: Union[float, int]
+    avg_time: Union[float, int]
+    p50: Union[float, int]
+    p90: Union[float, int]
+    p99: Union[float, int]
+    p999: Union[float, int]
+
+
+class ApiReportPerfInt(BaseModel):
+    case_id: int
+    run_id: str
+    mode: str
+    status: str
+    message: Optional[str] = ''
+    config: dict
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    elapsed: float
+    result: dict
+    generator: dict
+    seconds: dict
+
+    class Config:
+        orm_mode = True
+
+
+class ApiReportPerfOut(ApiReportPerfInt):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class ApiReportPerfStepInt(BaseModel):
+    number: int
+    path: str
+    method: str
+    result: dict
+    time: PerfTime
+    histogram: bytes
+    series: dict
+
+    class Config:
+        orm_mode = True
+
+
+class ApiReportPerfStepOut(BaseModel):
+    id: int
+    report_id: int
+    number: int
+    path: str
+    method: str
+    result: dict
+    time: PerfTime
+    series: dict
+
+    class Config:
+        orm_mode = True
+
+
+class ApiReportPerfDetailOut(ApiReportPerfOut):
+    steps: List[ApiReportPerfStepOut]
@@ -8,4 +8,8 @@
 """
 
 
-from .write_report import write_api_report
\ No newline at end of file
+from .write_report import write_case_reports
+from .report_writer import REPORT_WRITER
+from .report_retention import REPORT_RETENTION
+from .report_diff import diff_report, REPORT_DIFF_CACHE
+from .delete_report import delete_reports, delete_reports_job
@@ -0,0 +1,43 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：delete_report.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/22 11:20
+"""
+
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from tools.database import async_session_local
+from tools.background_job import Job
+from apps.api_report import crud
+
+
+async def delete_reports(db: AsyncSession, case_ids: List[int], job: Job = None) -> dict:
+    """
+    在一个事务中删除用例的测试报告
+    :param db:
+    :param case_ids:
+    :param job:
+    :return: {表名: 删除的行数}
+    """
+    try:
+        result = await crud.delete_case_reports(db=db, case_ids=case_ids, job=job)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return result
+
+
+async def delete_reports_job(case_ids: List[int], job: Job):
+    """
+    后台任务：使用独立的会话删除测试报告
+    :param case_ids:
+    :param job:
+    :return:
+    """
+    async with async_session_local() as db:
+        await delete_reports(db=db, case_ids=case_ids, job=job)
@@ -0,0 +1,160 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：report_diff.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/21 11:05
+"""
+
+import json
+import hashlib
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from tools import hash_diff
+from tools.read_setting import setting
+from apps.api_report import models, crud
+
+
+class ReportDiffCache:
+    """
+    报告对比结果的缓存，报告写入后不再修改，按两份报告的id、创建时间、是否已清理详情缓存，超过maxsize时淘汰最久未使用的
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key: tuple):
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: tuple, value: dict):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+REPORT_DIFF_CACHE = ReportDiffCache(maxsize=setting['report_diff']['cache_size'])
+
+
+def _last_response(detail: dict) -> tuple:
+    """
+    最后一次响应的数据和内容hash，去重保存的响应数据不加载，直接使用保存时的hash
+    :param detail:
+    :return: (hash, 响应数据)，去重保存时响应数据为None
+    """
+    response_info = detail['response_info'] or []
+    if not response_info:
+        return None, None
+
+    hashes = detail.get('response_hash') or []
+    key = hashes[len(response_info) - 1] if len(hashes) == len(response_info) else None
+    if key:
+        return key, None
+
+    body = response_info[-1].get('response')
+    return hashlib.sha256(json.dumps(body, ensure_ascii=False).encode('utf-8')).hexdigest(), body
+
+
+def _report_info(report: models.ApiReportList) -> dict:
+    return {
+        'id': report.id,
+        'run_number': report.run_number,
+        'result': report.result,
+        'time': report.time,
+        'pruned': report.pruned,
+    }
+
+
+async def diff_report(db: AsyncSession, report_a: models.ApiReportList, report_b: models.ApiReportList) -> dict:
+    """
+    对比两次执行的报告：按接口序号对齐，对比结果、状态码、耗时、断言信息、响应数据
+    响应数据的hash相同时直接跳过，其余数据用哈希树对比
+    :param db:
+    :param report_a: 旧报告
+    :param report_b: 新报告
+    :return:
+    """
+    cache_key = (
+        report_a.id, report_a.created_at, report_a.pruned,
+        report_b.id, report_b.created_at, report_b.pruned,
+    )
+    result = REPORT_DIFF_CACHE.get(cache_key)
+    if result is not None:
+        return result
+
+    details_a = {x['api_info'].get('number'): x for x in await crud.get_api_detail_all(db=db, report_id=report_a.id)}
+    details_b = {x['api_info'].get('number'): x for x in await crud.get_api_detail_all(db=db, report_id=report_b.id)}
+
+    # 响应数据不同且去重保存的，一次查询加载
+    responses, load = {}, set()
+    for number in details_a.keys() & details_b.keys():
+        (key_a, body_a), (key_b, body_b) = _last_response(details_a[number]), _last_response(details_b[number])
+        responses[number] = (key_a, body_a, key_b, body_b)
+        if key_a != key_b:
+            load.update(k for k, body in ((key_a, body_a), (key_b, body_b)) if k and body is None)
+    blobs = await crud.get_response_blobs(db=db, keys=list(load)) if load else {}
+
+    steps = []
+    for number in sorted(details_a.keys() | details_b.keys(), key=lambda x: (x is None, x)):
+        a, b = details_a.get(number), details_b.get(number)
+        if a is None or b is None:
+            only = b if a is None else a
+            steps.append({
+                'number': number,
+                'url': (only.get('summary') or {}).get('url'),
+                'only': 'b' if a is None else 'a',
+                'changed': True,
+            })
+            continue
+
+        summary_a, summary_b = a.get('summary') or {}, b.get('summary') or {}
+        time_a, time_b = summary_a.get('response_time'), summary_b.get('response_time')
+        assert_diff = hash_diff(a['assert_info'], b['assert_info'])
+        assert_diff = assert_diff if any(assert_diff.values()) else None
+
+        key_a, body_a, key_b, body_b = responses[number]
+        response_diff = None
+        if key_a != key_b:
+            response_diff = hash_diff(
+                blobs.get(key_a) if body_a is None else body_a,
+                blobs.get(key_b) if body_b is None else body_b,
+            )
+            response_diff = response_diff if any(response_diff.values()) else None
+
+        step = {
+            'number': number,
+            'url': summary_b.get('url') or summary_a.get('url'),
+            'result': [a['report'].get('result'), b['report'].get('result')],
+            'status_code': [summary_a.get('status_code'), summary_b.get('status_code')],
+            'response_time': [time_a, time_b],
+            'time_delta': time_b - time_a if time_a is not None and time_b is not None else None,
+            'assert_info': assert_diff,
+            'response': response_diff,
+        }
+        step['changed'] = bool(
+            step['result'][0] != step['result'][1] or
+            step['status_code'][0] != step['status_code'][1] or
+            assert_diff or response_diff
+        )
+        steps.append(step)
+
+    result = {
+        'run_a': _report_info(report_a),
+        'run_b': _report_info(report_b),
+        'total': len(steps),
+        'changed': sum(x['changed'] for x in steps),
+        'only_a': sum(x.get('only') == 'a' for x in steps),
+        'only_b': sum(x.get('only') == 'b' for x in steps),
+        'steps': steps,
+    }
+    REPORT_DIFF_CACHE.set(cache_key, result)
+    return result
@@ -0,0 +1,179 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：report_retention.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/20 10:15
+"""
+
+import asyncio
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from tools import logger
+from tools.read_setting import setting
+from tools.database import async_session_local
+from apps.api_report import models, crud
+
+
+def _fold(rollup: models.ApiReportRollup, report: models.ApiReportList):
+    """
+    把一条测试报告累加到汇总数据中
+    :param rollup:
+    :param report:
+    :return:
+    """
+    result, time = report.result, report.time
+    rollup.runs += 1
+    rollup.success += result['result'] == 0
+    rollup.fail += result['result'] == 1
+    rollup.run_api += result['run_api']
+    rollup.fail_api += result['fail']
+    rollup.total_time += time['total_time']
+    rollup.max_total_time = max(rollup.max_total_time, time['total_time'])
+    rollup.max_api_time = max(rollup.max_api_time, time['max_time'])
+    rollup.last_report_id = max(rollup.last_report_id, report.id)
+
+
+class ReportRetention:
+    """
+    测试报告的保留策略和汇总，由后台任务定时执行
+    汇总：按报告id增量计算每条用例每天的执行次数、成功率、耗时
+    清理：不在每条用例最近keep_runs次内、且早于keep_days天的报告只保留报告列表，删除报告详情
+    """
+
+    def __init__(
+            self,
+            keep_runs: int = None,
+            keep_days: int = None,
+            interval: int = 3600,
+            batch_size: int = 1000,
+    ):
+        self.keep_runs = keep_runs
+        self.keep_days = keep_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task = None
+        self._lock = None
+
+    async def start(self):
+        """
+        启动后台任务，interval为空时不启动
+        :return:
+        """
+        if not self.interval:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._worker())
+
+    async def _worker(self):
+        while True:
+            try:
+                result = await self.run_once()
+                if result['rollup'] or result['pruned']:
+                    logger.info(f"测试报告汇总{result['rollup']}条，清理详情{result['pruned']}条")
+            except Exception as e:
+                logger.error(f"测试报告汇总、清理失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> dict:
+        """
+        执行一次汇总和清理，汇总在前，清理只删除详情，不影响汇总
+        :return: {'rollup': 汇总的报告数, 'pruned': 清理的报告数}
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            async with async_session_local() as db:
+                rollup = await self.rollup(db=db)
+                pruned = await self.prune(db=db)
+        return {'rollup': rollup, 'pruned': pruned}
+
+    async def rollup(self, db: AsyncSession) -> int:
+        """
+        从上次汇总的位置开始，每批batch_size条报告在一个事务中累加到汇总数据
+        :param db:
+        :return:
+        """
+        count = 0
+        report_id = await crud.get_rollup_watermark(db=db)
+        while True:
+            reports = await crud.get_api_list_after(db=db, report_id=report_id, size=self.batch_size)
+            if not reports:
+                return count
+
+            await self._rollup_batch(db=db, reports=reports)
+            count += len(reports)
+            report_id = reports[-1].id
+
+    @staticmethod
+    async def _rollup_batch(db: AsyncSession, reports: List[models.ApiReportList]):
+        rollups = {
+            (x.case_id, x.day): x for x in await crud.get_rollup(
+                db=db,
+                case_ids=list({x.case_id for x in reports}),
+                days=list({x.created_at.date() for x in reports}),
+            )
+        }
+        try:
+            for report in reports:
+                key = (report.case_id, report.created_at.date())
+                if key not in rollups:
+                    rollups[key] = models.ApiReportRollup(
+                        case_id=key[0], day=key[1], runs=0, success=0, fail=0, run_api=0, fail_api=0,
+                        total_time=0, max_total_time=0, max_api_time=0, last_report_id=0,
+                    )
+                    db.add(rollups[key])
+                _fold(rollups[key], report)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+    async def prune(self, db: AsyncSession) -> int:
+        """
+        按保留策略清理报告详情，每批batch_size条报告一个事务；两个保留条件都为空时不清理
+        :param db:
+        :return:
+        """
+        if not self.keep_runs and not self.keep_days:
+            return 0
+
+        count = 0
+        while True:
+            report_ids = await crud.get_prune_report_ids(
+                db=db, keep_runs=self.keep_runs, keep_days=self.keep_days, size=self.batch_size
+            )
+            if not report_ids:
+                return count
+
+            try:
+                await crud.prune_api_detail(db=db, report_ids=report_ids)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            count += len(report_ids)
+
+    async def close(self):
+        """
+        停止后台任务
+        :return:
+        """
+        if self._task is None or self._task.done():
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+REPORT_RETENTION = ReportRetention(
+    keep_runs=setting['report_retention']['keep_runs'],
+    keep_days=setting['report_retention']['keep_days'],
+    interval=setting['report_retention']['interval'],
+    batch_size=setting['report_retention']['batch_size'],
+)
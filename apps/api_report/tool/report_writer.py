@@ -0,0 +1,117 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：report_writer.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/9 10:30
+"""
+
+import asyncio
+from tools import logger
+from tools.read_setting import setting
+from tools.database import async_session_local
+from .write_report import write_case_reports
+
+
+class ReportWriter:
+    """
+    测试报告后台写入队列
+    每条用例执行完成后立即入队，由后台任务按顺序写入数据库；队列有上限，写入跟不上时执行方会等待
+    队列中积压的报告一次最多取batch_size条，在一个事务中批量写入
+    """
+
+    def __init__(self, maxsize: int, batch_size: int = 50):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self._queue = None
+        self._task = None
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._task = loop.create_task(self._worker())
+
+    async def start(self):
+        """
+        启动后台写入任务
+        :return:
+        """
+        self._start()
+
+    async def put(self, report: dict, api_list: list) -> asyncio.Future:
+        """
+        报告入队，返回写入完成的future，结果为写入后的报告
+        :param report:
+        :param api_list:
+        :return:
+        """
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((report, api_list, future))
+        return future
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: list):
+        """
+        批量写入，失败时逐条重试，只有写入失败的报告返回异常
+        :param batch: [(报告, 接口数据, future)]
+        :return:
+        """
+        if len(batch) > 1:
+            try:
+                async with async_session_local() as db:
+                    await write_case_reports(db=db, reports=[(report, api_list) for report, api_list, _ in batch])
+            except Exception as e:
+                logger.error(f"批量写入测试报告失败，逐条写入: {e}")
+            else:
+                for report, _, future in batch:
+                    if not future.done():
+                        future.set_result(report)
+                return
+
+        for report, api_list, future in batch:
+            try:
+                async with async_session_local() as db:
+                    await write_case_reports(db=db, reports=[(report, api_list)])
+            except Exception as e:
+                logger.error(f"写入测试报告失败: {report['case_id']} {e}")
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(report)
+
+    async def close(self):
+        """
+        等待队列中的报告写完，再停止后台任务
+        :return:
+        """
+        if self._task is None or self._task.done():
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+REPORT_WRITER = ReportWriter(
+    maxsize=setting['report_writer']['maxsize'],
+    batch_size=setting['report_writer'].get('batch_size', 50),
+)
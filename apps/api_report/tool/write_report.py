@@ -7,28 +7,80 @@
 @Time: 2023/10/25-11:36
 """
 
+import time
+from typing import List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from apps.api_report import schemas, crud
 from apps.run_case import crud as run_crud
 
 
-async def write_api_report(db: AsyncSession, api_report: dict, api_detail: list):
+def _api_step(report_id: int, report: dict, api: dict, ts: float) -> dict:
     """
-    写入数据到测试报告中
-    :param db:
-    :param api_report:
-    :param api_detail:
+    单个接口的耗时记录
+    :param report_id:
+    :param report:
+    :param api: 执行后的接口数据
+    :param ts:
     :return:
     """
-    # 查询最大的run_number
-    run_number = await crud.get_max_run_number(db=db, case_id=api_report['case_id'])
-    # 写入报告列表
-    api_report['run_number'] = run_number + 1 if run_number is not None else 1
-    db_data = await crud.create_api_list(db=db, data=schemas.ApiReportListInt(**api_report))
-    # 写入详情列表
-    await crud.create_api_detail(db=db, data=api_detail, report_id=db_data.id)
-    # 更新用例次数
-    db_info = await run_crud.update_test_case_order(db=db, case_id=api_report['case_id'], is_fail=api_report['is_fail'])
-    api_report['run_order'] = db_info.run_order
-    api_report['success_case'] = db_info.success
-    api_report['fail_case'] = db_info.fail
+    response = api['response_info'][-1] if api['response_info'] else {}
+    return {
+        'case_id': report['case_id'],
+        'number': api['api_info'].get('number'),
+        'run_number': report['run_number'],
+        'report_id': report_id,
+        'ts': ts,
+        'host': api['api_info'].get('host'),
+        'status': api['report']['result'],
+        'status_code': response.get('status_code'),
+        'response_time': response.get('response_time'),
+    }
+
+
+async def write_case_reports(db: AsyncSession, reports: List[Tuple[dict, list]]):
+    """
+    批量写入多条用例的测试报告，报告列表、报告详情、用例执行次数在一个事务中写入
+    :param db:
+    :param reports: [(报告, 执行后的接口数据)]
+    :return: 报告列表
+    """
+    try:
+        # 分配run_number，同一批次中相同的用例依次递增
+        run_numbers = await run_crud.allocate_run_numbers(db=db, case_ids=[report['case_id'] for report, _ in reports])
+        for (report, _), run_number in zip(reports, run_numbers):
+            report['run_number'] = run_number
+
+        # 写入报告列表
+        report_ids = await crud.bulk_create_api_list(
+            db=db,
+            data=[schemas.ApiReportListInt(**report) for report, _ in reports]
+        )
+        # 写入详情列表
+        await crud.bulk_create_api_detail(
+            db=db,
+            data=[
+                (report_id, x)
+                for report_id, (_, api_list) in zip(report_ids, reports)
+                for x in api_list if x['report']['is_executor'] is not None
+            ]
+        )
+        # 写入接口耗时
+        ts = time.time()
+        await crud.bulk_create_api_step(
+            db=db,
+            data=[
+                _api_step(report_id, report, x, ts)
+                for report_id, (report, api_list) in zip(report_ids, reports)
+                for x in api_list if x['report']['is_executor'] is not None
+            ]
+        )
+        # 更新用例次数
+        await run_crud.bulk_update_test_case_order(
+            db=db,
+            results=[(report['case_id'], {0: False, 1: True}.get(report['result']['result'])) for report, _ in reports]
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return [report for report, _ in reports]
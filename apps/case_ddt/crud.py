@@ -54,6 +54,22 @@ async def del_test_gather(db: AsyncSession, case_id: int, suite: list = None):
     await db.commit()
 
 
+async def delete_gathers(db: AsyncSession, case_ids: List[int]):
+    """
+    批量删除用例的测试数据集，不提交事务
+    :param db:
+    :param case_ids:
+    :return:
+    """
+    await db.execute(
+        delete(
+            models.TestGather
+        ).where(
+            models.TestGather.case_id.in_(case_ids)
+        ).execution_options(synchronize_session=False)
+    )
+
+
 async def get_gather(db: AsyncSession, case_id: int, number: int = None, suite: List[int] = None):
     """
     模糊查询url
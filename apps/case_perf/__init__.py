@@ -6,3 +6,9 @@
 @File: __init__.py.py
 @Time: 2022/8/22-9:55
 """
+
+# 性能测试运行记录
+PERF_RUNS = {
+    # key：run_id
+    # value: PerfRecorder
+}
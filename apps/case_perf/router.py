@@ -7,11 +7,123 @@
 @Time: 2022/8/22-9:51
 """
 
-from fastapi import APIRouter
+import time
+import random
+import asyncio
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from depends import get_db
+from apps import response_code
+from apps.case_service import crud as case_crud
+from apps.run_case import SETTING_INFO_DICT
+from apps.case_perf import schemas, PERF_RUNS
+from .tool import PerfRecorder, run_perf_case
 
 case_perf = APIRouter()
 
 
-@case_perf.get('/demo', name='开发中')
-async def mode():
-    pass
+@case_perf.post(
+    '/run',
+    response_class=response_code.MyJSONResponse,
+    name='执行性能测试',
+    description='closed模式按虚拟用户数循环执行用例，open模式按固定或阶梯到达率启动用例，在后台执行'
+)
+async def run_perf(perf: schemas.PerfRun, db: AsyncSession = Depends(get_db)):
+    if perf.users < 1 or perf.ramp_up < 0 or perf.duration <= 0 or perf.think_time < 0:
+        return await response_code.resp_400(message='压测参数错误')
+    if perf.iterations is not None and perf.iterations < 1:
+        return await response_code.resp_400(message='执行次数错误')
+
+    # open模式：没有阶梯配置时，按rate和duration组成一个阶段
+    stages = [(x.rate, x.duration) for x in perf.stages] if perf.stages else [(perf.rate, perf.duration)]
+    if perf.mode == schemas.PerfMode.open:
+        if not perf.stages and not perf.rate:
+            return await response_code.resp_400(message='open模式需要设置rate或stages')
+        if any(rate < 0 or duration <= 0 for rate, duration in stages):
+            return await response_code.resp_400(message='阶梯配置错误')
+        if perf.max_users is not None and perf.max_users < 1:
+            return await response_code.resp_400(message='并发上限错误')
+
+    if not await case_crud.get_case_info(db=db, case_id=perf.case_id):
+        return await response_code.resp_400(message='没有获取到这个用例id')
+
+    run_id = f"{int(time.time() * 1000)}_{random.uniform(0, 1)}"
+    recorder = PerfRecorder(
+        run_id=run_id,
+        case_id=perf.case_id,
+        config={**perf.dict(exclude={'case_id', 'setting_list_id'}), 'mode': perf.mode.value}
+    )
+    PERF_RUNS[run_id] = recorder
+    recorder.task = asyncio.create_task(run_perf_case(
+        recorder=recorder,
+        setting_info_dict=SETTING_INFO_DICT.get(perf.setting_list_id, {}),
+        users=perf.users,
+        ramp_up=perf.ramp_up,
+        duration=perf.duration,
+        iterations=perf.iterations,
+        think_time=perf.think_time,
+        mode=perf.mode.value,
+        stages=stages,
+        max_users=perf.max_users,
+        seed=perf.seed,
+    ))
+
+    return await response_code.resp_200(data={'run_id': run_id})
+
+
+@case_perf.get(
+    '/run/status',
+    response_class=response_code.MyJSONResponse,
+    name='查看性能测试的实时统计'
+)
+async def perf_status(run_id: str, series: bool = False):
+    if not PERF_RUNS.get(run_id):
+        return await response_code.resp_400(message='没有这个性能测试')
+
+    return await response_code.resp_200(data=PERF_RUNS[run_id].report(series=series))
+
+
+@case_perf.put(
+    '/run/stop',
+    response_class=response_code.MyJSONResponse,
+    name='停止性能测试'
+)
+async def perf_stop(run_id: str):
+    if not PERF_RUNS.get(run_id):
+        return await response_code.resp_400(message='没有这个性能测试')
+
+    PERF_RUNS[run_id].stop()
+    return await response_code.resp_200()
+
+
+@case_perf.get(
+    '/run/list',
+    response_class=response_code.MyJSONResponse,
+    name='性能测试列表'
+)
+async def perf_list(case_id: int = None):
+    return await response_code.resp_200(data=[
+        {
+            'run_id': x.run_id,
+            'case_id': x.case_id,
+            'status': x.status,
+            'config': x.config,
+            'start_time': x.start_time,
+            'end_time': x.end_time,
+        } for x in PERF_RUNS.values() if case_id is None or x.case_id == case_id
+    ])
+
+
+@case_perf.delete(
+    '/run/del',
+    response_class=response_code.MyJSONResponse,
+    name='删除性能测试记录'
+)
+async def perf_del(run_id: str):
+    if not PERF_RUNS.get(run_id):
+        return await response_code.resp_400(message='没有这个性能测试')
+    if PERF_RUNS[run_id].status in ('waiting', 'running', 'stopping'):
+        return await response_code.resp_400(message='性能测试执行中，请先停止')
+
+    del PERF_RUNS[run_id]
+    return await response_code.resp_200()
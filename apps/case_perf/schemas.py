@@ -5,4 +5,33 @@
 @Author: Kobayasi
 @File: schemas.py
 @Time: 2022/8/22-9:51
-"""
\ No newline at end of file
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel
+from enum import Enum
+
+
+class PerfMode(str, Enum):
+    closed = 'closed'  # 虚拟用户循环执行
+    open = 'open'  # 按固定到达率启动用例，不受响应时间影响
+
+
+class PerfStage(BaseModel):
+    rate: float  # 每秒启动的用例次数
+    duration: float  # 持续时间(秒)
+
+
+class PerfRun(BaseModel):
+    case_id: int
+    mode: PerfMode = PerfMode.closed
+    users: int = 1  # 虚拟用户数
+    ramp_up: float = 0  # 所有虚拟用户启动完成的时间(秒)
+    duration: float = 60  # 持续时间(秒)
+    iterations: Optional[int] = None  # 每个虚拟用户的最大执行次数，不传时按持续时间执行
+    think_time: float = 0  # 每次执行用例后的等待时间(秒)
+    rate: Optional[float] = None  # open模式：每秒启动的用例次数，与duration配合使用
+    stages: Optional[List[PerfStage]] = None  # open模式：阶梯到达率，传入时忽略rate和duration
+    max_users: Optional[int] = None  # open模式：同时执行的用例数上限，超过时丢弃并记录
+    seed: Optional[int] = None  # 假数据的随机种子，用于复现压测数据，本次压测使用独立的假数据池
+    setting_list_id: str = ''
@@ -5,4 +5,7 @@
 @Author: Kobayasi
 @File: __init__.py.py
 @Time: 2022/8/22-10:00
-"""
\ No newline at end of file
+"""
+
+from .perf_recorder import PerfRecorder
+from .perf_executor import PerfExecutor, run_perf_case, close_perf_runs
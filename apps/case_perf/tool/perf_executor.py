@@ -0,0 +1,353 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：perf_executor.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/13 10:40
+"""
+
+import copy
+import math
+import time
+import asyncio
+from typing import List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from tools import logger, http_session, setting
+from tools.faker_data import FakerPool
+from tools.database import async_session_local
+from apps.run_case.tool.api_executor.executor_service import ExecutorService
+from apps.run_case.tool.run_api_data_processing import DataProcessing
+from apps.api_report import schemas as report_schemas, crud as report_crud
+from apps.case_perf import PERF_RUNS
+from .perf_recorder import PerfRecorder
+
+
+class PerfExecutor(ExecutorService):
+    """
+    性能测试执行器
+    复用业务用例的数据准备、参数替换和断言
+    closed模式：虚拟用户循环执行同一条用例
+    open模式：按计划的到达率启动用例，不等待前面的用例结束，并记录施压端落后计划的时长
+    """
+
+    def __init__(
+            self,
+            db: AsyncSession,
+            recorder: PerfRecorder,
+            users: int = 1,
+            ramp_up: float = 0,
+            duration: float = 60,
+            iterations: int = None,
+            think_time: float = 0,
+            mode: str = 'closed',
+            stages: List[Tuple[float, float]] = None,
+            max_users: int = None,
+            faker_pool: FakerPool = None,
+    ):
+        super(PerfExecutor, self).__init__(db=db)
+        self.recorder = recorder
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.iterations = iterations
+        self.think_time = think_time
+        self.mode = mode
+        self.stages = stages or []  # [(到达率, 持续时间)]
+        self.max_users = max_users
+        self.faker_pool = faker_pool  # 设置了随机种子时使用独立的假数据池
+
+    async def executor_api(self, **kwargs):
+        """
+        按模式执行
+        :return:
+        """
+        self.recorder.start()
+        if self.mode == 'open':
+            await self._open_model(api_list=self.api_group[0])
+        else:
+            await self._closed_model(api_list=self.api_group[0])
+
+    async def collect_report(self, **kwargs):
+        """
+        性能测试的统计报告
+        :return:
+        """
+        self.report_list.append(self.recorder.report())
+
+    async def _closed_model(self, api_list: list):
+        """
+        按爬坡时间依次启动虚拟用户，到达持续时间或执行次数后停止
+        :param api_list:
+        :return:
+        """
+        deadline = time.monotonic() + self.duration
+        await asyncio.gather(*[
+            self._user(
+                index=i,
+                api_list=api_list,
+                delay=self.ramp_up * i / self.users,
+                deadline=deadline
+            ) for i in range(self.users)
+        ])
+
+    async def _open_model(self, api_list: list):
+        """
+        按阶梯到达率启动用例：每个阶段内按固定间隔计划启动时间，落后时立即补发，不跳过
+        超过并发上限的用例不启动，计入丢弃
+        :param api_list:
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks = set()
+        index = 0
+        stage_start = 0.0
+        for rate, duration in self.stages:
+            count = math.floor(rate * duration + 1e-9) if rate > 0 else 0
+            for k in range(count):
+                if self.recorder.stopping:
+                    break
+                scheduled = start + stage_start + k / rate
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    if self.recorder.stopping:
+                        break
+
+                lag = max(loop.time() - scheduled, 0.0)
+                if self.max_users and len(tasks) >= self.max_users:
+                    self.recorder.add_arrival(lag=lag, dropped=True)
+                    continue
+
+                self.recorder.add_arrival(lag=lag)
+                task = asyncio.create_task(self._arrival(index=index, api_list=api_list))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                index += 1
+            stage_start += duration
+
+        # 等到计划结束，再等待执行中的用例完成
+        delay = start + stage_start - loop.time()
+        while delay > 0 and not self.recorder.stopping:
+            await asyncio.sleep(min(delay, 0.5))
+            delay = start + stage_start - loop.time()
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _arrival(self, index: int, api_list: list):
+        """
+        open模式下单次启动的用例，相当于只执行一次的虚拟用户
+        :param index:
+        :param api_list:
+        :return:
+        """
+        sees = http_session(total=120)
+        self.recorder.user_start()
+        try:
+            async with async_session_local() as db:
+                await self._run_iteration(
+                    index=index,
+                    api_list=api_list,
+                    cookie={},
+                    sees=sees,
+                    data_processing=DataProcessing(db=db, faker_pool=self.faker_pool)
+                )
+        finally:
+            self.recorder.user_end()
+            await sees.close()
+
+    async def _user(self, index: int, api_list: list, delay: float, deadline: float):
+        """
+        单个虚拟用户，循环执行用例
+        :param index:
+        :param api_list: 用例数据，每次执行前复制
+        :param delay: 启动延迟
+        :param deadline: 结束时间
+        :return:
+        """
+        await asyncio.sleep(delay)
+        if self.recorder.stopping or time.monotonic() >= deadline:
+            return
+
+        # 每个虚拟用户使用独立的cookie、会话和数据库会话
+        cookie = {}
+        sees = http_session(total=120)
+        self.recorder.user_start()
+        try:
+            async with async_session_local() as db:
+                data_processing = DataProcessing(db=db, faker_pool=self.faker_pool)
+                number = 0
+                while not self.recorder.stopping and time.monotonic() < deadline:
+                    if self.iterations and number >= self.iterations:
+                        break
+                    number += 1
+
+                    await self._run_iteration(
+                        index=index,
+                        api_list=api_list,
+                        cookie=cookie,
+                        sees=sees,
+                        data_processing=data_processing
+                    )
+
+                    if self.think_time:
+                        await asyncio.sleep(self.think_time)
+        finally:
+            self.recorder.user_end()
+            await sees.close()
+
+    async def _run_iteration(self, index: int, api_list: list, cookie: dict, sees, data_processing: DataProcessing):
+        """
+        复制用例数据执行一次，异常不影响后续执行
+        :param index:
+        :param api_list:
+        :param cookie:
+        :param sees:
+        :param data_processing:
+        :return:
+        """
+        error = False
+        try:
+            await self._iteration(
+                api_list=copy.deepcopy(api_list),
+                key_id=f'{self.recorder.run_id}_{index}',
+                cookie=cookie,
+                sees=sees,
+                data_processing=data_processing
+            )
+        except Exception as e:
+            error = True
+            logger.error(f"性能测试 {self.recorder.run_id}-{index} 执行异常: {e}")
+        self.recorder.add_iteration(error=error)
+
+    async def _iteration(self, api_list: list, key_id: str, cookie: dict, sees, data_processing: DataProcessing):
+        """
+        执行一次用例，逐个记录接口结果
+        :param api_list:
+        :param key_id:
+        :param cookie:
+        :param sees:
+        :param data_processing:
+        :return:
+        """
+        for i, api in enumerate(api_list):
+            try:
+                is_stop = await self._run_step(
+                    i=i,
+                    api=api,
+                    api_list=api_list,
+                    key_id=key_id,
+                    cookie=cookie,
+                    sees=sees,
+                    data_processing=data_processing
+                )
+            finally:
+                self.recorder.add_step(api)
+
+            if is_stop or self.recorder.stopping:
+                break
+
+    async def _case_status(self, *args, **kwargs):
+        """
+        性能测试不记录单条用例的运行进度
+        """
+
+
+async def run_perf_case(recorder: PerfRecorder, setting_info_dict: dict = None, seed: int = None, **kwargs):
+    """
+    执行性能测试，运行期间使用独立的数据库会话
+    :param recorder:
+    :param setting_info_dict:
+    :param seed: 假数据的随机种子，使用独立的假数据池，不影响其他执行中的用例
+    :param kwargs: PerfExecutor的压测参数
+    :return:
+    """
+    message = ''
+    faker_pool = FakerPool(
+        batch_size=setting['faker_pool']['batch_size'],
+        low_water=setting['faker_pool']['low_water'],
+        seed=seed,
+    ) if seed is not None else None
+    async with async_session_local() as db:
+        executor = PerfExecutor(db=db, recorder=recorder, faker_pool=faker_pool, **kwargs)
+        try:
+            await executor.collect_sql(case_ids=[recorder.case_id])
+            await executor.collect_config(setting_info_dict=setting_info_dict or {})
+            await executor.collect_req_data()
+            await executor.executor_api()
+        except Exception as e:
+            message = str(e)
+            logger.error(f"性能测试 {recorder.run_id} 执行失败: {e}")
+        finally:
+            recorder.finish(message=message)
+
+    if recorder.start_time is not None:
+        try:
+            await save_perf_report(recorder=recorder)
+        except Exception as e:
+            logger.error(f"性能测试 {recorder.run_id} 保存报告失败: {e}")
+
+    logger.info(f"性能测试 {recorder.run_id} 执行结束: {recorder.status}")
+    return recorder.report()
+
+
+async def close_perf_runs():
+    """
+    停止执行中的性能测试，等待执行结束、保存报告
+    :return:
+    """
+    tasks = []
+    for recorder in PERF_RUNS.values():
+        if recorder.task is not None and not recorder.task.done():
+            recorder.stop()
+            tasks.append(recorder.task)
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def save_perf_report(recorder: PerfRecorder):
+    """
+    保存性能测试报告：接口耗时保存为直方图，按秒统计按列保存
+    :param recorder:
+    :return:
+    """
+    report = recorder.report()
+    histograms = recorder.histograms()
+    seconds = report['seconds']
+    async with async_session_local() as db:
+        db_data = await report_crud.create_perf_report(
+            db=db,
+            data=report_schemas.ApiReportPerfInt(
+                case_id=recorder.case_id,
+                run_id=recorder.run_id,
+                mode=recorder.config.get('mode', 'closed'),
+                status=report['status'],
+                message=report['message'],
+                config=report['config'],
+                start_time=report['start_time'],
+                end_time=report['end_time'],
+                elapsed=report['elapsed'],
+                result={
+                    k: report[k] for k in (
+                        'iterations', 'iteration_errors', 'requests', 'fail',
+                        'throughput', 'iteration_throughput', 'max_users'
+                    )
+                },
+                generator=report['generator'],
+                seconds={k: [x[k] for x in seconds] for k in ('second', 'requests', 'fail', 'iterations')},
+            ),
+            steps=[
+                report_schemas.ApiReportPerfStepInt(
+                    number=x['number'],
+                    path=x['path'],
+                    method=x['method'],
+                    result={k: x[k] for k in ('count', 'success', 'fail', 'skip', 'throughput')},
+                    time=x['time'],
+                    histogram=histograms[x['number']],
+                    series=x['series'],
+                ) for x in report['steps']
+            ]
+        )
+    recorder.report_id = db_data.id
@@ -0,0 +1,244 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：perf_recorder.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/13 10:15
+"""
+
+import time
+from tools.latency_histogram import LatencyHistogram
+
+# 按秒统计的列
+_SERIES_KEYS = ('second', 'count', 'fail', 'avg_time', 'max_time', 'p50', 'p90', 'p99')
+
+
+class PerfRecorder:
+    """
+    性能测试的运行状态和统计数据：按接口序号用直方图统计耗时、结果，按秒统计吞吐量和耗时
+    """
+
+    def __init__(self, run_id: str, case_id: int, config: dict):
+        self.run_id = run_id
+        self.case_id = case_id
+        self.config = config
+        self.status = 'waiting'  # waiting、running、stopping、stopped、finished、error
+        self.message = ''
+        self.users = 0  # 运行中的虚拟用户数
+        self.iterations = 0
+        self.iteration_errors = 0
+        self.start_time = None  # 时间戳
+        self.end_time = None
+        self._start = None  # time.monotonic
+        self._end = None
+        self._steps = {}
+        self._seconds = {}
+        # open模式下施压端自身的统计：计划启动、实际启动、丢弃的次数，以及启动时间落后计划的时长
+        self.scheduled = 0
+        self.launched = 0
+        self.dropped = 0
+        self.max_users = 0
+        self._lags = LatencyHistogram()
+        self.report_id = None  # 保存后的报告id
+        self.task = None  # 后台执行的任务
+
+    @property
+    def stopping(self) -> bool:
+        return self.status in ('stopping', 'stopped', 'error')
+
+    def start(self):
+        if self.status == 'waiting':
+            self.status = 'running'
+        self.start_time = time.time()
+        self._start = time.monotonic()
+
+    def stop(self):
+        if self.status in ('waiting', 'running'):
+            self.status = 'stopping'
+
+    def finish(self, message: str = ''):
+        if message:
+            self.status, self.message = 'error', message
+        else:
+            self.status = 'stopped' if self.status == 'stopping' else 'finished'
+        self.end_time = time.time()
+        self._end = time.monotonic()
+
+    def _now(self) -> int:
+        return int(time.monotonic() - self._start)
+
+    def _second(self, second: int = None) -> dict:
+        second = self._now() if second is None else second
+        if second not in self._seconds:
+            self._seconds[second] = {'requests': 0, 'fail': 0, 'iterations': 0}
+        return self._seconds[second]
+
+    def add_step(self, api: dict):
+        """
+        记录单个接口的执行结果
+        :param api: 执行后的接口数据
+        :return:
+        """
+        if not api['response_info']:
+            return
+
+        number = api['api_info']['number']
+        if number not in self._steps:
+            self._steps[number] = {
+                'number': number,
+                'path': api['history']['path'],
+                'method': api['request_info']['method'],
+                'count': 0,
+                'success': 0,
+                'fail': 0,
+                'skip': 0,
+                'histogram': LatencyHistogram(),
+                'series': {k: [] for k in _SERIES_KEYS},
+                'current': None,  # [秒, 直方图, 失败数]，当前这一秒的统计
+            }
+        step = self._steps[number]
+        response_time = api['response_info'][-1]['response_time']
+        result = api['report']['result']
+
+        step['count'] += 1
+        step[{0: 'success', 1: 'fail', 2: 'skip'}.get(result, 'fail')] += 1
+        step['histogram'].record(response_time)
+
+        # 记录时间只会递增，进入新的一秒时把上一秒的直方图整理成一行，只保留当前这一秒的直方图
+        now = self._now()
+        current = step['current']
+        if current is None or current[0] != now:
+            if current is not None:
+                self._append_series(step['series'], current)
+            current = step['current'] = [now, LatencyHistogram(), 0]
+        current[1].record(response_time)
+        if result == 1:
+            current[2] += 1
+
+        second = self._second(now)
+        second['requests'] += 1
+        if result == 1:
+            second['fail'] += 1
+
+    def add_iteration(self, error: bool = False):
+        """
+        记录一次用例执行
+        :param error: 执行过程中出现异常
+        :return:
+        """
+        self.iterations += 1
+        if error:
+            self.iteration_errors += 1
+        self._second()['iterations'] += 1
+
+    def user_start(self):
+        self.users += 1
+        self.max_users = max(self.max_users, self.users)
+
+    def user_end(self):
+        self.users -= 1
+
+    def add_arrival(self, lag: float, dropped: bool = False):
+        """
+        记录一次按计划启动的用例
+        :param lag: 实际启动时间落后计划时间的时长(秒)
+        :param dropped: 超过并发上限被丢弃
+        :return:
+        """
+        self.scheduled += 1
+        self._lags.record(lag)
+        if dropped:
+            self.dropped += 1
+        else:
+            self.launched += 1
+
+    @staticmethod
+    def _append_series(series: dict, current: list):
+        summary = current[1].summary()
+        series['second'].append(current[0])
+        series['count'].append(summary['count'])
+        series['fail'].append(current[2])
+        for key in _SERIES_KEYS[3:]:
+            series[key].append(summary[key])
+
+    def _step_series(self, step: dict) -> dict:
+        """
+        接口的按秒统计，按列存储
+        :param step:
+        :return:
+        """
+        if step['current'] is None:
+            return step['series']
+        series = {k: list(v) for k, v in step['series'].items()}
+        self._append_series(series, step['current'])
+        return series
+
+    def histograms(self) -> dict:
+        """
+        各接口序列化后的耗时直方图
+        :return: {number: bytes}
+        """
+        return {k: v['histogram'].to_bytes() for k, v in self._steps.items()}
+
+    def report(self, series: bool = True) -> dict:
+        """
+        统计报告
+        :param series: 是否返回接口的按秒统计
+        :return:
+        """
+        if self._start is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._end or time.monotonic()) - self._start
+
+        steps = []
+        for number in sorted(self._steps):
+            step = self._steps[number]
+            steps.append({
+                'number': step['number'],
+                'path': step['path'],
+                'method': step['method'],
+                'count': step['count'],
+                'success': step['success'],
+                'fail': step['fail'],
+                'skip': step['skip'],
+                'throughput': round(step['count'] / elapsed, 3) if elapsed else 0.0,
+                'time': step['histogram'].summary(),
+                **({'series': self._step_series(step)} if series else {}),
+            })
+
+        requests = sum(x['count'] for x in steps)
+        lags = self._lags.summary()
+        return {
+            'run_id': self.run_id,
+            'report_id': self.report_id,
+            'case_id': self.case_id,
+            'status': self.status,
+            'message': self.message,
+            'config': self.config,
+            'users': self.users,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'elapsed': round(elapsed, 3),
+            'iterations': self.iterations,
+            'iteration_errors': self.iteration_errors,
+            'requests': requests,
+            'fail': sum(x['fail'] for x in steps),
+            'throughput': round(requests / elapsed, 3) if elapsed else 0.0,
+            'iteration_throughput': round(self.iterations / elapsed, 3) if elapsed else 0.0,
+            'max_users': self.max_users,
+            'generator': {
+                'scheduled': self.scheduled,
+                'launched': self.launched,
+                'dropped': self.dropped,
+                'lag': {
+                    'max_lag': lags['max_time'],
+                    'avg_lag': lags['avg_time'],
+                    'p99': lags['p99'],
+                }
+            },
+            'steps': steps,
+            'seconds': [{'second': k, **v} for k, v in sorted(self._seconds.items())],
+        }
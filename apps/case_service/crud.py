@@ -9,7 +9,7 @@
 
 import datetime
 from tools import rep_value, rep_url
-from sqlalchemy import func, select, delete, update
+from sqlalchemy import func, select, delete, update, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 from apps.case_service import models, schemas
@@ -309,6 +309,104 @@ async def del_case_data(db: AsyncSession, case_id: int):
     await db.commit()
 
 
+async def delete_cases(db: AsyncSession, case_ids: List[int]):
+    """
+    批量删除用例和测试数据，不提交事务
+    :param db:
+    :param case_ids:
+    :return:
+    """
+    await db.execute(
+        delete(
+            models.TestCaseData
+        ).where(
+            models.TestCaseData.case_id.in_(case_ids)
+        ).execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(models.TestCase).where(models.TestCase.id.in_(case_ids)).execution_options(synchronize_session=False)
+    )
+
+
+async def del_temp_case_data(db: AsyncSession, temp_id: int, number: int):
+    """
+    删除模板下所有用例的某个接口，用例接口数量减一，不提交事务
+    :param db:
+    :param temp_id:
+    :param number:
+    :return:
+    """
+    case_ids = select(models.TestCase.id).where(models.TestCase.temp_id == temp_id)
+    await db.execute(
+        delete(
+            models.TestCaseData
+        ).where(
+            models.TestCaseData.case_id.in_(case_ids),
+            models.TestCaseData.number == number
+        ).execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(models.TestCase).where(
+            models.TestCase.temp_id == temp_id,
+            models.TestCase.case_count > 0
+        ).values(
+            case_count=models.TestCase.case_count - 1
+        ).execution_options(synchronize_session=False)
+    )
+
+
+async def get_cases_numbers(db: AsyncSession, case_ids: List[int], number: int):
+    """
+    查询多条用例某个number后的用例数据
+    :param db:
+    :param case_ids:
+    :param number:
+    :return:
+    """
+    result = await db.execute(
+        select(models.TestCaseData).where(
+            models.TestCaseData.case_id.in_(case_ids),
+            models.TestCaseData.number >= number
+        )
+    )
+    return result.scalars().all()
+
+
+async def update_cases_numbers(db: AsyncSession, case_ids: List[int], number: int, step: int):
+    """
+    多条用例某个number后的序号统一加减，不提交事务
+    :param db:
+    :param case_ids:
+    :param number:
+    :param step: 1或-1
+    :return:
+    """
+    await db.execute(
+        update(models.TestCaseData).where(
+            models.TestCaseData.case_id.in_(case_ids),
+            models.TestCaseData.number >= number
+        ).values(
+            number=models.TestCaseData.number + step
+        ).execution_options(synchronize_session=False)
+    )
+
+
+async def update_cases_api_info(db: AsyncSession, api_info: List[dict]):
+    """
+    按id批量修改用例数据的path、params、data、check、headers，不提交事务
+    :param db:
+    :param api_info: [{'b_id': , 'path': , 'params': , 'data': , 'check': , 'headers': }]
+    :return:
+    """
+    if not api_info:
+        return
+    table = models.TestCaseData.__table__
+    await db.execute(
+        update(table).where(table.c.id == bindparam('b_id')),
+        api_info
+    )
+
+
 async def get_case(db: AsyncSession, temp_id: int):
     """
     按模板查用例
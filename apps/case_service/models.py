@@ -25,6 +25,7 @@ class TestCase(Base):
     run_order: Mapped[int] = mapped_column(Integer, default=0, nullable=True, comment='执行次数')
     success: Mapped[int] = mapped_column(Integer, default=0, nullable=True, comment='成功次数')
     fail: Mapped[int] = mapped_column(Integer, default=0, nullable=True, comment='失败次数')
+    run_number: Mapped[int] = mapped_column(Integer, default=0, nullable=True, comment='最新的运行编号')
 
 
 class TestCaseData(Base):
@@ -19,13 +19,15 @@ from depends import get_db
 from apps import response_code
 from tools.check_case_json import CheckJson
 from tools import OperationJson, ExtractParamsPath, RepData, filter_number
+from tools.read_setting import setting
+from tools.background_job import BACKGROUND_JOBS
 from .tool import GetCaseDataInfo, check, jsonpath_count, aim
 
 from apps.template import crud as temp_crud
 from apps.case_service import crud, schemas
 from apps.api_report import crud as report_crud
-from apps.case_ddt import crud as ddt_crud
-from apps.case_service.tool import insert, cover_insert
+from apps.case_service.tool import insert, cover_insert, delete_case_cascade, delete_case_cascade_job, \
+    DELETE_CASE_STEPS
 from apps.template.tool import GenerateCase
 from apps.run_case import CASE_RESPONSE
 
@@ -48,19 +50,28 @@ async def download_case_data(
     自动处理部分接口上下级关联数据\n
     json格式化数据下载
     """
-    if mode != schemas.ModeEnum.service:
-        return await response_code.resp_400(message=f'该模式仅支持{schemas.ModeEnum.service}模式')
+    if mode not in (schemas.ModeEnum.service, schemas.ModeEnum.perf):
+        return await response_code.resp_400(
+            message=f'该模式仅支持{schemas.ModeEnum.service}、{schemas.ModeEnum.perf}模式'
+        )
 
     template_data = await temp_crud.get_template_data(db=db, temp_id=temp_id)
     if template_data:
         temp_name = await temp_crud.get_temp_name(db=db, temp_id=temp_id)
-        test_data = await GenerateCase().read_template_to_api(
-            db=db,
-            temp_name=temp_name[0].temp_name,
-            mode=mode,
-            fail_stop=fail_stop,
-            template_data=template_data
-        )
+        if mode == schemas.ModeEnum.perf:
+            test_data = await GenerateCase().read_template_to_perf(
+                db=db,
+                temp_name=temp_name[0].temp_name,
+                template_data=template_data
+            )
+        else:
+            test_data = await GenerateCase().read_template_to_api(
+                db=db,
+                temp_name=temp_name[0].temp_name,
+                mode=mode,
+                fail_stop=fail_stop,
+                template_data=template_data
+            )
         path = f'./files/json/{time.strftime("%Y%m%d%H%M%S", time.localtime(time.time()))}.json'
         await OperationJson.write(path=path, data=test_data)
         return FileResponse(
@@ -280,17 +291,18 @@ async def case_data_list(
 async def del_case(case_id: int, db: AsyncSession = Depends(get_db)):
     if not await crud.get_case_info(db=db, case_id=case_id):
         return await response_code.resp_400()
-    await crud.del_case_data(db=db, case_id=case_id)
-    await ddt_crud.del_test_gather(db=db, case_id=case_id)
 
-    # 删除报告
-    report_list = await report_crud.get_api_list(db=db, case_id=case_id, page=1, size=999)
-    for i in report_list:
-        await report_crud.delete_api_detail(db=db, report_id=i.id)
-    else:
-        await db.commit()
-    await report_crud.delete_api_report(db=db, case_id=case_id)
+    # 报告较多时在后台删除，通过/report/job/{job_id}查看进度
+    count = await report_crud.get_case_report_count(db=db, case_ids=[case_id])
+    if count > setting['delete_job']['report_threshold']:
+        job = BACKGROUND_JOBS.submit(
+            name=f'删除用例{case_id}',
+            func=lambda x: delete_case_cascade_job(case_ids=[case_id], job=x),
+            total=DELETE_CASE_STEPS,
+        )
+        return await response_code.resp_200(data=job.info(), message=f'用例{case_id}的报告较多，已在后台删除')
 
+    await delete_case_cascade(db=db, case_ids=[case_id])
     return await response_code.resp_200(message=f'用例{case_id}删除成功')
 
 
@@ -10,7 +10,8 @@
 from .insert_case_data import insert, cover_insert
 from .get_case_data_info import GetCaseDataInfo
 from .check_Info import check
-from .update_case import refresh, temp_to_case
+from .update_case import refresh, refresh_cases, temp_to_case
 from .auto_check import my_auto_check
 from .jsonpath_count import jsonpath_count
 from .jsonpath_aim import aim
+from .delete_case import delete_case_cascade, delete_case_cascade_job, DELETE_CASE_STEPS
@@ -0,0 +1,54 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：delete_case.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/22 14:05
+"""
+
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from tools.database import async_session_local
+from tools.background_job import Job
+from apps.case_service import crud
+from apps.case_ddt import crud as ddt_crud
+from apps.api_report import crud as report_crud
+
+# 测试报告、测试数据集、用例
+DELETE_CASE_STEPS = report_crud.DELETE_CASE_REPORT_STEPS + 2
+
+
+async def delete_case_cascade(db: AsyncSession, case_ids: List[int], job: Job = None) -> dict:
+    """
+    在一个事务中删除用例及关联的测试报告、汇总数据、性能测试报告、测试数据集
+    :param db:
+    :param case_ids:
+    :param job:
+    :return: {表名: 删除的行数}
+    """
+    try:
+        result = await report_crud.delete_case_reports(db=db, case_ids=case_ids, with_case_data=True, job=job)
+        await ddt_crud.delete_gathers(db=db, case_ids=case_ids)
+        if job:
+            job.advance('test_gather')
+        await crud.delete_cases(db=db, case_ids=case_ids)
+        if job:
+            job.advance('test_case')
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return result
+
+
+async def delete_case_cascade_job(case_ids: List[int], job: Job):
+    """
+    后台任务：使用独立的会话删除用例
+    :param case_ids:
+    :param job:
+    :return:
+    """
+    async with async_session_local() as db:
+        await delete_case_cascade(db=db, case_ids=case_ids, job=job)
@@ -8,7 +8,7 @@
 """
 
 import re
-import jsonpath
+from tools.json_path import jsonpath_extract
 
 
 def json_count(dict_data: [dict, list, str], data_type: str, number: int):
@@ -26,8 +26,7 @@ def json_count(dict_data: [dict, list, str], data_type: str, number: int):
                 path = "{{" + json_path + "}}"
                 target.append((path, data_type, number))
 
-    def handle_value(data_json):
-        target = []
+    def handle_value(data_json, target):
         if not isinstance(data_json, (dict, list, str)):
             return target
 
@@ -35,22 +34,22 @@ def json_count(dict_data: [dict, list, str], data_type: str, number: int):
             held_str(data_json, target)
         if isinstance(data_json, list):
             for data in data_json:
-                handle_value(data)
+                handle_value(data, target)
         if isinstance(data_json, dict):
             for k, v in data_json.items():
                 if isinstance(v, str):
                     held_str(v, target)
                     continue
                 if isinstance(v, dict):
-                    handle_value(v)
+                    handle_value(v, target)
                     continue
                 if isinstance(v, list):
                     for x in v:
-                        handle_value(x)
+                        handle_value(x, target)
                     continue
         return target
 
-    return handle_value(dict_data)
+    return handle_value(dict_data, [])
 
 
 def jsonpath_count(case_list: list, temp_list: list, run_case: list, get_temp_value=False):
@@ -86,7 +85,7 @@ def jsonpath_count(case_list: list, temp_list: list, run_case: list, get_temp_va
 
             # 模板中的值
             if get_temp_value:
-                temp_value = jsonpath.jsonpath(
+                temp_value = jsonpath_extract(
                     temp_list[int(number)].headers if 'h$' in data[0] else temp_list[int(number)].response,
                     json_path
                 )
@@ -96,7 +95,7 @@ def jsonpath_count(case_list: list, temp_list: list, run_case: list, get_temp_va
 
             # 用例中的值
             try:
-                case_value = jsonpath.jsonpath(
+                case_value = jsonpath_extract(
                     run_case[int(number)]['response_info'][-1]['headers'] if 'h$' in data[0] else
                     run_case[int(number)]['response_info'][-1]['response'],
                     json_path
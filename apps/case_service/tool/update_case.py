@@ -10,7 +10,7 @@
 import re
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from apps.case_service import crud, schemas
+from apps.case_service import crud
 from apps.template import schemas as temp_schemas
 from .auto_check import my_auto_check
 
@@ -24,55 +24,42 @@ async def refresh(db: AsyncSession, case_id: int, start_number: int, type_: str)
     :param type_:
     :return:
     """
-    # 重新对number进行编号
-    number_info = await crud.get_case_numbers(db=db, case_id=case_id, number=start_number)
-
-    if type_ == 'add':
-        for i, x in enumerate(number_info):
-            await crud.update_api_number(db=db, case_id=case_id, id_=x.id, new_number=x.number + 1)
-
-        for i, x in enumerate(number_info):
-            path = await _rep_url(x.path, start_number, 'add')
-            params = await _rep_dict(x.params, start_number, 'add')
-            data = await _rep_dict(x.data, start_number, 'add')
-            check = await _rep_dict(x.check, start_number, 'add')
-            headers = await _rep_dict(x.headers, start_number, 'add')
-            await crud.update_api_info(db=db, api_info=schemas.TestCaseDataOut1(**{
-                'number': x.number,
-                'case_id': x.case_id,
-                'path': path,
-                'headers': headers,
-                'params': params,
-                'data': data,
-                'file': x.file,
-                'check': check,
-                'description': x.description,
-                'config': x.config
-            }))
+    await refresh_cases(db=db, case_ids=[case_id], start_number=start_number, type_=type_)
+    await db.commit()
+
+
+async def refresh_cases(db: AsyncSession, case_ids: List[int], start_number: int, type_: str):
+    """
+    批量刷新多条用例的number序号和jsonPath中的number，不提交事务
+    序号一条update语句更新，替换后的数据按id批量更新
+    :param db:
+    :param case_ids:
+    :param start_number:
+    :param type_: add/del
+    :return:
+    """
+    if not case_ids or type_ not in ('add', 'del'):
         return
 
-    if type_ == 'del':
-        for i, x in enumerate(number_info):
-            await crud.update_api_number(db=db, case_id=case_id, id_=x.id, new_number=x.number - 1)
-
-        for i, x in enumerate(number_info):
-            path = await _rep_url(x.path, start_number, 'del')
-            params = await _rep_dict(x.params, start_number, 'del')
-            data = await _rep_dict(x.data, start_number, 'del')
-            check = await _rep_dict(x.check, start_number, 'del')
-            headers = await _rep_dict(x.headers, start_number, 'del')
-            await crud.update_api_info(db=db, api_info=schemas.TestCaseDataOut1(**{
-                'number': x.number,
-                'case_id': x.case_id,
-                'path': path,
-                'headers': headers,
-                'params': params,
-                'data': data,
-                'file': x.file,
-                'check': check,
-                'description': x.description,
-                'config': x.config
-            }))
+    number_info = await crud.get_cases_numbers(db=db, case_ids=case_ids, number=start_number)
+    api_info = [
+        {
+            'b_id': x.id,
+            'path': await _rep_url(x.path, start_number, type_),
+            'params': await _rep_dict(x.params, start_number, type_),
+            'data': await _rep_dict(x.data, start_number, type_),
+            'check': await _rep_dict(x.check, start_number, type_),
+            'headers': await _rep_dict(x.headers, start_number, type_),
+        } for x in number_info
+    ]
+
+    await crud.update_cases_numbers(
+        db=db,
+        case_ids=case_ids,
+        number=start_number,
+        step=1 if type_ == 'add' else -1
+    )
+    await crud.update_cases_api_info(db=db, api_info=api_info)
 
 
 async def temp_to_case(db: AsyncSession, case_id: int, api_info: temp_schemas.TemplateDataInTwo):
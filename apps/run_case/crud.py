@@ -8,7 +8,8 @@
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from typing import List
+from sqlalchemy import select, update, bindparam, func
 from apps.case_service import models as service_case
 
 
@@ -33,3 +34,69 @@ async def update_test_case_order(db: AsyncSession, case_id: int, is_fail: bool):
     await db.commit()
     await db.refresh(db_case)
     return db_case
+
+
+async def allocate_run_numbers(db: AsyncSession, case_ids: List[int]) -> List[int]:
+    """
+    分配运行编号，用例的运行编号计数器原子递增，不提交事务
+    计数器的行锁持有到事务提交，并发执行同一条用例时不会分配到相同的编号
+    :param db:
+    :param case_ids: 同一批次中相同的用例依次递增
+    :return: 与case_ids一一对应的运行编号
+    """
+    counts = {}
+    for case_id in case_ids:
+        counts[case_id] = counts.get(case_id, 0) + 1
+
+    table = service_case.TestCase.__table__
+    conn = await db.connection()
+    await conn.execute(
+        update(table).where(
+            table.c.id == bindparam('b_id')
+        ).values(
+            run_number=func.coalesce(table.c.run_number, 0) + bindparam('b_count'),
+        ),
+        [{'b_id': k, 'b_count': v} for k, v in counts.items()]
+    )
+    result = await conn.execute(
+        select(table.c.id, table.c.run_number).where(table.c.id.in_(list(counts)))
+    )
+    # 计数器更新后的值是这一批的最后一个编号
+    next_numbers = {case_id: run_number - counts[case_id] + 1 for case_id, run_number in result.all()}
+
+    run_numbers = []
+    for case_id in case_ids:
+        # 用例已被删除时没有计数器，从1开始
+        next_numbers.setdefault(case_id, 1)
+        run_numbers.append(next_numbers[case_id])
+        next_numbers[case_id] += 1
+    return run_numbers
+
+
+async def bulk_update_test_case_order(db: AsyncSession, results: List[tuple]):
+    """
+    批量更新用例次数，不提交事务
+    :param db:
+    :param results: [(用例id, 是否失败)]
+    :return:
+    """
+    counts = {}
+    for case_id, is_fail in results:
+        count = counts.setdefault(case_id, [0, 0, 0])
+        count[0] += 1
+        count[2 if is_fail else 1] += 1
+
+    table = service_case.TestCase.__table__
+    conn = await db.connection()
+    await conn.execute(
+        update(table).where(
+            table.c.id == bindparam('b_id')
+        ).values(
+            run_order=table.c.run_order + bindparam('b_run'),
+            success=table.c.success + bindparam('b_success'),
+            fail=table.c.fail + bindparam('b_fail'),
+        ),
+        [
+            {'b_id': k, 'b_run': v[0], 'b_success': v[1], 'b_fail': v[2]} for k, v in counts.items()
+        ]
+    )
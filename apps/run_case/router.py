@@ -27,6 +27,7 @@ from apps.whole_conf import crud as conf_crud
 from tools.read_setting import setting
 from tools.load_allure import load_allure_report
 from .tool import run_service_case, run_ddt_case, run_ui_case, handle, allure_generate
+from .tool.api_executor.scheduler import SCHEDULER
 
 run_case = APIRouter()
 
@@ -55,7 +56,10 @@ async def run_case_name(ids: schemas.RunCase, db: AsyncSession = Depends(get_db)
                 db=db,
                 case_ids=ids.case_ids,
                 setting_info_dict=SETTING_INFO_DICT.get(ids.setting_list_id, {}),
-                sync=ids.sync
+                sync=ids.sync,
+                concurrency=ids.concurrency,
+                priority=ids.priority,
+                dag=ids.dag
             )
     except ValueError as e:
         return await response_code.resp_400(message=str(e))
@@ -85,21 +89,16 @@ async def run_case_name(ids: schemas.RunTemp, db: AsyncSession = Depends(get_db)
         else:
             temp_info[x[0]] = [x[1]]
 
-    # 按模板并发
-    tasks = [
-        asyncio.create_task(
-            run_service_case(
-                db=db,
-                case_ids=[case_id[1]],
-                setting_info_dict={}
-            )
-        ) for case_id in case_list
-    ]
-    case_info = await asyncio.gather(*tasks)
-
-    new_report = []
-    for report_list in case_info:
-        new_report += report_list
+    # 按模板并发，由调度器控制并发数量
+    new_report = await run_service_case(
+        db=db,
+        case_ids=[x[1] for x in case_list],
+        setting_info_dict={},
+        sync=False,
+        concurrency=ids.concurrency,
+        priority=ids.priority,
+        dag=ids.dag
+    )
 
     return await response_code.resp_200(data={'report': new_report, "temp_info": temp_info})
 
@@ -310,6 +309,15 @@ async def case_status(key_id: str = None):
     return CASE_STATUS
 
 
+@run_case.get(
+    '/scheduler/status',
+    name='获取调度器的排队数和执行中数量',
+    response_class=response_code.MyJSONResponse,
+)
+async def scheduler_status():
+    return await response_code.resp_200(data=SCHEDULER.status())
+
+
 @run_case.get(
     '/get/api/setting/info',
     name='获取api用例绑定的环境配置信息'
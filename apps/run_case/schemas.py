@@ -26,10 +26,16 @@ class RunCase(BaseModel):
     case_ids: List[int]
     setting_list_id: str = ''
     sync: Optional[bool] = True
+    concurrency: Optional[int] = None  # 本次执行的并发上限，不超过全局配置
+    priority: Optional[int] = 0  # 排队优先级，数值越小越先执行
+    dag: Optional[bool] = False  # 用例内没有依赖关系的接口并发执行
 
 
 class RunTemp(BaseModel):
     temp_ids: List[int]
+    concurrency: Optional[int] = None
+    priority: Optional[int] = 0
+    dag: Optional[bool] = False
 
 
 class RunCaseGather(BaseModel):
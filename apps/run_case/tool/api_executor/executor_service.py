@@ -14,22 +14,23 @@ import json
 import random
 import base64
 import asyncio
-import aiohttp
-import jsonpath
+import functools
 from sqlalchemy.ext.asyncio import AsyncSession
 from aiohttp import FormData, client_exceptions
 from apps.case_service import crud as case_crud
 from apps.template import crud as temp_crud
-from apps.api_report import crud as report_crud
-from apps.api_report import schemas as report_schemas
-from apps.run_case import crud as run_crud
+from apps.api_report.tool import REPORT_WRITER
 from apps.case_service.tool import jsonpath_count
 from apps.run_case import CASE_STATUS, CASE_RESPONSE, CASE_STATUS_LIST
-from tools import logger, get_cookie, AsyncMySql
+from tools import logger, get_cookie, AsyncMySql, http_session
 from tools.read_setting import setting
+from tools.json_path import jsonpath_first
+from apps.whole_conf.tool import customize_map
 
 from .base_abstract import ApiBase
+from .scheduler import SCHEDULER
 from ..del_status import del_status
+from ..step_dag import step_depends
 from ..handle_headers import replace_headers
 from ..run_api_data_processing import DataProcessing
 from ..check_data import check_customize
@@ -43,7 +44,9 @@ class ExecutorService(ApiBase):
         self._db = db
         self._case_group = {}
         self._setting_info_dict = {}
+        self._customize = {}
         self._cookie = {}
+        self._report_futures = []
 
     async def collect_sql(self, **kwargs):
         """
@@ -87,6 +90,11 @@ class ExecutorService(ApiBase):
         :return:
         """
         self._setting_info_dict = setting_info_dict
+        # 自定参数在执行期间不变，只处理一次
+        self._customize = await customize_map(
+            db=self._db,
+            customize=await check_customize(setting_info_dict.get('customize', {}))
+        )
 
     async def collect_req_data(self):
         """
@@ -146,293 +154,202 @@ class ExecutorService(ApiBase):
             api_group.append(api_list)
         self.api_group = copy.deepcopy(api_group)
 
-    async def executor_api(self, sync: bool = True):
+    async def executor_api(self, sync: bool = True, concurrency: int = None, priority: int = 0, dag: bool = False):
         """
-        按同步或异步执行用例
+        按同步或异步执行用例，异步执行时由调度器控制并发
+        每条用例执行完成后，报告立即进入后台写入队列
+        :param sync:
+        :param concurrency: 本次执行的并发上限
+        :param priority: 排队优先级，数值越小越先执行
+        :param dag: 用例内的接口按依赖关系并发执行
         :return:
         """
+        self._report_futures = [None] * len(self.api_group)
         if sync:
-            for api_list in self.api_group:
+            for i, api_list in enumerate(self.api_group):
                 try:
-                    await self._run_api(api_list=api_list, key_id=f'{time.time()}_{random.uniform(0, 1)}')
+                    async with SCHEDULER.slot(hosts=self._hosts(api_list), priority=priority):
+                        await self._run_case(
+                            index=i,
+                            api_list=api_list,
+                            key_id=f'{time.time()}_{random.uniform(0, 1)}',
+                            dag=dag
+                        )
                 except client_exceptions.ClientConnectorError as e:
                     logger.error(e)
         else:
-            tasks = [
-                asyncio.create_task(
-                    self._run_api(
-                        api_list=api_list,
-                        key_id=f'{time.time()}_{random.uniform(0, 1)}'
-                    )
-                ) for api_list in self.api_group
-            ]
-            await asyncio.gather(*tasks)
+            await SCHEDULER.run(
+                jobs=[
+                    (
+                        self._hosts(api_list),
+                        functools.partial(
+                            self._run_case,
+                            index=i,
+                            api_list=api_list,
+                            key_id=f'{time.time()}_{random.uniform(0, 1)}',
+                            cookie={},  # 并发执行的用例互不共用cookie
+                            dag=dag
+                        )
+                    ) for i, api_list in enumerate(self.api_group)
+                ],
+                concurrency=concurrency,
+                priority=priority
+            )
 
     async def collect_report(self):
         """
-        处理执行结果报告
+        等待执行结果报告写入完成，按用例顺序收集
         :return:
         """
+        for future in self._report_futures:
+            if future is None:
+                continue
+            self.report_list.append(await future)
 
-        run_numbers = await report_crud.get_max_run_number(db=self._db, case_ids=list(self._case_group.keys()))
-        run_numbers = {k: v for k, v in run_numbers}
-
-        for api_list in self.api_group:
-            report = {
-                'case_id': api_list[0]['api_info']['case_id'],
-                'run_number': run_numbers.get(api_list[0]['api_info']['case_id'], 0) + 1,
-                'total_api': len(api_list),
-                'initiative_stop': False,
-                'fail_stop': False,
-                'result': {
-                    'run_api': 0,
-                    'success': 0,
-                    'fail': 0,
-                    'skip': 0,
-                    'result': 0  # 成功0、失败1、跳过2,
-                },
-                'time': {
-                    'total_time': 0.0,
-                    'max_time': 0.0,
-                    'avg_time': 0.0,
-                }
+    async def _run_case(self, index: int, api_list: list, **kwargs):
+        """
+        执行用例，结束后（包括异常中断）把报告交给后台写入
+        :param index: 用例在api_group中的位置
+        :param api_list:
+        :param kwargs:
+        :return:
+        """
+        try:
+            await self._run_api(api_list=api_list, **kwargs)
+        finally:
+            report = self._case_report(api_list=api_list)
+            CASE_RESPONSE[report['case_id']] = copy.deepcopy(api_list)
+            self._report_futures[index] = await REPORT_WRITER.put(report=report, api_list=api_list)
+            # 报告已交给后台写入，不再持有执行过程数据，内存不随批量大小增长
+            self.api_group[index] = []
+
+    @staticmethod
+    def _case_report(api_list: list) -> dict:
+        """
+        汇总单条用例的执行结果
+        :param api_list:
+        :return:
+        """
+        report = {
+            'case_id': api_list[0]['api_info']['case_id'],
+            'run_number': 0,  # 写入报告时分配
+            'total_api': len(api_list),
+            'initiative_stop': False,
+            'fail_stop': False,
+            'result': {
+                'run_api': 0,
+                'success': 0,
+                'fail': 0,
+                'skip': 0,
+                'result': 0  # 成功0、失败1、跳过2,
+            },
+            'time': {
+                'total_time': 0.0,
+                'max_time': 0.0,
+                'avg_time': 0.0,
             }
+        }
 
-            for api in api_list:
-                # 如果是none，代表人为终止
-                if api['report']['is_executor'] is None:
-                    break
-
-                if api['report']['is_executor']:
-                    report['result']['run_api'] += 1
-
-                if api['report']['result'] == 0:
-                    report['result']['success'] += 1
-
-                if api['report']['result'] == 1:
-                    report['result']['result'] = 1
-                    report['result']['fail'] += 1
-
-                if api['report']['result'] == 2:
-                    report['result']['skip'] += 1
-
-                if api['config'].get('stop'):
-                    report['initiative_stop'] = True
-
-                if api['config'].get('fail_stop'):
-                    report['fail_stop'] = True
-                response_time = api['response_info'][-1]['response_time']
-                max_time = report['time']['max_time']
-                report['time']['total_time'] += response_time
-                report['time']['max_time'] = response_time if response_time > max_time else max_time
-
-                # 获取jsonpath数据
-                class Case:
-                    number = api['api_info']['number']
-                    path = api['history']['path']
-                    params = api['history']['params']
-                    data = api['history']['data']
-                    headers = api['history']['headers']
-                    check = api['check']
-
-                api['jsonpath_info'] = jsonpath_count(
-                    case_list=[Case],
-                    temp_list=[],
-                    run_case=api_list
-                )
+        for api in api_list:
+            # 如果是none，代表人为终止；按依赖并发执行时，终止后序号更大的接口可能已执行，继续统计
+            if api['report']['is_executor'] is None:
+                continue
+
+            if api['report']['is_executor']:
+                report['result']['run_api'] += 1
+
+            if api['report']['result'] == 0:
+                report['result']['success'] += 1
+
+            if api['report']['result'] == 1:
+                report['result']['result'] = 1
+                report['result']['fail'] += 1
+
+            if api['report']['result'] == 2:
+                report['result']['skip'] += 1
+
+            if api['config'].get('stop'):
+                report['initiative_stop'] = True
+
+            if api['config'].get('fail_stop'):
+                report['fail_stop'] = True
+            response_time = api['response_info'][-1]['response_time']
+            max_time = report['time']['max_time']
+            report['time']['total_time'] += response_time
+            report['time']['max_time'] = response_time if response_time > max_time else max_time
+
+            # 获取jsonpath数据
+            class Case:
+                number = api['api_info']['number']
+                path = api['history']['path']
+                params = api['history']['params']
+                data = api['history']['data']
+                headers = api['history']['headers']
+                check = api['check']
+
+            api['jsonpath_info'] = jsonpath_count(
+                case_list=[Case],
+                temp_list=[],
+                run_case=api_list
+            )
 
-                # 附件较大，不保留到日志中，仅保留概要信息
-                if api['api_info']['file']:
-                    api['request_info']['data'] = [
-                        {
-                            'name': file['name'],
-                            'content_type': file['contentType'],
-                            'filename': file['fileName']
-
-                        } for file in api['api_info']['file_data']
-                    ]
-                    api['api_info']['file_data'] = []
-            else:
+            # 附件较大，不保留到日志中，仅保留概要信息
+            if api['api_info']['file']:
+                api['request_info']['data'] = [
+                    {
+                        'name': file['name'],
+                        'content_type': file['contentType'],
+                        'filename': file['fileName']
+
+                    } for file in api['api_info']['file_data']
+                ]
+                api['api_info']['file_data'] = []
+        else:
+            if report['result']['run_api']:
                 report['time']['avg_time'] = report['time']['total_time'] / report['result']['run_api']
 
-            # 写入报告列表
-            db_data = await report_crud.create_api_list(db=self._db, data=report_schemas.ApiReportListInt(**report))
-            # 写入详情列表
-            await report_crud.create_api_detail(
-                db=self._db,
-                data=[x for x in api_list if x['report']['is_executor'] is not None],
-                report_id=db_data.id
-            )
-            # 更新用例次数
-            await run_crud.update_test_case_order(
-                db=self._db,
-                case_id=report['case_id'],
-                is_fail={0: False, 1: True}.get(report['result']['result'])
-            )
+        return report
 
-            self.report_list.append(report)
-            CASE_RESPONSE[report['case_id']] = copy.deepcopy(api_list)
-
-    async def _run_api(self, api_list: list, key_id: str):
+    async def _run_api(self, api_list: list, key_id: str, cookie: dict = None, dag: bool = False):
         """
         执行用例
         :param api_list:
         :param key_id:
+        :param cookie: 用例使用的cookie缓存，不传时共用执行器的cookie
+        :param dag: 按接口间的依赖关系并发执行
         :return:
         """
-        sees = aiohttp.client.ClientSession(timeout=aiohttp.ClientTimeout(total=120))
+        cookie = self._cookie if cookie is None else cookie
+        sees = http_session(total=120)
         data_processing = DataProcessing(db=self._db)
         logger.info(
             f"{'=' * 30}{api_list[0]['api_info']['temp_name']}-{api_list[0]['api_info']['case_name']}{'=' * 30}"
         )
-        for i, api in enumerate(api_list):
-            # 处理请求相关的jsonpath数据
-            (
-                api['request_info']['url'],
-                api['request_info']['params'],
-                api['request_info'][api['api_info']['json_body']],
-                api['request_info']['headers'],
-                api['check']
-            ) = await data_processing.processing(
-                url=api['request_info']['url'],
-                params=api['request_info']['params'],
-                data=api['request_info'].get('data') or api['request_info'].get('json'),
-                headers=replace_headers(  # 将用例中的headers临时替换到模板中
-                    cookie=self._cookie.get(
-                        api['api_info']['host'],
-                        api['history']['headers'].get(
-                            'Cookie',
-                            api['history']['headers'].get(
-                                'cookie',
-                                api['request_info']['headers'].get(
-                                    'Cookie',
-                                    api['request_info']['headers'].get('cookie', '')
-                                )
-                            )
-                        ) if not api['config'].get('is_login') else ''
-                    ),
-                    tmp_header=api['request_info']['headers'],
-                    case_header=api['history']['headers'],
-                    tmp_file=api['api_info']['file']
-                ),
-                check=api['check'],
+        if dag:
+            await self._run_dag(
                 api_list=api_list,
-                customize=await check_customize(self._setting_info_dict.get('customize', {})),
+                key_id=key_id,
+                cookie=cookie,
+                sees=sees,
+                data_processing=data_processing
             )
+            asyncio.create_task(del_status(key_id=key_id))
+            await sees.close()
+            return
 
-            # 处理附件上传
-            if api['api_info']['file']:
-                files_data = FormData()
-                for file in api['api_info']['file_data']:
-                    files_data.add_field(
-                        name=file['name'],
-                        value=base64.b64decode(file['value'].encode('utf-8')),
-                        content_type=file['contentType'],
-                        filename=file['fileName'].encode().decode('unicode_escape')
-                    )
-                api['request_info']['data'] = files_data
-
-            # 跳过用例执行
-            if api['config'].get('skip'):
-                api['response_info'] = [
-                    {
-                        'status_code': 0,
-                        'response_time': 0,
-                        'response': {},
-                        'headers': {},
-                    }
-                ]
-                result = await self._assert(
-                    check=api['check'],
-                    response=api['response_info'][-1]['response'],
-                    skip=True
-                )
-                api['assert_info'].append(result)
-
-            # ⬜️================== 🍉轮询发起请求，单接口的默认间隔时间超过5s，每次请求间隔5s进行轮询🍉 ==================⬜️ #
-            sleep = api['config']['sleep']
-            res = None
-            while not api['config'].get('skip'):
-                response_info = {
-                    'status_code': 0,
-                    'response_time': 0,
-                    'response': {},
-                    'headers': {},
-                }
-                start_time = time.monotonic()
-                try:
-                    res = await sees.request(**api['request_info'], allow_redirects=False)
-                except client_exceptions.ClientError:
-                    response_info['response_time'] = time.monotonic() - start_time
-                    response_info['response']['status_code'] = 9999
-                    response_info['status_code'] = 9999
-                else:
-                    try:
-                        response_info['response'] = await res.json(
-                            content_type='application/json' if not api['api_info']['file'] else None
-                        ) or {}
-                    except (client_exceptions.ContentTypeError, json.decoder.JSONDecodeError):
-                        response_info['response'] = {}
-                    # 循环请求中的信息收集
-                    response_info['status_code'] = res.status
-                    response_info['response_time'] = time.monotonic() - start_time
-                    response_info['headers'] = dict(res.headers)
-
-                    # 断言结果
-                    if not isinstance(response_info['response'], (dict, list)):
-                        response_info['response'] = [{'status_code': res.status}, response_info['response']]
-                    else:
-                        response_info['response']['status_code'] = res.status
-
-                api['response_info'].append(response_info)
-
-                # 处理响应
-                result = await self._assert(check=api['check'], response=response_info['response'])
-                api['assert_info'].append(result)
-                try:
-                    del response_info['response']['status_code']
-                except TypeError:
-                    response_info['response'] = response_info['response'][-1]
-
-                # 判断退出while条件
-                if any([
-                    sleep <= 5,
-                    CASE_STATUS.get(key_id, {}).get('stop'),
-                    not [x for x in api['assert_info'][-1] if x['result'] == 1]  # 判断断言结果，没有失败则退出循环，不继续轮询
-                ]):
-                    break
-                else:
-                    if i <= len(api_list) - 2:
-                        await self._case_status(api=api, key_id=key_id, total=len(api_list), retry=True)
-                    sleep -= 5
-                    await asyncio.sleep(5)
-            # ⬜️================== 🍉轮询结束请求，单接口的默认间隔时间超过5s，每次请求间隔5s进行轮询🍉 ==================⬜️ #
-
-            # 记录cookie
-            if res and api['config'].get('is_login'):
-                self._cookie[api['api_info']['host']] = await get_cookie(rep_type='aiohttp', response=res)
-
-            # 轮询结束后，记录单接口执行结果
-            api['report']['result'] = self._assert_info(api['assert_info'][-1])
-            api['report']['is_executor'] = True if not api['config'].get('skip') else False
-            logger.info(
-                f"{api['api_info']['case_id']}-({api['api_info']['number']}/{len(api_list) - 1})-"
-                f"{api['request_info']['url']} {dict({0: 'SUCCESS', 1: 'FAIL', 2: 'SKIP'}).get(api['report']['result'])}"
+        for i, api in enumerate(api_list):
+            is_stop = await self._run_step(
+                i=i,
+                api=api,
+                api_list=api_list,
+                key_id=key_id,
+                cookie=cookie,
+                sees=sees,
+                data_processing=data_processing
             )
 
             # 退出循环执行的判断
-            if any([
-                # 主动停止
-                api['config'].get('stop'),
-                # 手动停止
-                CASE_STATUS.get(key_id, {}).get('stop'),
-                # 执行失败停止
-                all([
-                    setting['global_fail_stop'],  # 配置中的失败停止总开关：开
-                    api['config'].get('fail_stop'),  # 单接口配置失败停止：开
-                    api['report']['result'] == 1  # 单接口结果：失败
-                ]),
-            ]):
+            if is_stop:
                 api['api_info']['run_status'] = False  # 标记停止运行的接口
                 if i <= len(api_list) - 2:
                     await self._case_status(api=api, key_id=key_id, total=len(api_list))
@@ -451,6 +368,223 @@ class ExecutorService(ApiBase):
         asyncio.create_task(del_status(key_id=key_id))
         await sees.close()
 
+    async def _run_dag(self, api_list: list, key_id: str, cookie: dict, sees, data_processing: DataProcessing):
+        """
+        按依赖关系执行用例：没有依赖关系的接口并发执行，耗时接近关键路径
+        :param api_list:
+        :param key_id:
+        :param cookie:
+        :param sees:
+        :param data_processing:
+        :return:
+        """
+        depends = step_depends(api_list=api_list)
+        done = [asyncio.Event() for _ in api_list]
+        stop = asyncio.Event()
+
+        async def _run(i: int, api: dict):
+            try:
+                for x in depends[i]:
+                    await done[x].wait()
+                if stop.is_set() or CASE_STATUS.get(key_id, {}).get('stop'):
+                    return
+
+                is_stop = await self._run_step(
+                    i=i,
+                    api=api,
+                    api_list=api_list,
+                    key_id=key_id,
+                    cookie=cookie,
+                    sees=sees,
+                    data_processing=data_processing
+                )
+                if is_stop:
+                    api['api_info']['run_status'] = False  # 标记停止运行的接口
+                    stop.set()
+                elif api['config'].get('sleep') <= 5:
+                    await asyncio.sleep(api['config']['sleep'])  # 业务场景用例执行下，默认的间隔时间
+
+                if i <= len(api_list) - 2:
+                    await self._case_status(api=api, key_id=key_id, total=len(api_list))
+            finally:
+                done[i].set()
+
+        await asyncio.gather(*[_run(i, api) for i, api in enumerate(api_list)])
+
+        if not stop.is_set():
+            api_list[-1]['api_info']['run_status'] = False  # 标记停止运行的接口
+            if api_list[-1]['report']['is_executor'] is not None:
+                await self._case_status(api=api_list[-1], key_id=key_id, total=len(api_list))
+
+    async def _run_step(
+            self,
+            i: int,
+            api: dict,
+            api_list: list,
+            key_id: str,
+            cookie: dict,
+            sees,
+            data_processing: DataProcessing
+    ) -> bool:
+        """
+        执行单个接口
+        :param i:
+        :param api:
+        :param api_list:
+        :param key_id:
+        :param cookie:
+        :param sees:
+        :param data_processing:
+        :return: 是否需要停止执行后面的接口
+        """
+        # 处理请求相关的jsonpath数据
+        (
+            api['request_info']['url'],
+            api['request_info']['params'],
+            api['request_info'][api['api_info']['json_body']],
+            api['request_info']['headers'],
+            api['check']
+        ) = await data_processing.processing(
+            url=api['request_info']['url'],
+            params=api['request_info']['params'],
+            data=api['request_info'].get('data') or api['request_info'].get('json'),
+            headers=replace_headers(  # 将用例中的headers临时替换到模板中
+                cookie=cookie.get(
+                    api['api_info']['host'],
+                    api['history']['headers'].get(
+                        'Cookie',
+                        api['history']['headers'].get(
+                            'cookie',
+                            api['request_info']['headers'].get(
+                                'Cookie',
+                                api['request_info']['headers'].get('cookie', '')
+                            )
+                        )
+                    ) if not api['config'].get('is_login') else ''
+                ),
+                tmp_header=api['request_info']['headers'],
+                case_header=api['history']['headers'],
+                tmp_file=api['api_info']['file']
+            ),
+            check=api['check'],
+            api_list=api_list,
+            customize=self._customize,
+        )
+
+        # 处理附件上传
+        if api['api_info']['file']:
+            files_data = FormData()
+            for file in api['api_info']['file_data']:
+                files_data.add_field(
+                    name=file['name'],
+                    value=base64.b64decode(file['value'].encode('utf-8')),
+                    content_type=file['contentType'],
+                    filename=file['fileName'].encode().decode('unicode_escape')
+                )
+            api['request_info']['data'] = files_data
+
+        # 跳过用例执行
+        if api['config'].get('skip'):
+            api['response_info'] = [
+                {
+                    'status_code': 0,
+                    'response_time': 0,
+                    'response': {},
+                    'headers': {},
+                }
+            ]
+            result = await self._assert(
+                check=api['check'],
+                response=api['response_info'][-1]['response'],
+                skip=True
+            )
+            api['assert_info'].append(result)
+
+        # ⬜️================== 🍉轮询发起请求，单接口的默认间隔时间超过5s，每次请求间隔5s进行轮询🍉 ==================⬜️ #
+        sleep = api['config']['sleep']
+        res = None
+        while not api['config'].get('skip'):
+            response_info = {
+                'status_code': 0,
+                'response_time': 0,
+                'response': {},
+                'headers': {},
+            }
+            start_time = time.monotonic()
+            try:
+                res = await sees.request(**api['request_info'], allow_redirects=False)
+            except client_exceptions.ClientError:
+                response_info['response_time'] = time.monotonic() - start_time
+                response_info['response']['status_code'] = 9999
+                response_info['status_code'] = 9999
+            else:
+                try:
+                    response_info['response'] = await res.json(
+                        content_type='application/json' if not api['api_info']['file'] else None
+                    ) or {}
+                except (client_exceptions.ContentTypeError, json.decoder.JSONDecodeError):
+                    response_info['response'] = {}
+                # 循环请求中的信息收集
+                response_info['status_code'] = res.status
+                response_info['response_time'] = time.monotonic() - start_time
+                response_info['headers'] = dict(res.headers)
+
+                # 断言结果
+                if not isinstance(response_info['response'], (dict, list)):
+                    response_info['response'] = [{'status_code': res.status}, response_info['response']]
+                else:
+                    response_info['response']['status_code'] = res.status
+
+            api['response_info'].append(response_info)
+
+            # 处理响应
+            result = await self._assert(check=api['check'], response=response_info['response'])
+            api['assert_info'].append(result)
+            try:
+                del response_info['response']['status_code']
+            except TypeError:
+                response_info['response'] = response_info['response'][-1]
+
+            # 判断退出while条件
+            if any([
+                sleep <= 5,
+                CASE_STATUS.get(key_id, {}).get('stop'),
+                not [x for x in api['assert_info'][-1] if x['result'] == 1]  # 判断断言结果，没有失败则退出循环，不继续轮询
+            ]):
+                break
+            else:
+                if i <= len(api_list) - 2:
+                    await self._case_status(api=api, key_id=key_id, total=len(api_list), retry=True)
+                sleep -= 5
+                await asyncio.sleep(5)
+        # ⬜️================== 🍉轮询结束请求，单接口的默认间隔时间超过5s，每次请求间隔5s进行轮询🍉 ==================⬜️ #
+
+        # 记录cookie
+        if res and api['config'].get('is_login'):
+            cookie[api['api_info']['host']] = await get_cookie(rep_type='aiohttp', response=res)
+
+        # 轮询结束后，记录单接口执行结果
+        api['report']['result'] = self._assert_info(api['assert_info'][-1])
+        api['report']['is_executor'] = True if not api['config'].get('skip') else False
+        logger.info(
+            f"{api['api_info']['case_id']}-({api['api_info']['number']}/{len(api_list) - 1})-"
+            f"{api['request_info']['url']} {dict({0: 'SUCCESS', 1: 'FAIL', 2: 'SKIP'}).get(api['report']['result'])}"
+        )
+
+        # 退出循环执行的判断
+        return any([
+            # 主动停止
+            api['config'].get('stop'),
+            # 手动停止
+            CASE_STATUS.get(key_id, {}).get('stop'),
+            # 执行失败停止
+            all([
+                setting['global_fail_stop'],  # 配置中的失败停止总开关：开
+                api['config'].get('fail_stop'),  # 单接口配置失败停止：开
+                api['report']['result'] == 1  # 单接口结果：失败
+            ]),
+        ])
+
     async def _assert(self, check: dict, response: dict, skip: bool = False):
         """
         校验结果
@@ -460,16 +594,18 @@ class ExecutorService(ApiBase):
         :return:
         """
         result = []
+        # 从响应信息获取需要的值，所有key一次遍历
+        response_value = jsonpath_first(
+            response,
+            [k for k, v in check.items() if not (isinstance(v, list) and 'sql_' == k[:4])]
+        )
         for k, v in check.items():
             if isinstance(v, list) and 'sql_' == k[:4]:
                 # 从数据库获取实际的值
                 sql_data = await self._sql_data(v[1], self._setting_info_dict.get('db', {}))
                 value = sql_data[0]
             else:
-                # 从响应信息获取需要的值
-                value = jsonpath.jsonpath(response, f'$..{k}')
-                if value:
-                    value = value[0]
+                value = response_value[k]
 
             # 校验结果
             is_fail = await AssertCase.assert_case(
@@ -498,10 +634,19 @@ class ExecutorService(ApiBase):
         if db_config.get('name'):
             del db_config['name']
 
-        async with AsyncMySql(db_config) as s:
+        async with AsyncMySql(db_config, pool=True) as s:
             sql_data = await s.select(sql=sql)
             return [x[0] for x in sql_data] if sql_data else False
 
+    @staticmethod
+    def _hosts(api_list: list) -> set:
+        """
+        用例会访问的host
+        :param api_list:
+        :return:
+        """
+        return {x['api_info']['host'] for x in api_list}
+
     @staticmethod
     def _assert_info(assert_info: list):
         info_list = [x['result'] for x in assert_info]
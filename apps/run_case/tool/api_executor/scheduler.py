@@ -0,0 +1,148 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：scheduler.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/7 14:20
+"""
+
+import heapq
+import asyncio
+import itertools
+import contextlib
+from typing import Awaitable, Callable, Iterable, List, Tuple
+from tools.read_setting import setting
+
+
+class CaseScheduler:
+    """
+    用例调度器：全局并发上限 + 单host并发上限，排队的用例按优先级、先进先出的顺序获得执行槽位
+    """
+
+    def __init__(self, concurrency: int, host_concurrency: int):
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self._in_flight = 0
+        self._host_in_flight = {}
+        self._waiters = []  # (priority, seq, hosts, future)
+        self._pending = 0
+        self._seq = itertools.count()
+
+    def _can_run(self, hosts: Tuple[str]) -> bool:
+        if self._in_flight >= self.concurrency:
+            return False
+        return all(self._host_in_flight.get(x, 0) < self.host_concurrency for x in hosts)
+
+    def _take(self, hosts: Tuple[str]):
+        self._in_flight += 1
+        for x in hosts:
+            self._host_in_flight[x] = self._host_in_flight.get(x, 0) + 1
+
+    def _release(self, hosts: Tuple[str]):
+        self._in_flight -= 1
+        for x in hosts:
+            self._host_in_flight[x] -= 1
+            if not self._host_in_flight[x]:
+                del self._host_in_flight[x]
+        self._wake()
+
+    def _wake(self):
+        """
+        按优先级唤醒排队的用例，host已满的用例继续排队，不阻塞后面其他host的用例
+        :return:
+        """
+        blocked = []
+        while self._waiters and self._in_flight < self.concurrency:
+            waiter = heapq.heappop(self._waiters)
+            _, _, hosts, future = waiter
+            if future.done():
+                continue
+            if self._can_run(hosts):
+                self._take(hosts)
+                future.set_result(None)
+            else:
+                blocked.append(waiter)
+        for waiter in blocked:
+            heapq.heappush(self._waiters, waiter)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, hosts: Iterable[str] = (), priority: int = 0):
+        """
+        获取一个执行槽位，退出时释放
+        :param hosts: 用例会访问的host
+        :param priority: 优先级，数值越小越先执行
+        :return:
+        """
+        hosts = tuple(sorted(set(hosts)))
+        if not self._waiters and self._can_run(hosts):
+            self._take(hosts)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), hosts, future))
+            self._wake()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release(hosts)
+                raise
+
+        try:
+            yield
+        finally:
+            self._release(hosts)
+
+    async def run(
+            self,
+            jobs: List[Tuple[Iterable[str], Callable[[], Awaitable]]],
+            concurrency: int = None,
+            priority: int = 0,
+    ) -> list:
+        """
+        批量执行用例，返回结果的顺序与jobs一致
+        :param jobs: [(hosts, 无参的协程函数)]
+        :param concurrency: 本次执行的并发上限，不超过全局上限
+        :param priority: 优先级
+        :return:
+        """
+        limit = asyncio.Semaphore(concurrency) if concurrency and concurrency > 0 else None
+
+        async def _run(hosts, func):
+            if limit is None:
+                async with self.slot(hosts=hosts, priority=priority):
+                    return await func()
+
+            # 等待本次执行的并发槽位时，也计入排队数量
+            self._pending += 1
+            try:
+                await limit.acquire()
+            finally:
+                self._pending -= 1
+            try:
+                async with self.slot(hosts=hosts, priority=priority):
+                    return await func()
+            finally:
+                limit.release()
+
+        return await asyncio.gather(*[_run(hosts, func) for hosts, func in jobs])
+
+    def status(self) -> dict:
+        """
+        调度器的运行状态
+        :return:
+        """
+        return {
+            'concurrency': self.concurrency,
+            'host_concurrency': self.host_concurrency,
+            'in_flight': self._in_flight,
+            'queue': self._pending + len([x for x in self._waiters if not x[3].done()]),
+            'hosts': dict(self._host_in_flight),
+        }
+
+
+SCHEDULER = CaseScheduler(
+    concurrency=setting['scheduler']['concurrency'],
+    host_concurrency=setting['scheduler']['host_concurrency'],
+)
@@ -10,7 +10,7 @@
 
 from tools import replace_data
 from sqlalchemy.ext.asyncio import AsyncSession
-from tools.faker_data import FakerData
+from tools.faker_data import FakerData, FakerPool
 
 
 class DataProcessing:
@@ -23,9 +23,10 @@ class DataProcessing:
             db: AsyncSession,
             code: str = None,
             extract: str = None,
+            faker_pool: FakerPool = None,
     ):
         self.db = db
-        self.fk = FakerData()
+        self.fk = FakerData(pool=faker_pool)
         self.code = code
         self.extract = extract
 
@@ -22,6 +22,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from apps.case_service import crud as case_crud
 from apps.template import crud as temp_crud
 from apps.whole_conf import crud as conf_crud
+from apps.whole_conf.tool import customize_map
 from apps.case_ui import crud as ui_crud
 from tools.read_setting import setting
 from apps.run_case.tool.handle_host import whole_host
@@ -33,20 +34,31 @@ from .handle_playwright import replace_playwright
 from apps.run_case.tool.api_executor.executor_service import ExecutorService
 
 
-async def run_service_case(db: AsyncSession, case_ids: list, setting_info_dict: dict = None, sync: bool = True):
+async def run_service_case(
+        db: AsyncSession,
+        case_ids: list,
+        setting_info_dict: dict = None,
+        sync: bool = True,
+        concurrency: int = None,
+        priority: int = 0,
+        dag: bool = False,
+):
     """
     执行业务流程用例
     :param db:
     :param case_ids:
     :param setting_info_dict：
     :param sync：
+    :param concurrency: 异步执行时的并发上限
+    :param priority: 排队优先级
+    :param dag: 用例内的接口按依赖关系并发执行
     :return:
     """
     executor = ExecutorService(db=db)
     await executor.collect_sql(case_ids=case_ids)
     await executor.collect_config(setting_info_dict=setting_info_dict)
     await executor.collect_req_data()
-    await executor.executor_api(sync=sync)
+    await executor.executor_api(sync=sync, concurrency=concurrency, priority=priority, dag=dag)
     await executor.collect_report()
 
     return executor.report_list
@@ -128,21 +140,16 @@ async def run_ui_case(
 
     # 从环境配置里面取数据
     setting_info_dict = SETTING_INFO_DICT.get(rut.setting_list_id, {})
-    customize = await check_customize(setting_info_dict.get('customize', {}))
+    customize = await customize_map(
+        db=db,
+        customize=await check_customize(setting_info_dict.get('customize', {}))
+    )
 
     # 自定参数提取
     temp_text = ui_temp_info[0].text
     replace_key: List[str] = re.compile(r'%{{(.*?)}}', re.S).findall(temp_text)
     for key in replace_key:
-        value = customize.get(key, '_')
-        if value == '_':
-            customize_info = await conf_crud.get_customize(
-                db=db,
-                key=key
-            )
-            value = customize_info[0].value if customize_info else None
-
-        temp_text = re.sub("%{{(.*?)}}", str(value), temp_text, count=1)
+        temp_text = re.sub("%{{(.*?)}}", str(customize.get(key)), temp_text, count=1)
 
     if rut.gather_id:
         case_info = await ui_crud.get_play_case_data(db=db, case_id=rut.gather_id, temp_id=rut.temp_id)
@@ -0,0 +1,63 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：step_dag.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/8 16:05
+"""
+
+import re
+from typing import List, Set
+from tools.read_setting import setting
+from apps.case_service.tool.jsonpath_count import json_count
+
+
+def step_depends(api_list: list) -> List[Set[int]]:
+    """
+    整理用例中每个接口依赖的接口序号
+    1、{{n.$.path}}、{{n.h$.path}} 引用了下标为n的接口的响应，依赖该接口
+    2、登录接口会刷新cookie，依赖前面所有的接口，后面的接口都依赖最近的登录接口
+    3、主动停止的接口、开启全局失败停止时配置了失败停止的接口，后面的接口都依赖它
+    :param api_list:
+    :return: 按api_list的下标，返回依赖的下标集合
+    """
+    depends = []
+    login, barrier = None, None
+    for i, api in enumerate(api_list):
+        refs = []
+        for data_type, data in (
+                ('path', api['history']['path']),
+                ('params', api['history']['params']),
+                ('data', api['history']['data']),
+                ('headers', api['history']['headers']),
+                ('headers', api['request_info']['headers']),
+                ('check', api['check']),
+        ):
+            refs += json_count(data, data_type, api['api_info']['number'])
+
+        step = set()
+        for path, _, _ in refs:
+            try:
+                index = int(re.sub('{{', '', path).split('.', 1)[0])
+            except ValueError:
+                continue
+            if index < i:
+                step.add(index)
+
+        if api['config'].get('is_login'):
+            step.update(range(i))
+        if login is not None:
+            step.add(login)
+        if barrier is not None:
+            step.add(barrier)
+
+        if api['config'].get('is_login'):
+            login = i
+        if api['config'].get('stop') or (setting['global_fail_stop'] and api['config'].get('fail_stop')):
+            barrier = i
+
+        depends.append(step)
+
+    return depends
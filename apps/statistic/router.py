@@ -7,9 +7,13 @@
 @Time: 2023/7/12-14:43
 """
 
+import time
+import datetime
+from typing import List
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends
-from .tool import api_free, ui_free
+from fastapi import APIRouter, Depends, Query
+from .tool import api_free, ui_free, to_columns, moving_percentiles, detect_regression, host_compare
 from depends import get_db
 
 from apps import response_code
@@ -17,7 +21,7 @@ from apps.template import crud as temp_crud
 from apps.case_service import crud as case_crud
 from apps.case_ddt import crud as ddt_crud
 from apps.case_ui import crud as ui_crud
-from apps.api_report import crud as report_crud
+from apps.api_report import crud as report_crud, schemas as report_schemas
 
 statistic = APIRouter()
 
@@ -147,3 +151,100 @@ async def get_ui_count(db: AsyncSession = Depends(get_db)):
         'rows_today': sum(await ui_crud.get_rows(db=db, today=True)),
         'ddt_count': await ui_crud.get_ddt_count(db=db),
     }
+
+
+@statistic.get(
+    '/get/case/rollup',
+    name='获取用例按日期的汇总数据',
+    response_model=List[report_schemas.ApiReportRollupOut]
+)
+async def get_case_rollup(case_id: int, days: int = 30, db: AsyncSession = Depends(get_db)):
+    """
+    成功率、耗时按天汇总，由后台任务增量计算，不查询报告列表
+    """
+    rollup = await report_crud.get_case_rollup(
+        db=db,
+        case_id=case_id,
+        start_day=datetime.date.today() - datetime.timedelta(days=days - 1) if days else None
+    )
+    return [
+        {
+            **{k: getattr(x, k) for k in report_schemas.ApiReportRollupOut.__fields__ if hasattr(x, k)},
+            'pass_rate': round(x.success / x.runs, 4) if x.runs else 0,
+            'avg_time': x.total_time / x.runs if x.runs else 0,
+            'avg_api_time': x.total_time / x.run_api if x.run_api else 0,
+        } for x in rollup
+    ]
+
+
+@statistic.get(
+    '/get/latency/trend',
+    name='获取单个接口的耗时趋势',
+    response_class=response_code.MyJSONResponse,
+)
+async def get_latency_trend(
+        case_id: int,
+        number: int,
+        limit: int = Query(500, ge=1, description='最近的执行次数'),
+        window: int = Query(20, ge=1, description='滑动窗口的执行次数'),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    最近limit次执行的耗时，按列返回，附带window次的滑动百分位耗时
+    """
+    columns = to_columns(await report_crud.get_api_step(db=db, case_id=case_id, number=number, limit=limit))
+    return await response_code.resp_200(data={
+        'run_number': columns['run_number'].tolist(),
+        'ts': columns['ts'].tolist(),
+        'status': columns['status'].tolist(),
+        'response_time': [None if np.isnan(x) else x for x in columns['response_time'].tolist()],
+        **moving_percentiles(columns['response_time'], window=window),
+    })
+
+
+@statistic.get(
+    '/get/latency/regression',
+    name='检测用例接口的耗时退化',
+    response_class=response_code.MyJSONResponse,
+)
+async def get_latency_regression(
+        case_id: int,
+        number: int = None,
+        limit: int = Query(500, ge=1, description='最近的执行次数'),
+        window: int = Query(20, ge=1, description='滑动窗口的执行次数'),
+        threshold: float = Query(0.2, ge=0, description='中位数增加的比例'),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    每个接口最近window次的耗时中位数与之前window次对比，增加超过threshold视为退化
+    """
+    columns = to_columns(await report_crud.get_api_step(db=db, case_id=case_id, number=number, limit=limit))
+    numbers, start = np.unique(columns['number'], return_index=True)
+    end = np.append(start[1:], len(columns['number']))
+    return await response_code.resp_200(data=[
+        {
+            'number': int(n),
+            **detect_regression(
+                columns['run_number'][s:e], columns['response_time'][s:e], window=window, threshold=threshold
+            ),
+        } for n, s, e in zip(numbers, start, end)
+    ])
+
+
+@statistic.get(
+    '/get/latency/hosts',
+    name='按请求域名对比耗时',
+    response_class=response_code.MyJSONResponse,
+)
+async def get_latency_hosts(
+        case_id: int = None,
+        number: int = None,
+        days: int = Query(7, ge=0, description='最近的天数，0为全部'),
+        db: AsyncSession = Depends(get_db)
+):
+    columns = to_columns(await report_crud.get_api_step(
+        db=db, case_id=case_id, number=number, start_ts=time.time() - days * 86400 if days else None
+    ))
+    return await response_code.resp_200(
+        data=host_compare(columns['host'], columns['status'], columns['response_time'])
+    )
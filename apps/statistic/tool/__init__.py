@@ -8,3 +8,4 @@
 """
 
 from .charts_free import api_free, ui_free
+from .latency_trend import to_columns, moving_percentiles, detect_regression, host_compare
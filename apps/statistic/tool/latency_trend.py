@@ -0,0 +1,127 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：latency_trend.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/21 16:30
+"""
+
+import warnings
+from typing import List, Sequence
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+PERCENTILES = (50, 90, 99)
+
+
+def _to_list(values: np.ndarray) -> list:
+    """
+    转为list，nan转为None
+    """
+    return [None if np.isnan(x) else round(float(x), 6) for x in values]
+
+
+def _nan_percentile(values: np.ndarray, q, axis=None) -> np.ndarray:
+    # 窗口内全部没有耗时时结果为nan，不输出警告
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanpercentile(values, q, axis=axis)
+
+
+def to_columns(rows: Sequence[tuple]) -> dict:
+    """
+    接口耗时记录按列转为数组
+    :param rows: get_api_step的结果
+    :return:
+    """
+    return {
+        'case_id': np.fromiter((x[0] for x in rows), dtype=np.int64, count=len(rows)),
+        'number': np.fromiter((x[1] for x in rows), dtype=np.int64, count=len(rows)),
+        'run_number': np.fromiter((x[2] for x in rows), dtype=np.int64, count=len(rows)),
+        'ts': np.fromiter((x[3] for x in rows), dtype=np.float64, count=len(rows)),
+        'host': np.array([x[4] or '' for x in rows], dtype=object),
+        'status': np.fromiter((x[5] for x in rows), dtype=np.int64, count=len(rows)),
+        'response_time': np.fromiter(
+            (np.nan if x[7] is None else x[7] for x in rows), dtype=np.float64, count=len(rows)
+        ),
+    }
+
+
+def moving_percentiles(times: np.ndarray, window: int, qs: Sequence[int] = PERCENTILES) -> dict:
+    """
+    滑动窗口的百分位耗时，前window-1个点使用已有的数据计算
+    :param times: 按运行编号排序的耗时
+    :param window:
+    :param qs:
+    :return: {'p50': [], ...}
+    """
+    n = len(times)
+    if not n:
+        return {f'p{q}': [] for q in qs}
+
+    window = max(min(window, n), 1)
+    head = [_nan_percentile(times[:i + 1], qs) for i in range(window - 1)]
+    body = _nan_percentile(sliding_window_view(times, window), qs, axis=1)
+    result = np.concatenate([np.array(head).T.reshape(len(qs), -1), body], axis=1)
+    return {f'p{q}': _to_list(result[i]) for i, q in enumerate(qs)}
+
+
+def detect_regression(run_numbers: np.ndarray, times: np.ndarray, window: int, threshold: float) -> dict:
+    """
+    耗时退化检测：每个点的窗口中位数与前一个窗口的中位数对比，超过1+threshold倍视为退化
+    :param run_numbers:
+    :param times: 按运行编号排序的耗时
+    :param window:
+    :param threshold: 0.2即中位数增加20%
+    :return:
+    """
+    n = len(times)
+    if n < window * 2:
+        return {'baseline': None, 'recent': None, 'ratio': None, 'regressed': False, 'change_runs': []}
+
+    medians = _nan_percentile(sliding_window_view(times, window), 50, axis=1)
+    # medians[i]是以第i+window-1个点结尾的窗口，与前一个不重叠的窗口对比
+    recent, baseline = medians[window:], medians[:-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = recent / baseline
+    over = ratio > 1 + threshold
+    # 只记录开始退化的点
+    start = over & ~np.concatenate([[False], over[:-1]])
+    change_runs = run_numbers[window * 2 - 1:][start]
+    return {
+        'baseline': _to_list(baseline[-1:])[0],
+        'recent': _to_list(recent[-1:])[0],
+        'ratio': _to_list(ratio[-1:])[0],
+        'regressed': bool(over[-1]),
+        'change_runs': [int(x) for x in change_runs],
+    }
+
+
+def host_compare(hosts: np.ndarray, status: np.ndarray, times: np.ndarray, qs: Sequence[int] = PERCENTILES) -> List[dict]:
+    """
+    按请求域名对比耗时和失败率
+    :param hosts:
+    :param status:
+    :param times:
+    :param qs:
+    :return:
+    """
+    result = []
+    names, index = np.unique(hosts.astype(str), return_inverse=True)
+    for i, name in enumerate(names):
+        mask = index == i
+        host_times = times[mask]
+        valid = host_times[~np.isnan(host_times)]
+        percentiles = _nan_percentile(host_times, qs) if len(valid) else [np.nan] * len(qs)
+        result.append({
+            'host': name,
+            'count': int(mask.sum()),
+            'fail': int((status[mask] == 1).sum()),
+            'fail_rate': round(float((status[mask] == 1).mean()), 4),
+            'avg_time': _to_list(np.array([valid.mean() if len(valid) else np.nan]))[0],
+            'max_time': _to_list(np.array([valid.max() if len(valid) else np.nan]))[0],
+            **{f'p{q}': x for q, x in zip(qs, _to_list(np.asarray(percentiles, dtype=np.float64)))},
+        })
+    return result
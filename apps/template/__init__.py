@@ -6,3 +6,9 @@
 @File: __init__.py.py
 @Time: 2022/8/4-15:21
 """
+
+# 运行中的mock服务
+MOCK_SERVERS = {
+    # key：port
+    # value: MockServer
+}
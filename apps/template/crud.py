@@ -358,6 +358,38 @@ async def del_template_data(db: AsyncSession, temp_id: int, number: int):
     await db.commit()
 
 
+async def del_template_api(db: AsyncSession, temp_id: int, number: int):
+    """
+    删除模板的一个接口，后面的接口序号减一，接口数量减一，不提交事务
+    :param db:
+    :param temp_id:
+    :param number:
+    :return:
+    """
+    await db.execute(
+        delete(models.TemplateData).where(
+            models.TemplateData.temp_id == temp_id,
+            models.TemplateData.number == number
+        ).execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(models.TemplateData).where(
+            models.TemplateData.temp_id == temp_id,
+            models.TemplateData.number > number
+        ).values(
+            number=models.TemplateData.number - 1
+        ).execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(models.Template).where(
+            models.Template.id == temp_id,
+            models.Template.api_count > 0
+        ).values(
+            api_count=models.Template.api_count - 1
+        ).execution_options(synchronize_session=False)
+    )
+
+
 async def get_all_temp_name(db: AsyncSession, temp_ids):
     """
     获取所有的模板名称
@@ -25,14 +25,15 @@ from depends import get_db
 from apps.case_service import (
     schemas as service_schemas
 )
-from apps.template import crud, schemas
+from apps.template import crud, schemas, MOCK_SERVERS
 from apps.case_service import schemas as case_schemas
 from apps.case_service import crud as case_crud
 from apps.template.tool import ParseData, check_num, GenerateCase, InsertTempData, DelTempData, ReadSwagger
-from apps.case_service.tool import refresh, temp_to_case
+from apps.case_service.tool import refresh, refresh_cases, temp_to_case
 from apps.whole_conf import crud as conf_crud
 from tools import CreateExcel, OperationJson, compare_data, apply_changes
 from .tool import send_api, get_jsonpath, del_debug, curl_to_request_kwargs
+from .tool.mock_server import create_mock_server
 
 template = APIRouter()
 
@@ -688,31 +689,16 @@ async def del_api(temp_id: int, number: int, db: AsyncSession = Depends(get_db))
     if not temp_info:
         return await response_code.resp_400(message='没有获取到这个模板api数据')
 
-    # 删除数据
-    await crud.del_template_data(db=db, temp_id=temp_id, number=number)
-    api_count = await crud.get_temp_name(db=db, temp_id=temp_id)
-    await crud.update_template(
-        db=db,
-        temp_id=temp_id,
-        api_count=api_count[0].api_count - 1 if api_count[0].api_count - 1 >= 0 else 0
-    )
-
-    # 重新对number进行编号
-    number_info = await crud.get_temp_numbers(db=db, temp_id=temp_id, number=number + 1)
-    for i, x in enumerate(number_info):
-        await crud.update_template_data(db=db, temp_id=temp_id, id_=x.id, new_number=x.number - 1)
-
-    # 对用例进行操作
-    for case in await case_crud.get_case(db=db, temp_id=temp_id):
-        # 删除数据
-        await case_crud.del_test_case_data(db=db, case_id=case.id, number=number)
-        await case_crud.update_test_case(
-            db=db,
-            case_id=case.id,
-            case_count=case.case_count - 1 if case.case_count - 1 >= 0 else 0
-        )
-
-        await refresh(db=db, case_id=case.id, start_number=number, type_='del')
+    # 模板和用例的删除、重新编号在一个事务中批量执行
+    case_ids = [x.id for x in await case_crud.get_case(db=db, temp_id=temp_id)]
+    try:
+        await crud.del_template_api(db=db, temp_id=temp_id, number=number)
+        await case_crud.del_temp_case_data(db=db, temp_id=temp_id, number=number)
+        await refresh_cases(db=db, case_ids=case_ids, start_number=number, type_='del')
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
 
     return await response_code.resp_200()
 
@@ -942,3 +928,50 @@ async def put_sync_api_data(
         await crud.save_temp_info(db=db, detail_id=ssd.detail_id, headers=rep_data, api_type=ssd.api_type)
 
     return await response_code.resp_200(data=rep_data)
+
+
+@template.post(
+    '/mock/start',
+    response_class=response_code.MyJSONResponse,
+    name='启动模板的mock服务',
+    description='按模板录制的状态码、响应头和响应数据启动mock服务，可注入固定延迟和随机抖动'
+)
+async def mock_start(ms: schemas.MockStart, db: AsyncSession = Depends(get_db)):
+    if ms.latency < 0 or ms.jitter < 0:
+        return await response_code.resp_400(message='延迟参数错误')
+    if ms.port in MOCK_SERVERS:
+        return await response_code.resp_400(message=f'端口{ms.port}已经有mock服务在运行')
+
+    server = await create_mock_server(db=db, **ms.dict())
+    if not server.info()['apis']:
+        return await response_code.resp_400(message='没有获取到这个模板的接口数据')
+
+    try:
+        await server.start()
+    except OSError as e:
+        return await response_code.resp_400(message=f'mock服务启动失败: {e}')
+
+    MOCK_SERVERS[ms.port] = server
+    return await response_code.resp_200(data=server.info())
+
+
+@template.get(
+    '/mock/list',
+    response_class=response_code.MyJSONResponse,
+    name='运行中的mock服务'
+)
+async def mock_list():
+    return await response_code.resp_200(data=[x.info() for x in MOCK_SERVERS.values()])
+
+
+@template.delete(
+    '/mock/stop',
+    response_class=response_code.MyJSONResponse,
+    name='停止mock服务'
+)
+async def mock_stop(port: int):
+    if port not in MOCK_SERVERS:
+        return await response_code.resp_400(message='这个端口没有运行中的mock服务')
+
+    await MOCK_SERVERS.pop(port).stop()
+    return await response_code.resp_200()
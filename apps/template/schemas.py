@@ -152,3 +152,11 @@ class SetSyncData(BaseModel):
     sync_data: dict
     data_type: str
     api_type: str
+
+
+class MockStart(BaseModel):
+    temp_id: int
+    host: str = '127.0.0.1'  # 监听地址
+    port: int = 18080  # 监听端口
+    latency: float = 0  # 每个请求的固定延迟(秒)
+    jitter: float = 0  # 在固定延迟上增加的随机延迟上限(秒)
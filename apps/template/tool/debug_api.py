@@ -9,13 +9,13 @@
 
 import copy
 import json
-import aiohttp
 from aiohttp import client_exceptions
 from sqlalchemy.ext.asyncio import AsyncSession
 from apps.template import schemas
 from apps import response_code
+from apps.whole_conf.tool import customize_map
 from tools import get_cookie as cookie_info
-from tools import ExtractParamsPath, replace_data, FakerData
+from tools import ExtractParamsPath, replace_data, FakerData, http_session
 
 RESPONSE_INFO = {}
 COOKIE_INFO = {}
@@ -54,6 +54,7 @@ async def send_api(db: AsyncSession, api_info: schemas.TemplateDataInTwo, get_co
             )
 
     fk = FakerData()
+    customize = await customize_map(db=db, customize={})
     # 识别url表达式
     url = await replace_data.replace_url(
         db=db,
@@ -62,7 +63,7 @@ async def send_api(db: AsyncSession, api_info: schemas.TemplateDataInTwo, get_co
         faker=fk,
         code='',
         extract='',
-        customize={}
+        customize=customize
     )
     # 识别params表达式
     params = await replace_data.replace_params_data(
@@ -72,7 +73,7 @@ async def send_api(db: AsyncSession, api_info: schemas.TemplateDataInTwo, get_co
         faker=fk,
         code='',
         extract='',
-        customize={}
+        customize=customize
     )
     # 识别data表达式
     data = await replace_data.replace_params_data(
@@ -82,7 +83,7 @@ async def send_api(db: AsyncSession, api_info: schemas.TemplateDataInTwo, get_co
         faker=fk,
         code='',
         extract='',
-        customize={}
+        customize=customize
     )
     # 识别headers中的表达式
     case_header = await replace_data.replace_params_data(
@@ -90,7 +91,7 @@ async def send_api(db: AsyncSession, api_info: schemas.TemplateDataInTwo, get_co
         data=api_info.headers,
         api_list=[],
         faker=fk,
-        customize={}
+        customize=customize
     )
 
     req_data = {
@@ -101,7 +102,7 @@ async def send_api(db: AsyncSession, api_info: schemas.TemplateDataInTwo, get_co
         f"{'json' if api_info.json_body == 'json' else 'data'}": data,
     }
 
-    async with aiohttp.ClientSession() as sess:
+    async with http_session() as sess:
         try:
             async with sess.request(**req_data, allow_redirects=False) as res:
                 res_data = await res.json(content_type='application/json' if not api_info.file else None)
@@ -7,11 +7,11 @@
 @Time: 2022/8/18-16:39
 """
 
-import jsonpath
 from typing import List, Any
 from apps.template import schemas
 from apps.case_service.tool import my_auto_check
 from tools.tips import TIPS
+from tools.json_path import jsonpath_extract
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -101,9 +101,9 @@ class GenerateCase:
             for key in data.keys():
                 print(len(response))
                 for i, res in enumerate(response):
-                    value = jsonpath.jsonpath(res, f"$..{key}")
+                    value = jsonpath_extract(res, f"$..{key}")
                     if isinstance(value, list):
-                        ipath = jsonpath.jsonpath(res, f"$..{key}", result_type='IPATH')[0]
+                        ipath = jsonpath_extract(res, f"$..{key}", result_type='IPATH')[0]
                         if key.lower() == ipath[-1].lower() and data[key] == value[0] and value[0]:
                             target[key] = "{{" + f"{i}.$.{'.'.join(ipath)}" + "}}"
                             break
@@ -131,8 +131,31 @@ class GenerateCase:
     async def read_template_to_ddt(self):
         pass
 
-    async def read_template_to_perf(self):
-        pass
+    async def read_template_to_perf(
+            self,
+            db: AsyncSession,
+            temp_name: str,
+            template_data: List[schemas.TemplateDataOut]
+    ):
+        """
+        读取模板生成性能测试数据
+        与业务用例一致，压测时不需要接口间的等待时间，失败也不停止
+        :param db:
+        :param temp_name:
+        :param template_data:
+        :return:
+        """
+        test_data = await self.read_template_to_api(
+            db=db,
+            temp_name=temp_name,
+            mode='perf',
+            fail_stop=False,
+            template_data=template_data
+        )
+        for case_data in test_data['data']:
+            case_data['config']['sleep'] = 0
+
+        return test_data
 
 
 async def _auto_extract(
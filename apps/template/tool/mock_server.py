@@ -0,0 +1,202 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：mock_server.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/15 10:30
+
+按模板录制的响应启动mock服务，可以在项目内启动，也可以在项目根目录单独执行
+python -m apps.template.tool.mock_server --temp-id 1 --port 18080 --latency 0.01
+"""
+
+import json
+import random
+import asyncio
+import argparse
+from typing import List
+from aiohttp import web
+from tools import logger
+from tools.database import async_session_local
+from apps.template import crud
+
+# 不能原样返回的响应头，由mock服务重新生成
+_SKIP_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'connection', 'keep-alive', 'date', 'server'}
+
+
+class MockServer:
+    """
+    mock服务：按请求方法和路径返回模板数据中录制的状态码、响应头和响应数据
+    同一个接口录制了多次时按顺序轮流返回，支持注入固定延迟和随机抖动
+    """
+
+    def __init__(
+            self,
+            temp_id: int,
+            api_list: List[dict],
+            host: str = '127.0.0.1',
+            port: int = 18080,
+            latency: float = 0,
+            jitter: float = 0,
+    ):
+        """
+        :param temp_id: 模板id
+        :param api_list: 模板数据，需要method、path、code、response、response_headers
+        :param host: 监听地址
+        :param port: 监听端口
+        :param latency: 每个请求的固定延迟(秒)
+        :param jitter: 在固定延迟上增加0~jitter秒的随机延迟
+        """
+        self.temp_id = temp_id
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._routes = {}  # (method, path): [[响应序号], [(code, headers, body)]]
+        self._runner = None
+
+        for api in api_list:
+            key = (api['method'].upper(), api['path'])
+            if key not in self._routes:
+                self._routes[key] = [[0], []]
+            self._routes[key][1].append(self._response(api))
+
+    @staticmethod
+    def _response(api: dict) -> tuple:
+        """
+        预先序列化录制的响应
+        :param api:
+        :return:
+        """
+        headers = {k: v for k, v in (api.get('response_headers') or {}).items() if k.lower() not in _SKIP_HEADERS}
+        # 响应数据都按json返回，录制的非json响应保存为{}，不使用录制的Content-Type
+        if not any(k.lower() == 'content-type' and 'json' in str(v).lower() for k, v in headers.items()):
+            headers = {k: v for k, v in headers.items() if k.lower() != 'content-type'}
+            headers['Content-Type'] = 'application/json'
+        response = api['response'] if api.get('response') is not None else {}
+        body = json.dumps(response, ensure_ascii=False).encode('utf-8')
+        return api.get('code') or 200, headers, body
+
+    def _handler(self, responses: list):
+        async def handler(request: web.Request):
+            self.requests += 1
+            delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            index, items = responses
+            code, headers, body = items[index[0] % len(items)]
+            index[0] += 1
+            return web.Response(status=code, headers=headers, body=body)
+
+        return handler
+
+    def app(self) -> web.Application:
+        """
+        生成aiohttp应用
+        :return:
+        """
+        app = web.Application()
+        for (method, path), responses in self._routes.items():
+            try:
+                app.router.add_route(method, path if path.startswith('/') else f'/{path}', self._handler(responses))
+            except (ValueError, RuntimeError) as e:
+                logger.error(f"mock服务 跳过接口 {method} {path}: {e}")
+        return app
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def start(self):
+        """
+        在当前事件循环中启动
+        :return:
+        """
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except Exception:
+            await runner.cleanup()
+            raise
+        self._runner = runner
+        logger.info(f"mock服务 模板{self.temp_id} 启动: http://{self.host}:{self.port}")
+
+    async def stop(self):
+        """
+        停止服务
+        :return:
+        """
+        if self._runner is None:
+            return
+        await self._runner.cleanup()
+        self._runner = None
+        logger.info(f"mock服务 模板{self.temp_id} 停止: http://{self.host}:{self.port}")
+
+    def info(self) -> dict:
+        return {
+            'temp_id': self.temp_id,
+            'host': self.host,
+            'port': self.port,
+            'latency': self.latency,
+            'jitter': self.jitter,
+            'apis': len(self._routes),
+            'requests': self.requests,
+        }
+
+
+async def create_mock_server(db, temp_id: int, **kwargs) -> MockServer:
+    """
+    按模板id读取模板数据，创建mock服务
+    :param db:
+    :param temp_id:
+    :param kwargs: MockServer的参数
+    :return:
+    """
+    temp_data = await crud.get_template_data(db=db, temp_id=temp_id)
+    return MockServer(
+        temp_id=temp_id,
+        api_list=[
+            {
+                'method': x.method,
+                'path': x.path,
+                'code': x.code,
+                'response': x.response,
+                'response_headers': x.response_headers,
+            } for x in temp_data or []
+        ],
+        **kwargs
+    )
+
+
+async def _main(args: argparse.Namespace):
+    async with async_session_local() as db:
+        server = await create_mock_server(
+            db=db,
+            temp_id=args.temp_id,
+            host=args.host,
+            port=args.port,
+            latency=args.latency,
+            jitter=args.jitter,
+        )
+    await server.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='按模板录制的响应启动mock服务')
+    parser.add_argument('--temp-id', type=int, required=True, help='模板id')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=18080, help='监听端口')
+    parser.add_argument('--latency', type=float, default=0, help='固定延迟(秒)')
+    parser.add_argument('--jitter', type=float, default=0, help='随机抖动(秒)')
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
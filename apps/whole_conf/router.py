@@ -14,7 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from depends import get_db
 from apps.whole_conf import crud, schemas
 from apps import response_code
-from .tool import check, jsonpath_tips
+from .tool import check, jsonpath_tips, CUSTOMIZE_CACHE
 
 conf = APIRouter()
 
@@ -249,7 +249,9 @@ async def add_customize(conf_customize: schemas.ConfCustomizeIn, db: AsyncSessio
     except TypeError:
         return await response_code.resp_400(
             message=f"type: {conf_customize.type}和value: {conf_customize.value} 的类型不对应")
-    return await crud.create_customize(db=db, conf_customize=conf_customize)
+    db_info = await crud.create_customize(db=db, conf_customize=conf_customize)
+    CUSTOMIZE_CACHE.invalidate()
+    return db_info
 
 
 @conf.get(
@@ -277,6 +279,7 @@ async def update_customize(customize_id: int, conf_customize: schemas.ConfCustom
             message=f"type: {conf_customize.type}和value: {conf_customize.value} 的类型不对应")
 
     await crud.update_customize(db=db, id_=customize_id, conf_customize=conf_customize)
+    CUSTOMIZE_CACHE.invalidate()
     return await response_code.resp_200()
 
 
@@ -289,6 +292,7 @@ async def del_customize(customize_id: int, db: AsyncSession = Depends(get_db)):
         return await response_code.resp_400()
 
     await crud.del_customize(db=db, id_=customize_id)
+    CUSTOMIZE_CACHE.invalidate()
     return await response_code.resp_200()
 
 
@@ -7,4 +7,5 @@
 @Time: 2023/7/22-13:27
 """
 
-from .check_data import check
\ No newline at end of file
+from .check_data import check
+from .customize_map import CustomizeMap, CUSTOMIZE_CACHE, customize_map
\ No newline at end of file
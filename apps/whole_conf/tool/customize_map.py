@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：customize_map.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/17 10:20
+"""
+
+from collections.abc import Mapping
+from sqlalchemy.ext.asyncio import AsyncSession
+from apps.whole_conf import crud
+
+
+class CustomizeMap(Mapping):
+    """
+    执行期间使用的自定参数，只读
+    环境配置中的参数优先，其次是数据库中的自定参数，没有的key取值为None，替换时不再查询数据库
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data: dict):
+        self._data = data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __repr__(self):
+        return f'CustomizeMap({self._data!r})'
+
+
+class CustomizeCache:
+    """
+    数据库中自定参数的快照，/conf中修改自定参数后失效，下次使用时重新查询
+    """
+
+    def __init__(self):
+        self._data = None
+        self._generation = 0  # 查询期间快照失效时，不保存查询到的旧数据
+
+    async def get(self, db: AsyncSession) -> dict:
+        """
+        获取快照，同一个key有多条数据时取第一条
+        :param db:
+        :return: {key: value}
+        """
+        data = self._data
+        if data is None:
+            generation = self._generation
+            data = {}
+            for x in await crud.get_customize(db=db):
+                data.setdefault(x.key, x.value)
+            if generation == self._generation:
+                self._data = data
+        return data
+
+    def invalidate(self):
+        self._data = None
+        self._generation += 1
+
+
+CUSTOMIZE_CACHE = CustomizeCache()
+
+
+async def customize_map(db: AsyncSession, customize: dict) -> CustomizeMap:
+    """
+    合并数据库中的自定参数和环境配置中的自定参数
+    :param db:
+    :param customize: check_customize处理后的环境配置自定参数
+    :return:
+    """
+    return CustomizeMap({
+        **await CUSTOMIZE_CACHE.get(db=db),
+        # 与逐个查询一致：值为'_'时使用数据库中的值
+        **{k: v for k, v in customize.items() if v != '_'}
+    })
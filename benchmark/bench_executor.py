@@ -0,0 +1,314 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：bench_executor.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/16 10:10
+
+用例执行器的基准测试：在临时sqlite中生成模板和用例，用本地mock服务作为被测接口，
+按run_service_case的流程同步和异步执行用例，统计用例/秒、接口/秒、单个接口的引擎耗时(不含网络耗时)和内存峰值，
+结果保存为json，用--compare和之前的结果对比。在项目根目录执行
+python -m benchmark.bench_executor --cases 20 --steps 10 --rounds 3
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from sqlalchemy.ext.asyncio import create_async_engine
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+from tools import logger, close_http_pool
+from tools.database import async_session_local
+from tools.latency_histogram import LatencyHistogram
+from apps.base_model import Base
+from apps.template import models as temp_models
+from apps.case_service import models as case_models
+from apps.api_report import models as report_models  # noqa 建表
+from apps.api_report.tool import REPORT_WRITER
+from apps.template.tool.mock_server import MockServer
+from apps.run_case.tool.api_executor.executor_service import ExecutorService
+
+MODES = ('sync', 'async')
+
+
+class BenchExecutor(ExecutorService):
+    """
+    记录每个接口的引擎耗时：接口总耗时减去响应耗时
+    """
+
+    histogram = LatencyHistogram()
+
+    async def _run_step(self, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super(BenchExecutor, self)._run_step(**kwargs)
+        finally:
+            response_info = kwargs['api']['response_info']
+            response_time = response_info[-1]['response_time'] if response_info else 0
+            self.histogram.record(max(time.perf_counter() - start - response_time, 0))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _peak_rss() -> int:
+    """
+    进程的内存峰值(KB)
+    """
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def _response(number: int, body_size: int) -> dict:
+    return {
+        'code': 0,
+        'data': {
+            'id': number,
+            'token': f'token-{number}',
+            'items': [{'k': i, 'name': f'item-{i}'} for i in range(5)],
+            'blob': 'x' * body_size,
+        }
+    }
+
+
+def _case_data(number: int, fields: int, density: float) -> dict:
+    """
+    用例的请求数据：按密度引用前面接口的响应
+    """
+    refs = round(fields * density) if number else 0
+    data = {}
+    for i in range(fields):
+        if i < refs:
+            prev = (number - 1 - i) % number
+            data[f'f{i}'] = (
+                '{{%d.$.data.token}}', '{{%d.$.data.id}}', '{{%d.$.data.items[1].name}}'
+            )[i % 3] % prev
+        else:
+            data[f'f{i}'] = f'value-{i}'
+    return data
+
+
+async def seed(cases: int, steps: int, fields: int, body_size: int, density: float, host: str) -> tuple:
+    """
+    生成模板和用例
+    :return: (用例id列表, mock服务使用的模板数据)
+    """
+    api_list = [
+        {
+            'method': 'POST',
+            'path': f'/api/{i}',
+            'code': 200,
+            'response': _response(i, body_size),
+            'response_headers': {'Content-Type': 'application/json'},
+        } for i in range(steps)
+    ]
+    async with async_session_local() as db:
+        temp = temp_models.Template(project_name=1, temp_name='bench', api_count=steps)
+        db.add(temp)
+        await db.flush()
+        for i, api in enumerate(api_list):
+            db.add(temp_models.TemplateData(
+                temp_id=temp.id, number=i, host=host, path=api['path'], code=200, method='POST',
+                json_body='json', params={}, data={}, file=0, file_data=[],
+                headers={'Content-Type': 'application/json'}, response=api['response'],
+                response_headers=api['response_headers'], description='bench'
+            ))
+
+        case_ids = []
+        for c in range(cases):
+            case = case_models.TestCase(temp_id=temp.id, case_name=f'bench-{c}', case_count=steps, mode='service')
+            db.add(case)
+            await db.flush()
+            case_ids.append(case.id)
+            for i in range(steps):
+                db.add(case_models.TestCaseData(
+                    case_id=case.id, number=i, path=f'/api/{i}', headers={}, params={},
+                    data=_case_data(i, fields, density), file=0, check={'code': 0, 'status_code': 200},
+                    description='bench', config={
+                        'is_login': i == 0, 'sleep': 0, 'stop': False, 'fail_stop': False,
+                        'skip': False, 'code': False, 'extract': []
+                    }
+                ))
+        await db.commit()
+    return case_ids, api_list
+
+
+async def _round(case_ids: list, mode: str, concurrency: int) -> tuple:
+    """
+    与run_service_case相同的执行流程，执行器换成BenchExecutor
+    :return: (耗时, 失败的接口数)
+    """
+    start = time.perf_counter()
+    async with async_session_local() as db:
+        executor = BenchExecutor(db=db)
+        await executor.collect_sql(case_ids=case_ids)
+        await executor.collect_config(setting_info_dict={})
+        await executor.collect_req_data()
+        await executor.executor_api(sync=mode == 'sync', concurrency=concurrency)
+        await executor.collect_report()
+    return time.perf_counter() - start, sum(x['result']['fail'] for x in executor.report_list)
+
+
+async def run_mode(args: argparse.Namespace, mode: str) -> dict:
+    """
+    在临时数据库中执行一种模式
+    :param args:
+    :param mode: sync/async
+    :return:
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.sqlite3')}")
+        # 报告后台写入等模块使用全局会话，指向临时数据库
+        async_session_local.configure(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        port = args.port or _free_port()
+        case_ids, api_list = await seed(
+            cases=args.cases,
+            steps=args.steps,
+            fields=args.fields,
+            body_size=args.body_size,
+            density=args.density,
+            host=f'http://127.0.0.1:{port}',
+        )
+        server = MockServer(temp_id=0, api_list=api_list, port=port, latency=args.latency)
+        await server.start()
+        try:
+            # 预热轮次不计入统计
+            for _ in range(args.warmup):
+                await _round(case_ids, mode, args.concurrency)
+
+            BenchExecutor.histogram = LatencyHistogram()
+            elapsed, fail = 0.0, 0
+            for _ in range(args.rounds):
+                round_elapsed, round_fail = await _round(case_ids, mode, args.concurrency)
+                elapsed += round_elapsed
+                fail += round_fail
+        finally:
+            await server.stop()
+            await REPORT_WRITER.close()
+            await close_http_pool()
+            await engine.dispose()
+
+    cases = args.cases * args.rounds
+    overhead = BenchExecutor.histogram.summary()
+    return {
+        'cases': cases,
+        'steps': overhead['count'],
+        'fail': fail,
+        'elapsed': round(elapsed, 4),
+        'cases_per_sec': round(cases / elapsed, 3),
+        'steps_per_sec': round(overhead['count'] / elapsed, 3),
+        'step_overhead_ms': {
+            k: round(overhead[k] * 1000, 4) for k in ('avg_time', 'p50', 'p90', 'p99', 'max_time')
+        },
+        'peak_rss_kb': _peak_rss(),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _compare(result: dict, path: str) -> dict:
+    """
+    与之前的结果对比，返回 本次/之前 的比值
+    """
+    with open(path, encoding='utf-8') as f:
+        old = json.load(f)
+
+    compare = {}
+    for mode, new_item in result['results'].items():
+        old_item = old.get('results', {}).get(mode)
+        if not old_item:
+            continue
+        compare[mode] = {
+            'cases_per_sec': round(new_item['cases_per_sec'] / old_item['cases_per_sec'], 3),
+            'steps_per_sec': round(new_item['steps_per_sec'] / old_item['steps_per_sec'], 3),
+            'step_overhead_p99': round(
+                new_item['step_overhead_ms']['p99'] / old_item['step_overhead_ms']['p99'], 3
+            ) if old_item['step_overhead_ms']['p99'] else None,
+            'peak_rss_kb': round(
+                new_item['peak_rss_kb'] / old_item['peak_rss_kb'], 3
+            ) if old_item['peak_rss_kb'] else None,
+        }
+    return {'file': path, 'commit': old.get('commit'), 'ratio': compare}
+
+
+def main(args: argparse.Namespace):
+    if args.mode != 'all':
+        # 单个模式：结果输出到stdout，由父进程收集
+        print(json.dumps(asyncio.run(run_mode(args, args.mode))))
+        return
+
+    # 每种模式在独立进程中执行，内存峰值互不影响
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmark.bench_executor', *sys.argv[1:], '--mode', mode],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    result = {
+        'commit': _git_commit(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'config': {
+            k: getattr(args, k) for k in (
+                'cases', 'steps', 'fields', 'body_size', 'density', 'latency', 'concurrency', 'rounds', 'warmup'
+            )
+        },
+        'results': results,
+    }
+    if args.compare:
+        result['compare'] = _compare(result, args.compare)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+    print(json.dumps(result, ensure_ascii=False, indent=4))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='用例执行器基准测试')
+    parser.add_argument('--cases', type=int, default=20, help='用例数')
+    parser.add_argument('--steps', type=int, default=10, help='每条用例的接口数')
+    parser.add_argument('--fields', type=int, default=10, help='每个接口的请求字段数')
+    parser.add_argument('--body-size', type=int, default=1024, help='响应数据中填充的字节数')
+    parser.add_argument('--density', type=float, default=0.5, help='请求字段中引用前面接口响应的比例，0~1')
+    parser.add_argument('--latency', type=float, default=0, help='mock服务注入的固定延迟(秒)')
+    parser.add_argument('--concurrency', type=int, default=None, help='异步执行的并发上限')
+    parser.add_argument('--rounds', type=int, default=3, help='统计的执行轮数')
+    parser.add_argument('--warmup', type=int, default=1, help='预热轮数')
+    parser.add_argument('--port', type=int, default=0, help='mock服务端口，默认随机')
+    parser.add_argument('--mode', choices=('all', *MODES), default='all', help='执行模式')
+    parser.add_argument('-o', '--output', default='', help='结果保存的json文件')
+    parser.add_argument('--compare', default='', help='对比的历史结果json文件')
+    parser.add_argument('--log-level', default='WARNING', help='执行期间的日志等级')
+    args_ = parser.parse_args()
+    logger.setLevel(args_.log_level)
+    main(args_)
@@ -0,0 +1,146 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：bench_replace_data.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/10 11:20
+
+参数替换的基准测试：对比替换计划与逐个替换，在项目根目录执行
+python -m benchmark.bench_replace_data
+"""
+
+import time
+import json
+import asyncio
+import argparse
+from tools.faker_data import FakerData
+from tools import replace_data
+
+API_LIST = [
+    {
+        'response_info': [{
+            'headers': {'X-Token': 'token-0'},
+            'response': {'data': {'token': 'abc', 'id': 1, 'name': 'case'}},
+        }]
+    },
+]
+
+CUSTOMIZE = {'host': 'http://127.0.0.1', 'user': 'admin'}
+
+DATA = {
+    'token': '{{0.$.data.token}}',
+    'header': 'Bearer {{0.h$.X-Token}}',
+    'url': '%{{host}}/api/detail?id={random_int.3}',
+    'user': '%{{user}}-{name}',
+    'sum': '{compute.1+2*3}',
+    'code': 'no-template-value',
+    'items': [
+        {'id': '{{0.$.data.id}}', 'name': '{{0.$.data.name}}-{random_lower.4}', 'flag': True},
+        'plain',
+        '{random_int.6}',
+    ],
+}
+
+
+async def _header_srt_one_by_one(
+        db,
+        x: str,
+        api_list: list,
+        faker: FakerData,
+        value_type: str = None,
+        code: str = None,
+        extract: str = '',
+        customize: dict = None
+):
+    """
+    不使用替换计划，所有表达式逐个替换，作为header_srt的对照实现
+    """
+    if "{{" in x and "$" in x and "}}" in x:
+        x = await replace_data._param_one_by_one(
+            x=x,
+            replace_values=replace_data._SYNTAX['param'].findall(x),
+            api_list=api_list,
+            value_type=value_type
+        )
+
+    if "%{{" in x and "}}" in x:
+        x = await replace_data._customize_one_by_one(
+            db=db,
+            x=x,
+            replace_key=replace_data._SYNTAX['customize'].findall(x),
+            customize=customize
+        )
+
+    if isinstance(x, str) and "{" in x and "}" in x:
+        x = await replace_data._func_one_by_one(
+            x=x,
+            replace_values=replace_data._SYNTAX['func'].findall(x),
+            faker=faker,
+            value_type=value_type,
+            code=code,
+            extract=extract
+        )
+
+    return x
+
+
+async def _run(func, data: dict, number: int, faker: FakerData) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        for x in _strings(data):
+            await func(
+                db=None,
+                x=x,
+                api_list=API_LIST,
+                faker=faker,
+                customize=CUSTOMIZE,
+            )
+    return time.perf_counter() - start
+
+
+def _strings(data):
+    if isinstance(data, str):
+        yield data
+    elif isinstance(data, dict):
+        for x in data.values():
+            yield from _strings(x)
+    elif isinstance(data, list):
+        for x in data:
+            yield from _strings(x)
+
+
+async def _params_data(number: int, faker: FakerData) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await replace_data.replace_params_data(
+            db=None,
+            data=DATA,
+            api_list=API_LIST,
+            faker=faker,
+            customize=CUSTOMIZE,
+        )
+    return time.perf_counter() - start
+
+
+async def main(number: int):
+    faker = FakerData()
+    strings = len(list(_strings(DATA)))
+    one_by_one = await _run(_header_srt_one_by_one, DATA, number, faker)
+    plan = await _run(replace_data.header_srt, DATA, number, faker)
+    params_data = await _params_data(number, faker)
+    print(json.dumps({
+        'strings': strings * number,
+        'one_by_one_us': round(one_by_one / (strings * number) * 1e6, 3),
+        'plan_us': round(plan / (strings * number) * 1e6, 3),
+        'speedup': round(one_by_one / plan, 2) if plan else None,
+        'replace_params_data_us': round(params_data / number * 1e6, 3),
+    }, indent=4))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='参数替换基准测试')
+    parser.add_argument('-n', '--number', type=int, default=20000, help='每种方式的执行轮数')
+    args = parser.parse_args()
+    asyncio.run(main(args.number))
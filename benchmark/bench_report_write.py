@@ -0,0 +1,155 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：bench_report_write.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/18 15:40
+
+测试报告写入的基准测试：在临时sqlite中对比逐条ORM写入、单条用例批量写入、多条用例一个事务批量写入，在项目根目录执行
+python -m benchmark.bench_report_write --cases 20 --steps 300
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from apps.base_model import Base
+from apps.template import models as temp_models
+from apps.case_service import models as case_models
+from apps.api_report import models, schemas, crud
+from apps.api_report.tool import write_case_reports
+from apps.run_case import crud as run_crud
+
+
+def _api(number: int, body_size: int) -> dict:
+    body = {'code': 0, 'data': {'id': number, 'items': [{'k': i} for i in range(10)], 'blob': 'x' * body_size}}
+    return {
+        'api_info': {'case_id': 1, 'number': number, 'host': 'http://127.0.0.1', 'json_body': 'json'},
+        'history': {'path': f'/api/{number}', 'headers': {}, 'data': body},
+        'request_info': {'url': f'http://127.0.0.1/api/{number}', 'method': 'POST', 'json': body, 'headers': {}},
+        'response_info': [{'status_code': 200, 'response_time': 0.01, 'response': body, 'headers': {}}],
+        'assert_info': [[{'result': 0, 'key': 'code'}]],
+        'report': {'is_executor': True, 'result': 0},
+        'config': {'sleep': 0},
+        'check': {'code': 0},
+        'jsonpath_info': [],
+        'other_info': {},
+    }
+
+
+def _report(case_id: int, steps: int) -> dict:
+    return {
+        'case_id': case_id,
+        'run_number': 0,
+        'total_api': steps,
+        'initiative_stop': False,
+        'fail_stop': False,
+        'result': {'run_api': steps, 'success': steps, 'fail': 0, 'skip': 0, 'result': 0},
+        'time': {'total_time': 0.01 * steps, 'max_time': 0.01, 'avg_time': 0.01},
+    }
+
+
+async def _legacy(db: AsyncSession, report: dict, api_list: list):
+    """
+    修改前的写入方式：逐条校验、逐条创建ORM对象
+    """
+    run_number = (await db.execute(
+        select(func.max(models.ApiReportList.run_number)).where(models.ApiReportList.case_id == report['case_id'])
+    )).scalar()
+    report['run_number'] = run_number + 1 if run_number is not None else 1
+    # 同步用例的运行编号计数器，后面的批量写入阶段从这里继续分配
+    await db.execute(
+        update(case_models.TestCase).where(
+            case_models.TestCase.id == report['case_id']
+        ).values(run_number=report['run_number'])
+    )
+    db_data = await crud.create_api_list(db=db, data=schemas.ApiReportListInt(**report))
+    for x in api_list:
+        db.add(models.ApiReportDetail(**schemas.ApiReportDetailInt(**x).dict(), report_id=db_data.id))
+    await db.commit()
+    await run_crud.update_test_case_order(db=db, case_id=report['case_id'], is_fail=False)
+
+
+async def main(cases: int, steps: int, body_size: int, batch_size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.sqlite3')}")
+        session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with session() as db:
+            temp = temp_models.Template(project_name=1, temp_name='bench', api_count=steps)
+            db.add(temp)
+            await db.flush()
+            case_ids = []
+            for c in range(cases):
+                case = case_models.TestCase(temp_id=temp.id, case_name=f'bench-{c}', case_count=steps, mode='service')
+                db.add(case)
+                await db.flush()
+                case_ids.append(case.id)
+            await db.commit()
+
+        api_list = [_api(i, body_size) for i in range(steps)]
+        result = {}
+
+        start = time.perf_counter()
+        for case_id in case_ids:
+            async with session() as db:
+                await _legacy(db=db, report=_report(case_id, steps), api_list=api_list)
+        result['orm_per_row'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for case_id in case_ids:
+            async with session() as db:
+                await write_case_reports(db=db, reports=[(_report(case_id, steps), api_list)])
+        result['bulk_per_case'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(0, cases, batch_size):
+            async with session() as db:
+                await write_case_reports(
+                    db=db,
+                    reports=[(_report(case_id, steps), api_list) for case_id in case_ids[i:i + batch_size]]
+                )
+        result['bulk_batch'] = time.perf_counter() - start
+
+        async with session() as db:
+            case = await db.get(case_models.TestCase, case_ids[0])
+            details = len(await crud.get_api_detail(db=db, report_id=1, size=steps))
+            duplicate = (await db.execute(
+                select(func.count()).select_from(
+                    select(models.ApiReportList.case_id).group_by(
+                        models.ApiReportList.case_id, models.ApiReportList.run_number
+                    ).having(func.count() > 1).subquery()
+                )
+            )).scalar()
+        await engine.dispose()
+
+    rows = cases * steps
+    print(json.dumps({
+        'cases': cases,
+        'steps': steps,
+        'body_size': body_size,
+        'batch_size': batch_size,
+        'check': {'run_order': case.run_order, 'details_per_report': details, 'duplicate_run_number': duplicate},
+        **{
+            k: {'seconds': round(v, 4), 'rows_per_sec': round(rows / v, 1), 'speedup': round(result['orm_per_row'] / v, 2)}
+            for k, v in result.items()
+        }
+    }, indent=4))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='测试报告写入基准测试')
+    parser.add_argument('--cases', type=int, default=20, help='用例数')
+    parser.add_argument('--steps', type=int, default=300, help='每条用例的接口数')
+    parser.add_argument('--body-size', type=int, default=2048, help='请求和响应数据中填充的字节数')
+    parser.add_argument('--batch-size', type=int, default=50, help='一个事务写入的用例数')
+    args = parser.parse_args()
+    asyncio.run(main(args.cases, args.steps, args.body_size, args.batch_size))
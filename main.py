@@ -12,16 +12,24 @@ from fastapi import FastAPI
 from tools.tips import TIPS
 from tools.read_setting import setting
 from apps.template.router import template
+from apps.template import MOCK_SERVERS
 from apps.case_service.router import case_service
 from apps.case_ddt.router import case_ddt
 from apps.case_ui.router import case_ui
+from apps.case_perf.router import case_perf
+from apps.case_perf.tool import close_perf_runs
 from apps.run_case.router import run_case
 from apps.whole_conf.router import conf
 from apps.setting_bind.router import setting_
 from apps.statistic.router import statistic
 from apps.api_report.router import api_report
+from apps.api_report.tool import REPORT_WRITER, REPORT_RETENTION
 from apps.status.router import ws_app
 from tools.load_allure import load_allure_reports
+from tools.http_pool import start_http_pool, close_http_pool
+from tools.my_sql import MYSQL_POOL
+from tools.background_job import BACKGROUND_JOBS
+from tools.faker_data import FAKER_POOL
 from fastapi.staticfiles import StaticFiles
 from apps import response_code
 
@@ -38,10 +46,24 @@ app = FastAPI(
 async def start_up():
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await start_http_pool()
+    await REPORT_WRITER.start()
+    await MYSQL_POOL.start()
+    await FAKER_POOL.start()
+    await REPORT_RETENTION.start()
 
 
 @app.on_event('shutdown')
 async def shutdown():
+    await close_perf_runs()
+    for server in MOCK_SERVERS.values():
+        await server.stop()
+    await REPORT_RETENTION.close()
+    await BACKGROUND_JOBS.close()
+    await REPORT_WRITER.close()
+    await close_http_pool()
+    await MYSQL_POOL.close()
+    await FAKER_POOL.close()
     await async_engine.dispose()
 
 
@@ -49,6 +71,7 @@ app.include_router(template, prefix='/template', tags=['[模板]测试场景'])
 app.include_router(case_service, prefix='/caseService', tags=['[用例]业务接口'])
 app.include_router(case_ddt, prefix='/caseDdt', tags=['[用例]数据驱动'])
 app.include_router(case_ui, prefix='/caseUi', tags=['[用例]UI测试'])
+app.include_router(case_perf, prefix='/casePerf', tags=['[用例]性能测试'])
 app.include_router(run_case, prefix='/runCase', tags=['执行测试'])
 app.include_router(statistic, prefix='/statistic', tags=['数据统计'])
 app.include_router(conf, prefix='/conf', tags=['全局配置'])
@@ -0,0 +1,44 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：test_hash_diff.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/24 10:10
+"""
+
+import json
+import pytest
+from tools import hash_diff, compare_data
+
+CASES = [
+    ({'a': 1}, {'a': 1}),
+    ({'a': 1}, {'a': 1.0}),
+    ({'a': True}, {'a': 1}),
+    ({'a': 1.5}, {'a': 1}),
+    ({'a': '1'}, {'a': 1}),
+    ({'a': None, 'b': [1, 2]}, {'a': 0, 'b': [1, 2, 3]}),
+    (
+        {'code': 0, 'data': {'list': [{'id': 1, 'tags': ['x']}, {'id': 2}], 'total': 2}, 'msg': 'ok'},
+        {'code': 0, 'data': {'list': [{'id': 1, 'tags': ['y', 'z']}], 'total': 1.0, 'page': 1}, 'message': 'ok'},
+    ),
+    ([{'a': {'b': [1, {'c': 2}]}}], [{'a': {'b': [1, {'c': 3}], 'd': {}}}, 4]),
+    ({'a': {'b': 1}}, {'a': [1]}),
+    ([], {}),
+]
+
+
+def _sort(result: dict) -> dict:
+    return {k: sorted(v, key=lambda x: json.dumps(x, sort_keys=True)) for k, v in result.items()}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('old_data, new_data', CASES)
+async def test_same_as_compare_data(old_data, new_data):
+    assert _sort(hash_diff(old_data, new_data)) == _sort(await compare_data(new_data, old_data))
+
+
+def test_nan_not_equal():
+    result = hash_diff({'a': float('nan')}, {'a': float('nan')})
+    assert [x['path'] for x in result['value_changed']] == ['a']
@@ -0,0 +1,120 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：test_my_sql.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/23 10:30
+"""
+
+import asyncio
+import pytest
+from tools import my_sql
+
+
+class FakeResult:
+
+    async def fetchall(self):
+        return [(1,)]
+
+
+class FakeConn:
+
+    def __init__(self):
+        self.closed = False
+
+    async def execute(self, sql):
+        return FakeResult()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeEngine:
+    """
+    代替aiomysql的engine，记录创建的参数和是否关闭
+    """
+
+    def __init__(self, kwargs: dict):
+        self.kwargs = kwargs
+        self.closed = False
+
+    async def acquire(self):
+        return FakeConn()
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    created = []
+
+    async def create_engine(**kwargs):
+        engine = FakeEngine(kwargs)
+        created.append(engine)
+        return engine
+
+    monkeypatch.setattr(my_sql.aio_sa, 'create_engine', create_engine)
+    monkeypatch.setattr(my_sql, 'MYSQL_POOL', my_sql.MySqlPool(minsize=1, maxsize=5, pool_recycle=60, idle_timeout=0.5))
+    return created
+
+
+def _config(db: str) -> dict:
+    return {'host': '127.0.0.1', 'port': 3306, 'user': 'root', 'password': '123456', 'db': db}
+
+
+async def _select(db: str):
+    async with my_sql.AsyncMySql(_config(db), pool=True) as session:
+        return await session.select('select 1')
+
+
+@pytest.mark.asyncio
+async def test_reuse_engine_per_config(engines):
+    result = await asyncio.gather(*[_select('a') for _ in range(20)], *[_select('b') for _ in range(20)])
+
+    assert result[0] == [(1,)]
+    assert sorted(x.kwargs['db'] for x in engines) == ['a', 'b']
+    assert engines[0].kwargs['minsize'] == 1 and engines[0].kwargs['maxsize'] == 5
+    await my_sql.MYSQL_POOL.close()
+
+
+@pytest.mark.asyncio
+async def test_release_after_exit(engines):
+    async with my_sql.AsyncMySql(_config('a'), pool=True) as session:
+        assert my_sql.MYSQL_POOL._engines[session._key][2] == 1
+        conn = session.conn
+
+    assert conn.closed
+    assert my_sql.MYSQL_POOL._engines[session._key][2] == 0
+    assert not engines[0].closed
+    await my_sql.MYSQL_POOL.close()
+
+
+@pytest.mark.asyncio
+async def test_evict_only_idle_engine(engines):
+    await _select('idle')
+    async with my_sql.AsyncMySql(_config('busy'), pool=True) as session:
+        await asyncio.sleep(1.5)
+        idle, busy = engines
+        assert idle.closed
+        assert not busy.closed
+        assert list(my_sql.MYSQL_POOL._engines) == [session._key]
+
+    await _select('idle')
+    assert len(engines) == 3
+    await my_sql.MYSQL_POOL.close()
+
+
+@pytest.mark.asyncio
+async def test_close_all(engines):
+    await asyncio.gather(_select('a'), _select('b'), _select('c'))
+    await my_sql.MYSQL_POOL.close()
+
+    assert len(engines) == 3
+    assert all(x.closed for x in engines)
+    assert my_sql.MYSQL_POOL._engines == {}
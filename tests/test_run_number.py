@@ -0,0 +1,64 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：test_run_number.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/24 15:30
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from apps.base_model import Base
+from apps.template import models as temp_models
+from apps.case_service import models as case_models
+from apps.run_case import crud as run_crud
+
+
+@pytest_asyncio.fixture
+async def session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'run_number.sqlite3'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)() as db:
+        temp = temp_models.Template(project_name=1, temp_name='temp', api_count=1)
+        db.add(temp)
+        await db.flush()
+        # 用例2模拟迁移时按已有报告回填的计数器
+        db.add_all([
+            case_models.TestCase(temp_id=temp.id, case_name='case1', case_count=1, mode='service'),
+            case_models.TestCase(temp_id=temp.id, case_name='case2', case_count=1, mode='service', run_number=7),
+        ])
+        await db.commit()
+        yield db
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_consecutive_in_batch(session):
+    run_numbers = await run_crud.allocate_run_numbers(db=session, case_ids=[1, 2, 1, 1, 2])
+    await session.commit()
+
+    assert run_numbers == [1, 8, 2, 3, 9]
+
+
+@pytest.mark.asyncio
+async def test_continue_from_counter(session):
+    assert await run_crud.allocate_run_numbers(db=session, case_ids=[2]) == [8]
+    await session.commit()
+    assert await run_crud.allocate_run_numbers(db=session, case_ids=[2, 1]) == [9, 1]
+    await session.commit()
+
+    case = await session.get(case_models.TestCase, 2)
+    await session.refresh(case)
+    assert case.run_number == 9
+
+
+@pytest.mark.asyncio
+async def test_rollback_not_consume(session):
+    assert await run_crud.allocate_run_numbers(db=session, case_ids=[1, 1]) == [1, 2]
+    await session.rollback()
+
+    assert await run_crud.allocate_run_numbers(db=session, case_ids=[1]) == [1]
@@ -0,0 +1,110 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：test_scheduler.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/24 14:00
+"""
+
+import asyncio
+import pytest
+from apps.run_case.tool.api_executor.scheduler import CaseScheduler
+
+
+class Recorder:
+    """
+    记录执行中的数量峰值、各host的峰值和开始顺序
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.hosts = {}
+        self.host_peak = {}
+        self.started = []
+
+    def job(self, name, hosts=(), delay: float = 0.01):
+        async def _job():
+            self.started.append(name)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            for x in hosts:
+                self.hosts[x] = self.hosts.get(x, 0) + 1
+                self.host_peak[x] = max(self.host_peak.get(x, 0), self.hosts[x])
+            await asyncio.sleep(delay)
+            self.in_flight -= 1
+            for x in hosts:
+                self.hosts[x] -= 1
+            return name
+
+        return _job
+
+
+@pytest.mark.asyncio
+async def test_global_cap():
+    scheduler, recorder = CaseScheduler(concurrency=3, host_concurrency=10), Recorder()
+    jobs = [((f'h{i}',), recorder.job(i, (f'h{i}',))) for i in range(10)]
+
+    assert await scheduler.run(jobs) == list(range(10))
+    assert recorder.peak == 3
+    assert scheduler.status()['in_flight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_host_cap():
+    scheduler, recorder = CaseScheduler(concurrency=10, host_concurrency=2), Recorder()
+    jobs = [((host,), recorder.job(f'{host}{i}', (host,))) for i in range(6) for host in ('a', 'b')]
+
+    await scheduler.run(jobs)
+    assert recorder.host_peak == {'a': 2, 'b': 2}
+    assert recorder.peak == 4
+
+
+@pytest.mark.asyncio
+async def test_full_host_not_block_other_host():
+    scheduler, recorder = CaseScheduler(concurrency=2, host_concurrency=1), Recorder()
+    jobs = [(('a',), recorder.job('a0', ('a',))), (('a',), recorder.job('a1', ('a',))), (('b',), recorder.job('b0', ('b',)))]
+
+    await scheduler.run(jobs)
+    assert recorder.started[:2] == ['a0', 'b0']
+    assert recorder.host_peak == {'a': 1, 'b': 1}
+
+
+@pytest.mark.asyncio
+async def test_priority_then_fifo():
+    scheduler, recorder = CaseScheduler(concurrency=1, host_concurrency=10), Recorder()
+    hold = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot():
+            await hold.wait()
+
+    async def queued(name, priority):
+        async with scheduler.slot(priority=priority):
+            await recorder.job(name, delay=0)()
+
+    tasks = [asyncio.create_task(blocker())]
+    await asyncio.sleep(0)
+    for name, priority in (('p2-a', 2), ('p1-a', 1), ('p2-b', 2), ('p1-b', 1), ('p0', 0)):
+        tasks.append(asyncio.create_task(queued(name, priority)))
+        await asyncio.sleep(0)
+    assert scheduler.status()['queue'] == 5
+
+    hold.set()
+    await asyncio.gather(*tasks)
+    assert recorder.started == ['p0', 'p1-a', 'p1-b', 'p2-a', 'p2-b']
+
+
+@pytest.mark.asyncio
+async def test_run_concurrency():
+    scheduler, recorder = CaseScheduler(concurrency=10, host_concurrency=10), Recorder()
+    jobs = [((), recorder.job(i)) for i in range(8)]
+
+    assert await scheduler.run(jobs, concurrency=2) == list(range(8))
+    assert recorder.peak == 2
+    assert recorder.started == list(range(8))
+    assert scheduler.status() == {
+        'concurrency': 10, 'host_concurrency': 10, 'in_flight': 0, 'queue': 0, 'hosts': {}
+    }
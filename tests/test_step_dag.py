@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：test_step_dag.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/24 11:00
+"""
+
+import pytest
+from tools.read_setting import setting
+from apps.run_case.tool.step_dag import step_depends
+from apps.run_case.tool.api_executor.executor_service import ExecutorService
+
+
+def _api(number: int, path: str = '/api', params: dict = None, headers: dict = None, check: dict = None, **config):
+    return {
+        'api_info': {'case_id': 1, 'number': number, 'file': False, 'file_data': []},
+        'history': {'path': path, 'params': params or {}, 'data': {}, 'headers': headers or {}},
+        'request_info': {'url': f'http://127.0.0.1{path}', 'headers': {}, 'data': {}},
+        'check': check or {},
+        'config': config,
+        'report': {'is_executor': None, 'result': None},
+        'response_info': [],
+    }
+
+
+@pytest.fixture
+def global_fail_stop(monkeypatch):
+    def _set(value: bool):
+        monkeypatch.setitem(setting, 'global_fail_stop', value)
+
+    return _set
+
+
+def test_json_count_refs():
+    api_list = [
+        _api(0),
+        _api(1, path='/user/{{0.$.data.id}}'),
+        _api(2, params={'token': '{{0.h$.X-Token}}'}, headers={'id': '{{1.$.data.id}}'}),
+        _api(3, check={'name': '{{2.$.data.name}}'}),
+        _api(4, params={'next': '{{5.$.data.id}}', 'bad': '{{x.$.id}}'}),
+        _api(5),
+    ]
+    assert step_depends(api_list) == [set(), {0}, {0, 1}, {2}, set(), set()]
+
+
+def test_login_order():
+    api_list = [_api(0), _api(1), _api(2, is_login=True), _api(3), _api(4, is_login=True), _api(5)]
+    assert step_depends(api_list) == [set(), set(), {0, 1}, {2}, {0, 1, 2, 3}, {4}]
+
+
+@pytest.mark.parametrize('fail_stop_on, depends', [
+    # 失败停止的接口3作为屏障，后面的接口依赖它；接口3通过接口1间接依赖主动停止
+    (True, [set(), set(), {1}, {1}, {3}, {3}]),
+    # 全局失败停止关闭时，只有主动停止的接口1是屏障
+    (False, [set(), set(), {1}, {1}, {1}, {1}]),
+])
+def test_stop_barrier(global_fail_stop, fail_stop_on, depends):
+    global_fail_stop(fail_stop_on)
+    api_list = [_api(0), _api(1, stop=True), _api(2), _api(3, fail_stop=True), _api(4), _api(5)]
+    assert step_depends(api_list) == depends
+
+
+def _executed(api: dict, result: int, response_time: float) -> dict:
+    api['report'] = {'is_executor': True, 'result': result}
+    api['response_info'] = [{'response_time': response_time, 'response': {}, 'status_code': 200}]
+    api['assert_info'] = [[]]
+    return api
+
+
+def test_case_report_after_dag_stop():
+    # 按依赖并发执行时，接口1停止后，序号更大且不依赖它的接口3已经执行完成
+    api_list = [
+        _executed(_api(0), 0, 0.1),
+        _executed(_api(1, stop=True), 1, 0.2),
+        _api(2),
+        _executed(_api(3), 0, 0.3),
+    ]
+    report = ExecutorService._case_report(api_list)
+
+    # 与write_case_reports写入的报告详情一致
+    written = [x for x in api_list if x['report']['is_executor'] is not None]
+    assert report['result']['run_api'] == len(written) == 3
+    assert report['result']['success'] == sum(x['report']['result'] == 0 for x in written)
+    assert report['result']['fail'] == sum(x['report']['result'] == 1 for x in written)
+    assert report['result']['result'] == 1
+    assert report['initiative_stop']
+    assert report['time']['total_time'] == pytest.approx(0.6)
+    assert report['time']['max_time'] == 0.3
+    assert report['time']['avg_time'] == pytest.approx(0.2)
+    assert all('jsonpath_info' in x for x in written)
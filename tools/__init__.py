@@ -12,13 +12,15 @@ from .excel import CreateExcel, ReadExcel, ReadUiExcel
 from .operation_json import OperationJson
 from .global_log import logger
 from .aiohttp_get_cookie import get_cookie
-from .my_sql import AsyncMySql
+from .my_sql import AsyncMySql, MYSQL_POOL
 from .get_value_path import ExtractParamsPath, RepData, filter_number
 from .rep_case_data_value import rep_value, rep_url
 from .my_selenoid import get_session_id
 from .read_setting import setting
-from .faker_data import FakerData
+from .faker_data import FakerData, FAKER_POOL
 from .diff_dict import compare_data, apply_changes
+from .hash_diff import hash_tree, hash_diff
+from .http_pool import http_session, start_http_pool, close_http_pool
 
 
 def mkdir():
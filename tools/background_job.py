@@ -0,0 +1,117 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：background_job.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/22 10:10
+"""
+
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from .global_log import logger
+
+
+class Job:
+    """
+    后台任务的进度
+    """
+
+    def __init__(self, name: str, total: int = 0):
+        self.job_id = uuid.uuid4().hex
+        self.name = name
+        self.status = 'running'  # running、success、fail
+        self.total = total
+        self.done = 0
+        self.step = ''
+        self.result = {}
+        self.message = ''
+        self.start_time = time.time()
+        self.end_time = None
+
+    def advance(self, step: str, count: int = None):
+        """
+        完成一步
+        :param step: 步骤名称
+        :param count: 这一步处理的数据量
+        :return:
+        """
+        self.done += 1
+        self.step = step
+        if count is not None:
+            self.result[step] = count
+
+    def info(self) -> dict:
+        return {
+            'job_id': self.job_id,
+            'name': self.name,
+            'status': self.status,
+            'total': self.total,
+            'done': self.done,
+            'percentage': round(self.done / self.total * 100, 2) if self.total else 0,
+            'step': self.step,
+            'result': self.result,
+            'message': self.message,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+        }
+
+
+class BackgroundJobs:
+    """
+    在事件循环中执行的后台任务，只保留最近maxsize个任务的进度
+    """
+
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = maxsize
+        self._jobs = OrderedDict()
+        self._tasks = set()
+
+    def submit(self, name: str, func: Callable[[Job], Awaitable], total: int = 0) -> Job:
+        """
+        提交任务，func接收Job，执行过程中调用job.advance更新进度
+        :param name:
+        :param func:
+        :param total: 总步骤数
+        :return:
+        """
+        job = Job(name=name, total=total)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.maxsize:
+            self._jobs.popitem(last=False)
+
+        task = asyncio.get_running_loop().create_task(self._run(job, func))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    @staticmethod
+    async def _run(job: Job, func: Callable[[Job], Awaitable]):
+        try:
+            await func(job)
+        except Exception as e:
+            job.status = 'fail'
+            job.message = str(e)
+            logger.error(f"后台任务失败: {job.name} {e}")
+        else:
+            job.status = 'success'
+        finally:
+            job.end_time = time.time()
+
+    def get(self, job_id: str) -> Job:
+        return self._jobs.get(job_id)
+
+    async def close(self):
+        """
+        等待执行中的任务完成
+        :return:
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+BACKGROUND_JOBS = BackgroundJobs()
@@ -0,0 +1,75 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+@Author: Kobayasi
+@File: compute_expr.py
+@Time: 2024/5/18-10:15
+"""
+
+import ast
+import operator
+import functools
+from typing import Callable, Optional, Union
+
+_BIN_OP = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+
+_UNARY_OP = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _build(node: ast.AST) -> Callable[[], Union[int, float]]:
+    """
+    把语法树编译成闭包，不支持的语法抛出ValueError
+    :param node:
+    :return:
+    """
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f'不支持的常量: {value!r}')
+        return lambda: value
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OP:
+        func, left, right = _BIN_OP[type(node.op)], _build(node.left), _build(node.right)
+        return lambda: func(left(), right())
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OP:
+        func, operand = _UNARY_OP[type(node.op)], _build(node.operand)
+        return lambda: func(operand())
+
+    raise ValueError(f'不支持的语法: {type(node).__name__}')
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_expr(expr: str) -> Optional[Callable[[], Union[int, float]]]:
+    """
+    编译四则运算表达式并缓存：只支持数字、+ - * / // %、正负号和括号
+    :param expr:
+    :return: 无法解析或包含其他语法时返回None
+    """
+    try:
+        return _build(ast.parse(expr.strip(), mode='eval').body)
+    except (SyntaxError, ValueError):
+        return None
+
+
+def compute(expr: str) -> Union[int, float, str]:
+    """
+    计算表达式，结果保留6位小数；不是四则运算表达式时原样返回
+    :param expr:
+    :return:
+    """
+    func = compile_expr(expr)
+    if func is None:
+        return expr
+    return round(func(), 6)
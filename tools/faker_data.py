@@ -10,37 +10,192 @@
 import time
 import random
 import string
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from faker import Faker
+from tools.read_setting import setting
+from tools.compute_expr import compute
+
+# 需要Faker生成的数据
+_PROVIDERS = {
+    'name': lambda f: f.name_female(),
+    'ssn': lambda f: f.ssn(min_age=18, max_age=50),
+    'phone_number': lambda f: f.phone_number(),
+    'credit_card_number': lambda f: f.credit_card_number(),
+    'city': lambda f: f.city(),
+    'address': lambda f: f.address()[:-7],
+}
+
+
+class FakerPool:
+    """
+    进程内共享的假数据池
+    Faker只初始化一次，各类数据按批预先生成，取值时直接从队列取出；剩余数量低于low_water时在后台线程补充一批
+    设置seed后不在后台补充，按取值顺序同步生成，相同的执行顺序得到相同的数据
+    """
+
+    def __init__(self, batch_size: int, low_water: int, seed: int = None):
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.random = random.Random()
+        self._seed = None
+        self._faker = None
+        self._refill_faker = None
+        self._executor = None
+        self._values = {k: deque() for k in _PROVIDERS}
+        self._refilling = set()
+        self._generation = 0  # 重新设置种子后，丢弃之前在后台生成的数据
+        self._closed = False
+        if seed is not None:
+            self.seed(seed)
+
+    @property
+    def faker(self) -> Faker:
+        if self._faker is None:
+            self._faker = Faker(locale='zh_CN')
+        return self._faker
+
+    def seed(self, seed: int = None):
+        """
+        设置随机种子，None时恢复随机数据和后台补充
+        :param seed:
+        :return:
+        """
+        self._seed = seed
+        self._generation += 1
+        self._refilling.clear()
+        for values in self._values.values():
+            values.clear()
+        self.faker.seed_instance(seed)
+        self.random.seed(seed)
+
+    async def start(self):
+        """
+        在后台预先生成各类数据
+        :return:
+        """
+        self._closed = False
+        if self._seed is None:
+            for kind in _PROVIDERS:
+                self._refill(kind)
+
+    async def close(self):
+        """
+        停止后台补充，关闭后台线程；之后取值时同步生成
+        :return:
+        """
+        self._closed = True
+        self._generation += 1
+        self._refilling.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _generate(self, faker: Faker, kind: str, number: int) -> list:
+        provider = _PROVIDERS[kind]
+        return [provider(faker) for _ in range(number)]
+
+    def pop(self, kind: str):
+        """
+        取一个数据
+        :param kind: _PROVIDERS中的类型
+        :return:
+        """
+        values = self._values[kind]
+        if not values:
+            values.extend(self._generate(self.faker, kind, self.batch_size))
+        value = values.popleft()
+        if len(values) < self.low_water and self._seed is None:
+            self._refill(kind)
+        return value
+
+    def _refill(self, kind: str):
+        """
+        在后台线程生成一批数据，完成后在事件循环中加入队列
+        """
+        if kind in self._refilling or self._closed:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        if self._executor is None:
+            # 后台线程使用独立的Faker，只有一个线程，不与取值共用
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='faker_pool')
+            self._refill_faker = Faker(locale='zh_CN')
+
+        generation = self._generation
+        self._refilling.add(kind)
+        future = loop.run_in_executor(self._executor, self._generate, self._refill_faker, kind, self.batch_size)
+
+        def _done(f: asyncio.Future):
+            if generation != self._generation:
+                return
+            self._refilling.discard(kind)
+            if not f.cancelled() and f.exception() is None:
+                self._values[kind].extend(f.result())
+
+        future.add_done_callback(_done)
+
+
+FAKER_POOL = FakerPool(
+    batch_size=setting['faker_pool']['batch_size'],
+    low_water=setting['faker_pool']['low_water'],
+    seed=setting['faker_pool'].get('seed'),
+)
 
 
 class FakerData:
+    """
+    假数据，从FAKER_POOL取值，创建实例没有额外开销
+    """
 
-    def __init__(self, *_):
-        self._faker = Faker(locale='zh_CN')
+    def __init__(self, *_, pool: FakerPool = None):
+        """
+        :param pool: 使用独立的假数据池，不传时使用FAKER_POOL
+        """
+        self._pool = pool or FAKER_POOL
+        self._func_dict = {
+            'name': self._name,
+            'ssn': self._ssn,
+            'phone_number': self._phone_number,
+            'credit_card_number': self._credit_card_number,
+            'city': self._city,
+            'address': self._address,
+            'random_int': self._random_int,
+            'random_lower': self._random_lower,
+            'random_upper': self._random_upper,
+            'random_letter': self._random_letter,
+            'random_cn': self._random_cn,
+            'compute': self._compute,
+            'time_int': self._time_int,
+            'time_str': self._time_str,
+        }
 
     def _name(self, *_) -> str:
-        return self._faker.name_female()
+        return self._pool.pop('name')
 
     def _ssn(self, *_) -> int:
-        return self._faker.ssn(min_age=18, max_age=50)
+        return self._pool.pop('ssn')
 
     def _phone_number(self, *_) -> int:
-        return self._faker.phone_number()
+        return self._pool.pop('phone_number')
 
     def _credit_card_number(self, *_) -> int:
-        return self._faker.credit_card_number()
+        return self._pool.pop('credit_card_number')
 
     def _city(self, *_) -> str:
-        return self._faker.city()
+        return self._pool.pop('city')
 
     def _address(self, *_) -> str:
-        return self._faker.address()[:-7]
+        return self._pool.pop('address')
 
-    @staticmethod
-    def _random_int(*args) -> int:
+    def _random_int(self, *args) -> int:
         length = int(args[0]) if int(args[0]) <= 20 else 20
         i = [str(x) for x in range(1, 9)]
-        return int(''.join(random.sample(i, length)))
+        return int(''.join(self._pool.random.sample(i, length)))
 
     @staticmethod
     def _time_int(*args) -> int:
@@ -71,33 +226,25 @@ class FakerData:
     def _time_str(self, *args) -> str:
         return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._time_int(args[0]) // 1000))
 
-    @staticmethod
-    def _random_lower(*args) -> str:
+    def _random_lower(self, *args) -> str:
         length = int(args[0]) if int(args[0]) <= 20 else 20
-        return ''.join(random.sample(string.ascii_lowercase, length))
+        return ''.join(self._pool.random.sample(string.ascii_lowercase, length))
 
-    @staticmethod
-    def _random_upper(*args) -> str:
+    def _random_upper(self, *args) -> str:
         length = int(args[0]) if int(args[0]) <= 20 else 20
-        return ''.join(random.sample(string.ascii_uppercase, length))
+        return ''.join(self._pool.random.sample(string.ascii_uppercase, length))
 
-    @staticmethod
-    def _random_letter(*args) -> str:
+    def _random_letter(self, *args) -> str:
         length = int(args[0]) if int(args[0]) <= 20 else 20
-        return ''.join(random.sample(string.ascii_letters, length))
+        return ''.join(self._pool.random.sample(string.ascii_letters, length))
 
-    @staticmethod
-    def _random_cn(*args) -> str:
+    def _random_cn(self, *args) -> str:
         length = int(args[0]) if int(args[0]) <= 20 else 20
-        cn = [chr(random.randint(0x4e00, 0x9fbf)) for _ in range(100)]
-        return ''.join(random.sample(cn, length))
+        return ''.join(chr(self._pool.random.randint(0x4e00, 0x9fbf)) for _ in range(length))
 
     @staticmethod
     def _compute(*args) -> (int, float, str):
-        try:
-            return round(eval(args[0]), 6)
-        except SyntaxError:
-            return args[0]
+        return compute(args[0])
 
     def faker_data(self, func: str, param: (int, str)) -> (str, int):
         """
@@ -105,24 +252,8 @@ class FakerData:
         :param param:
         :return:
         """
-        func_dict = {
-            'name': self._name,
-            'ssn': self._ssn,
-            'phone_number': self._phone_number,
-            'credit_card_number': self._credit_card_number,
-            'city': self._city,
-            'address': self._address,
-            'random_int': self._random_int,
-            'random_lower': self._random_lower,
-            'random_upper': self._random_upper,
-            'random_letter': self._random_letter,
-            'random_cn': self._random_cn,
-            'compute': self._compute,
-            'time_int': self._time_int,
-            'time_str': self._time_str,
-        }
-        if func_dict.get(func):
-            return func_dict[func](param)
+        if self._func_dict.get(func):
+            return self._func_dict[func](param)
 
 
 if __name__ == '__main__':
@@ -8,7 +8,7 @@
 """
 
 import re
-import jsonpath
+from tools.json_path import jsonpath_extract
 from typing import Any
 from apps.case_service import schemas
 
@@ -188,8 +188,8 @@ class ExtractParamsPath:
         new_path_list = []
         for key_ in key_list:
 
-            value_list = jsonpath.jsonpath(response, f"$..{key_}")
-            path_list = jsonpath.jsonpath(response, f"$..{key_}", result_type='IPATH')
+            value_list = jsonpath_extract(response, f"$..{key_}")
+            path_list = jsonpath_extract(response, f"$..{key_}", result_type='IPATH')
 
             for k, v in zip(value_list, path_list):
                 if ext_type == schemas.ExtType.equal:
@@ -224,7 +224,7 @@ class ExtractParamsPath:
         :param path:
         :return:
         """
-        json_path = jsonpath.jsonpath(response, f"$..{extract_contents}", result_type='IPATH')
+        json_path = jsonpath_extract(response, f"$..{extract_contents}", result_type='IPATH')
         if json_path:
             return [{
                 'jsonpath': "{{" + f"{number}.{'$' if rep_type == 'response' else 'h$'}.{'.'.join(x)}" + "}}",
@@ -272,13 +272,13 @@ class RepData:
             number, json_path = bb.split('.', 1)
 
             if type_ == 'params':
-                old_data = jsonpath.jsonpath(case_data[int(number)].params, f"{json_path}")
+                old_data = jsonpath_extract(case_data[int(number)].params, f"{json_path}")
                 data['old_data'] = old_data[0] if len(old_data) > 0 else False
             elif type_ == 'headers':
-                old_data = jsonpath.jsonpath(case_data[int(number)].headers, f"{json_path}")
+                old_data = jsonpath_extract(case_data[int(number)].headers, f"{json_path}")
                 data['old_data'] = old_data[0] if len(old_data) > 0 else False
             else:
-                old_data = jsonpath.jsonpath(case_data[int(number)].data, f"{json_path}")
+                old_data = jsonpath_extract(case_data[int(number)].data, f"{json_path}")
                 data['old_data'] = old_data[0] if len(old_data) > 0 else False
             data['new_data'] = new_str
             data['number'] = int(number)
@@ -0,0 +1,111 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：hash_diff.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/21 10:20
+"""
+
+import os
+import json
+import math
+import hashlib
+from typing import Any
+
+
+class HashNode:
+    """
+    数据的哈希树节点：dict、list的哈希由子节点的哈希计算，两个节点哈希相同时整个子树相同
+    """
+
+    __slots__ = ('digest', 'children')
+
+    def __init__(self, digest: bytes, children=None):
+        self.digest = digest
+        self.children = children
+
+
+def hash_tree(data: Any) -> HashNode:
+    """
+    自底向上计算哈希树，每个节点只计算一次
+    :param data: json数据
+    :return:
+    """
+    if isinstance(data, dict):
+        children = {k: hash_tree(v) for k, v in data.items()}
+        h = hashlib.blake2b(b'd', digest_size=16)
+        for k in sorted(children, key=str):
+            h.update(json.dumps(k).encode('utf-8'))
+            h.update(children[k].digest)
+        return HashNode(h.digest(), children)
+
+    if isinstance(data, list):
+        children = [hash_tree(v) for v in data]
+        h = hashlib.blake2b(b'l', digest_size=16)
+        for x in children:
+            h.update(x.digest)
+        return HashNode(h.digest(), children)
+
+    return HashNode(hashlib.blake2b(_scalar(data), digest_size=16).digest())
+
+
+def _scalar(data: Any) -> bytes:
+    """
+    与==的比较结果一致：True、1、1.0的哈希相同；nan与任何值都不相等，每次生成不同的哈希
+    """
+    if isinstance(data, (bool, int, float)):
+        if isinstance(data, float):
+            if math.isnan(data):
+                return b'nan' + os.urandom(16)
+            if data.is_integer():
+                data = int(data)
+        return b'n' + repr(int(data) if isinstance(data, bool) else data).encode('utf-8')
+    return b's' + json.dumps(data).encode('utf-8')
+
+
+def _diff(old_node: HashNode, new_node: HashNode, old_data, new_data, path: str, results: dict):
+    if old_node.digest == new_node.digest:
+        return
+
+    if isinstance(new_data, dict) and isinstance(old_data, dict):
+        for key in new_data:
+            if key not in old_data:
+                results['added'].append({'path': f'{path}{key}', 'value': new_data[key], 'replace': False})
+        for key in old_data:
+            if key not in new_data:
+                results['removed'].append({'path': f'{path}{key}', 'value': old_data[key], 'replace': False})
+        for key in new_data:
+            if key in old_data:
+                _diff(
+                    old_node.children[key], new_node.children[key],
+                    old_data[key], new_data[key], f'{path}{key}.', results
+                )
+
+    elif isinstance(new_data, list) and isinstance(old_data, list):
+        common = min(len(new_data), len(old_data))
+        for i in range(common):
+            _diff(old_node.children[i], new_node.children[i], old_data[i], new_data[i], f'{path}[{i}].', results)
+        for i in range(common, len(new_data)):
+            results['added'].append({'path': f'{path}[{i}]', 'value': new_data[i], 'replace': False})
+        for i in range(common, len(old_data)):
+            results['removed'].append({'path': f'{path}[{i}]', 'value': old_data[i], 'replace': False})
+
+    else:
+        results['value_changed'].append(
+            {'path': path[:-1], 'old_value': old_data, 'new_value': new_data, 'replace': False}
+        )
+
+
+def hash_diff(old_data: Any, new_data: Any) -> dict:
+    """
+    比较两个数据的差异，结果格式、值相等的判断与compare_data一致，同一类差异中的顺序可能不同
+    先计算两边的哈希树，对比时哈希相同的子树直接跳过，不再逐个比较
+    :param old_data:
+    :param new_data:
+    :return: {'added': [], 'removed': [], 'value_changed': [], 'key_changed': []}
+    """
+    results = {'added': [], 'removed': [], 'value_changed': [], 'key_changed': []}
+    _diff(hash_tree(old_data), hash_tree(new_data), old_data, new_data, '', results)
+    return results
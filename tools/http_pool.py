@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+@File    ：http_pool.py
+@IDE     ：PyCharm
+@Author  ：Kobayasi
+@Date    ：2024/5/6 10:12
+"""
+
+import asyncio
+import aiohttp
+from tools.read_setting import setting
+from tools.global_log import logger
+
+# 全局共享的连接池，随app启动创建、关闭时释放；记录创建时的事件循环，事件循环变化后重新创建
+_CONNECTOR = None
+_LOOP = None
+_CLOSING = set()
+
+
+async def _close_connector(connector: aiohttp.TCPConnector):
+    try:
+        await connector.close()
+    except Exception as e:
+        logger.warning(f"关闭旧的连接池失败: {e}")
+
+
+def _close_stale(connector: aiohttp.TCPConnector, loop: asyncio.AbstractEventLoop):
+    """
+    关闭其他事件循环中创建的连接池：原事件循环还在运行时在原事件循环中关闭，否则在当前事件循环中关闭
+    :param connector:
+    :param loop:
+    :return:
+    """
+    if loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(_close_connector(connector), loop)
+        return
+
+    task = asyncio.get_running_loop().create_task(_close_connector(connector))
+    _CLOSING.add(task)
+    task.add_done_callback(_CLOSING.discard)
+
+
+def _get_connector() -> aiohttp.TCPConnector:
+    """
+    获取共享的连接池，不存在时创建：总连接数限制、单host连接数限制、DNS缓存
+    需要在事件循环中调用
+    :return:
+    """
+    global _CONNECTOR, _LOOP
+    loop = asyncio.get_running_loop()
+    if _CONNECTOR is None or _CONNECTOR.closed or _LOOP is not loop:
+        if _CONNECTOR is not None and not _CONNECTOR.closed:
+            _close_stale(_CONNECTOR, _LOOP)
+        _CONNECTOR = aiohttp.TCPConnector(
+            limit=setting['http_pool']['limit'],
+            limit_per_host=setting['http_pool']['limit_per_host'],
+            ttl_dns_cache=setting['http_pool']['ttl_dns_cache'],
+            use_dns_cache=True,
+        )
+        _LOOP = loop
+    return _CONNECTOR
+
+
+async def start_http_pool() -> aiohttp.TCPConnector:
+    """
+    创建共享的连接池
+    :return:
+    """
+    return _get_connector()
+
+
+async def close_http_pool():
+    """
+    关闭共享的连接池
+    :return:
+    """
+    global _CONNECTOR, _LOOP
+    if _CONNECTOR is not None and not _CONNECTOR.closed:
+        if _LOOP is asyncio.get_running_loop():
+            await _CONNECTOR.close()
+        else:
+            _close_stale(_CONNECTOR, _LOOP)
+    _CONNECTOR, _LOOP = None, None
+    if _CLOSING:
+        await asyncio.gather(*_CLOSING, return_exceptions=True)
+
+
+def http_session(total: float = None) -> aiohttp.ClientSession:
+    """
+    基于共享连接池创建会话
+    会话只持有自己的cookie，关闭会话不会关闭连接池，keep-alive的连接可以被其他用例复用
+    :param total: 超时时间
+    :return:
+    """
+    return aiohttp.ClientSession(
+        connector=_get_connector(),
+        connector_owner=False,
+        timeout=aiohttp.ClientTimeout(total=total) if total else aiohttp.client.DEFAULT_TIMEOUT,
+    )
@@ -0,0 +1,171 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+@Author: Kobayasi
+@File: json_path.py
+@Time: 2024/5/11-10:20
+"""
+
+import re
+import functools
+import jsonpath
+from typing import Any, List, Optional, Tuple, Union
+
+# 表达式的步骤
+_KEY, _ANY, _DESCENDANT = 0, 1, 2
+
+_SLICE = re.compile(r'(-?[0-9]*):(-?[0-9]*):?(-?[0-9]*)$')
+
+
+def _normalize(expr: str) -> str:
+    """
+    整理表达式，与jsonpath包的解析规则一致：$.a['b'][0]..c -> $;a;b;0;..;c
+    :param expr:
+    :return:
+    """
+    sub_list = []
+
+    def _hold(m):
+        sub_list.append(m.group(1))
+        return f"[#{len(sub_list) - 1}]"
+
+    expr = re.sub(r"[\['](\??\(.*?\))[\]']", _hold, expr)
+    expr = re.sub(r"'?(?<!@)\.'?|\['?", ";", expr)
+    expr = re.sub(r";;;|;;", ";..;", expr)
+    expr = re.sub(r";$|'?\]|'$", "", expr)
+    return re.sub(r"#([0-9]+)", lambda m: sub_list[int(m.group(1))], expr)
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_path(expr: str) -> Optional[Tuple[Tuple[int, Any], ...]]:
+    """
+    编译表达式并缓存
+    只处理平台使用的语法：key、下标、*、..，过滤、切片、多选等语法返回None，交给jsonpath包处理
+    :param expr:
+    :return:
+    """
+    expr = _normalize(expr)
+    if expr.startswith('$;'):
+        expr = expr[2:]
+
+    loc_list = expr.split(';') if expr else []
+    if len(loc_list) > 1 and not loc_list[-1]:
+        loc_list.pop()
+
+    steps = []
+    for loc in loc_list:
+        if loc == '*':
+            steps.append((_ANY, None))
+        elif loc == '..':
+            steps.append((_DESCENDANT, None))
+        elif loc == '!' or ',' in loc or _SLICE.match(loc) or (loc.startswith(('(', '?(')) and loc.endswith(')')):
+            return None
+        else:
+            steps.append((_KEY, (loc, int(loc) if loc.isdigit() else None)))
+
+    return tuple(steps)
+
+
+def _children(obj):
+    if isinstance(obj, list):
+        return enumerate(obj)
+    if isinstance(obj, dict):
+        return obj.items()
+    return ()
+
+
+def _trace(steps: tuple, index: int, obj, path: tuple, result: list):
+    """
+    按步骤遍历数据，命中的(路径, 值)写入result
+    """
+    while index < len(steps):
+        step, arg = steps[index]
+        index += 1
+
+        if step == _KEY:
+            key, number = arg
+            if isinstance(obj, dict) and key in obj:
+                obj, path = obj[key], path + (key,)
+            elif isinstance(obj, list) and number is not None and number < len(obj):
+                obj, path = obj[number], path + (key,)
+            else:
+                return
+            continue
+
+        if step == _ANY:
+            for key, value in _children(obj):
+                _trace(steps, index, value, path + (str(key),), result)
+            return
+
+        # ..: 当前节点和所有子孙节点都继续匹配后面的步骤
+        _trace(steps, index, obj, path, result)
+        for key, value in _children(obj):
+            _trace(steps, index - 1, value, path + (str(key),), result)
+        return
+
+    result.append((path, obj))
+
+
+def jsonpath_extract(obj, expr: str, result_type: str = 'VALUE') -> Union[List[Any], bool]:
+    """
+    提取数据，返回值与jsonpath.jsonpath一致，没有结果时返回False
+    :param obj: 数据
+    :param expr: jsonpath表达式
+    :param result_type: VALUE 值，IPATH 路径列表，PATH 路径字符串
+    :return:
+    """
+    if not expr or not obj:
+        return False
+
+    steps = compile_path(expr)
+    if steps is None:
+        return jsonpath.jsonpath(obj, expr, result_type=result_type)
+
+    result = []
+    _trace(steps, 0, obj, (), result)
+    if not result:
+        return False
+
+    if result_type == 'VALUE':
+        return [x for _, x in result]
+    if result_type == 'IPATH':
+        return [list(x) for x, _ in result]
+    return ['$' + ''.join(f"[{x}]" if x.isdigit() else f"['{x}']" for x in p) for p, _ in result]
+
+
+def jsonpath_first(obj, keys: List[str]) -> dict:
+    """
+    一次遍历提取多个$..key的第一个结果，与jsonpath_extract(obj, f'$..{key}')[0]一致，没有结果时为False
+    遍历顺序与$..key相同，所有key都命中后停止遍历；不是单个key的表达式单独提取
+    :param obj: 数据
+    :param keys: key列表
+    :return: {key: value}
+    """
+    result, pending = {}, {}
+    for key in keys:
+        steps = compile_path(f'$..{key}') if key else None
+        if steps and len(steps) == 2 and steps[0][0] == _DESCENDANT and steps[1][0] == _KEY:
+            pending[key] = steps[1][1]
+        else:
+            value = jsonpath_extract(obj, f'$..{key}')
+            result[key] = value[0] if value else value
+
+    stack = [obj] if obj else []
+    while stack and pending:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, (loc, _) in list(pending.items()):
+                if loc in node:
+                    result[key] = node[loc]
+                    del pending[key]
+            stack.extend(reversed(node.values()))
+        elif isinstance(node, list):
+            for key, (_, number) in list(pending.items()):
+                if number is not None and number < len(node):
+                    result[key] = node[number]
+                    del pending[key]
+            stack.extend(reversed(node))
+
+    result.update({k: False for k in pending})
+    return {k: result[k] for k in keys}
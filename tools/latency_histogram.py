@@ -0,0 +1,161 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+@Author: Kobayasi
+@File: latency_histogram.py
+@Time: 2024/5/14-10:05
+"""
+
+import sys
+import zlib
+import struct
+from array import array
+
+# 精度：2位有效数字；记录单位：微秒；最大记录值：1小时
+_SUB_BUCKET_COUNT = 256
+_SUB_BUCKET_HALF_COUNT = _SUB_BUCKET_COUNT // 2
+_SUB_BUCKET_HALF_MAGNITUDE = 7
+_SUB_BUCKET_MASK = _SUB_BUCKET_COUNT - 1
+_HIGHEST_VALUE = 3600 * 1000 * 1000
+_BUCKET_COUNT = 26
+_COUNTS_LEN = (_BUCKET_COUNT + 1) * _SUB_BUCKET_HALF_COUNT
+
+# 序列化格式：版本、总数、最小值、最大值、总和(微秒)，后面是zlib压缩的计数数组
+_HEADER = struct.Struct('<BQQQQ')
+_VERSION = 1
+
+
+class LatencyHistogram:
+    """
+    固定内存的耗时直方图（HDR结构：对数分桶 + 桶内线性分段），相对误差小于1%
+    同结构的直方图可以直接合并，按数组存储
+    """
+
+    __slots__ = ('counts', 'total', 'min_value', 'max_value', 'sum_value')
+
+    def __init__(self):
+        self.counts = array('q', bytes(8 * _COUNTS_LEN))
+        self.total = 0
+        self.min_value = 0
+        self.max_value = 0
+        self.sum_value = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        bucket = max((value | _SUB_BUCKET_MASK).bit_length() - (_SUB_BUCKET_HALF_MAGNITUDE + 1), 0)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << _SUB_BUCKET_HALF_MAGNITUDE) + sub_bucket - _SUB_BUCKET_HALF_COUNT
+
+    @staticmethod
+    def _highest_value(index: int) -> int:
+        """
+        下标对应区间的最大值
+        """
+        bucket = (index >> _SUB_BUCKET_HALF_MAGNITUDE) - 1
+        sub_bucket = (index & (_SUB_BUCKET_HALF_COUNT - 1)) + _SUB_BUCKET_HALF_COUNT
+        if bucket < 0:
+            sub_bucket -= _SUB_BUCKET_HALF_COUNT
+            bucket = 0
+        return ((sub_bucket + 1) << bucket) - 1
+
+    def record(self, seconds: float, count: int = 1):
+        """
+        记录耗时
+        :param seconds: 耗时(秒)
+        :param count: 次数
+        :return:
+        """
+        value = min(max(int(seconds * 1000000), 0), _HIGHEST_VALUE)
+        self.counts[self._index(value)] += count
+        if not self.total or value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+        self.total += count
+        self.sum_value += value * count
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """
+        合并另一个直方图
+        :param other:
+        :return:
+        """
+        if not other.total:
+            return self
+        counts = self.counts
+        for i, x in enumerate(other.counts):
+            if x:
+                counts[i] += x
+        self.min_value = other.min_value if not self.total else min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self.total += other.total
+        self.sum_value += other.sum_value
+        return self
+
+    def percentile(self, percent: float) -> float:
+        """
+        百分位耗时
+        :param percent: 0-100
+        :return: 秒
+        """
+        if not self.total:
+            return 0.0
+        target = max(int(self.total * percent / 100 + 0.999999), 1)
+        current = 0
+        for i, x in enumerate(self.counts):
+            if not x:
+                continue
+            current += x
+            if current >= target:
+                return min(self._highest_value(i), self.max_value) / 1000000
+        return self.max_value / 1000000
+
+    def summary(self) -> dict:
+        """
+        统计信息
+        :return:
+        """
+        return {
+            'count': self.total,
+            'min_time': self.min_value / 1000000,
+            'max_time': self.max_value / 1000000,
+            'avg_time': self.sum_value / self.total / 1000000 if self.total else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9),
+        }
+
+    def to_bytes(self) -> bytes:
+        """
+        序列化：头信息 + 压缩后的计数数组
+        :return:
+        """
+        counts = self.counts
+        if sys.byteorder != 'little':
+            counts = array('q', counts)
+            counts.byteswap()
+        return _HEADER.pack(
+            _VERSION, self.total, self.min_value, self.max_value, self.sum_value
+        ) + zlib.compress(counts.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'LatencyHistogram':
+        """
+        反序列化
+        :param data:
+        :return:
+        """
+        histogram = cls()
+        if not data:
+            return histogram
+        version, histogram.total, histogram.min_value, histogram.max_value, histogram.sum_value = _HEADER.unpack_from(
+            data
+        )
+        if version != _VERSION:
+            raise ValueError(f'不支持的直方图版本: {version}')
+        histogram.counts = array('q', zlib.decompress(data[_HEADER.size:]))
+        if sys.byteorder != 'little':
+            histogram.counts.byteswap()
+        return histogram
@@ -8,26 +8,157 @@
 """
 
 # from tools import logger
+import time
+import asyncio
 import aiomysql.sa as aio_sa
+from tools.read_setting import setting
+
+
+class MySqlPool:
+    """
+    数据库连接池缓存
+    按数据库配置复用连接池，空闲超过idle_timeout的连接池会被关闭
+    """
+
+    def __init__(self, minsize: int, maxsize: int, pool_recycle: int, idle_timeout: int):
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.pool_recycle = pool_recycle
+        self.idle_timeout = idle_timeout
+        self._engines = {}  # key: [engine, 最后使用时间, 使用中的数量]
+        self._lock = None
+        self._task = None
+
+    @staticmethod
+    def _key(kwargs: dict) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in kwargs.items()))
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            # 事件循环变化后，旧的连接池不能再使用
+            self._engines = {}
+            self._lock = asyncio.Lock()
+            self._task = loop.create_task(self._evict())
+
+    async def start(self):
+        """
+        启动空闲连接池的回收任务
+        :return:
+        """
+        self._start()
+
+    async def acquire(self, kwargs: dict):
+        """
+        获取连接
+        :param kwargs: 数据库配置
+        :return:
+        """
+        self._start()
+        key = self._key(kwargs)
+        async with self._lock:
+            if key not in self._engines:
+                engine = await aio_sa.create_engine(
+                    minsize=self.minsize,
+                    maxsize=self.maxsize,
+                    pool_recycle=self.pool_recycle,
+                    **kwargs
+                )
+                self._engines[key] = [engine, time.monotonic(), 0]
+
+        item = self._engines[key]
+        item[2] += 1
+        try:
+            return key, await item[0].acquire()
+        except Exception:
+            self._done(key)
+            raise
+
+    async def release(self, key: tuple, conn):
+        """
+        归还连接
+        :param key:
+        :param conn:
+        :return:
+        """
+        try:
+            await conn.close()
+        finally:
+            self._done(key)
+
+    def _done(self, key: tuple):
+        item = self._engines.get(key)
+        if item:
+            item[1] = time.monotonic()
+            item[2] -= 1
+
+    async def _close(self, keys: list):
+        for key in keys:
+            engine = self._engines.pop(key)[0]
+            engine.close()
+            await engine.wait_closed()
+
+    async def _evict(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1))
+            now = time.monotonic()
+            async with self._lock:
+                await self._close([
+                    k for k, (_, last, using) in self._engines.items() if not using and now - last > self.idle_timeout
+                ])
+
+    async def close(self):
+        """
+        关闭所有连接池
+        :return:
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._close(list(self._engines))
+
+
+MYSQL_POOL = MySqlPool(
+    minsize=setting['mysql_pool']['minsize'],
+    maxsize=setting['mysql_pool']['maxsize'],
+    pool_recycle=setting['mysql_pool']['pool_recycle'],
+    idle_timeout=setting['mysql_pool']['idle_timeout'],
+)
 
 
 class AsyncMySql:
 
-    def __init__(self, kwargs):
+    def __init__(self, kwargs, pool: bool = False):
         """
         数据库上下文关联器
         :param kwargs:
+        :param pool: 使用共享的连接池，退出时只归还连接
         """
         self.kwargs = kwargs
+        self.pool = pool
         self.engine = None
         self.conn = None
+        self._key = None
 
     async def __aenter__(self):
+        if self.pool:
+            self._key, self.conn = await MYSQL_POOL.acquire(self.kwargs)
+            return self
+
         self.engine = await aio_sa.create_engine(**self.kwargs)
         self.conn = await self.engine.acquire()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.pool:
+            await MYSQL_POOL.release(self._key, self.conn)
+            return
+
         await self.conn.close()
         self.engine.close()
 
@@ -0,0 +1,58 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+@Author: Kobayasi
+@File: payload_codec.py
+@Time: 2024/5/19-10:30
+"""
+
+import json
+import zlib
+import struct
+from typing import Any
+
+# 头信息：标识、版本、压缩方式、压缩前的长度
+_HEADER = struct.Struct('<2sBBI')
+_MAGIC = b'PZ'
+_VERSION = 1
+CODEC_ZLIB = 1
+
+
+def compress_json(data: Any, level: int = 6) -> bytes:
+    """
+    序列化为json后压缩
+    :param data:
+    :param level: zlib压缩等级
+    :return:
+    """
+    raw = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    return compress_bytes(raw, level=level)
+
+
+def compress_bytes(raw: bytes, level: int = 6) -> bytes:
+    """
+    压缩已经序列化的json
+    :param raw:
+    :param level:
+    :return:
+    """
+    return _HEADER.pack(_MAGIC, _VERSION, CODEC_ZLIB, len(raw)) + zlib.compress(raw, level)
+
+
+def decompress_json(blob: bytes) -> Any:
+    """
+    解压并反序列化
+    :param blob:
+    :return:
+    """
+    magic, version, codec, length = _HEADER.unpack_from(blob)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError('不支持的压缩数据')
+    if codec != CODEC_ZLIB:
+        raise ValueError(f'不支持的压缩方式: {codec}')
+
+    raw = zlib.decompress(blob[_HEADER.size:])
+    if len(raw) != length:
+        raise ValueError('压缩数据不完整')
+    return json.loads(raw)
@@ -42,6 +42,36 @@ def read_yaml() -> dict:
         if not conf['sqlite']:
             conf['sqlite'] = 'sqlite+aiosqlite3:///./sqlite/auto_test.sqlite3'
 
+        if not conf.get('http_pool'):
+            conf['http_pool'] = {'limit': 100, 'limit_per_host': 20, 'ttl_dns_cache': 300}
+
+        if not conf.get('scheduler'):
+            conf['scheduler'] = {'concurrency': 20, 'host_concurrency': 10}
+
+        if not conf.get('report_writer'):
+            conf['report_writer'] = {'maxsize': 100, 'batch_size': 50}
+
+        if not conf.get('mysql_pool'):
+            conf['mysql_pool'] = {'minsize': 1, 'maxsize': 10, 'pool_recycle': 3600, 'idle_timeout': 300}
+
+        if not conf.get('faker_pool'):
+            conf['faker_pool'] = {'batch_size': 200, 'low_water': 50, 'seed': None}
+
+        if not conf.get('report_compress'):
+            conf['report_compress'] = {'threshold': 4096, 'level': 6}
+
+        if not conf.get('report_blob'):
+            conf['report_blob'] = {'min_size': 256}
+
+        if not conf.get('report_retention'):
+            conf['report_retention'] = {'keep_runs': None, 'keep_days': None, 'interval': 3600, 'batch_size': 1000}
+
+        if not conf.get('report_diff'):
+            conf['report_diff'] = {'cache_size': 128}
+
+        if not conf.get('delete_job'):
+            conf['delete_job'] = {'report_threshold': 100}
+
     except KeyError:
         raise KeyError('配置文件读取错误，请检查 setting.yaml')
 
@@ -8,13 +8,15 @@
 """
 
 import re
-import jsonpath
+import functools
+from tools.json_path import jsonpath_extract
 from aiohttp import FormData
-from typing import List
+from typing import NamedTuple
 from tools.faker_data import FakerData
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.whole_conf import crud as conf_crud
+from apps.whole_conf.tool import CustomizeMap
 
 COUNT = ['+', '-', '*', '/', '//', '%']
 
@@ -38,6 +40,8 @@ async def replace_params_data(
             return [await handle_value(x) for x in data_json]
 
         if isinstance(data_json, str):
+            if _plain(data_json):
+                return data_json
             return await header_srt(
                 db=db,
                 x=data_json,
@@ -57,6 +61,9 @@ async def replace_params_data(
 
         for key in data_json.keys():
             if isinstance(data_json[key], str):
+                if _plain(data_json[key]):
+                    target[key] = data_json[key]
+                    continue
                 target[key] = await header_srt(
                     db=db,
                     x=data_json[key],
@@ -77,6 +84,8 @@ async def replace_params_data(
                 for x in data_json[key]:
                     if isinstance(x, (list, dict)):
                         new_list.append(await handle_value(x))
+                    elif isinstance(x, str) and _plain(x):
+                        new_list.append(x)
                     elif isinstance(x, str):
                         new_list.append(await header_srt(
                             db=db,
@@ -137,6 +146,7 @@ async def header_srt(
 ):
     """
     处理数据
+    字符串按内容编译成替换计划并缓存，执行时只计算表达式的值，再和字面量片段拼接
     :param db:
     :param x:
     :param api_list:
@@ -147,70 +157,322 @@ async def header_srt(
     :param customize:
     :return:
     """
+    original = x
+
     # 接口上下级数据关联的参数提取
     if "{{" in x and "$" in x and "}}" in x:
-        replace_values: List[str] = re.compile(r'{{(.*?)}}', re.S).findall(x)
-        for replace in replace_values:
+        x = await _replace_param(x=x, api_list=api_list, value_type=value_type)
+
+    # 自定参数提取
+    if "%{{" in x and "}}" in x:
+        x = await _replace_customize(db=db, x=x, customize=customize, cache=x is original)
+
+    # 假数据提取
+    if isinstance(x, str) and "{" in x and "}" in x:
+        x = await _replace_func(
+            x=x,
+            faker=faker,
+            value_type=value_type,
+            code=code,
+            extract=extract,
+            cache=x is original
+        )
+
+    return x
+
+
+def _plain(x: str) -> bool:
+    """
+    没有任何表达式的字符串，不需要处理
+    """
+    return "{" not in x or "}" not in x
+
+
+class _Plan(NamedTuple):
+    """
+    字符串的替换计划：字面量片段 + 表达式
+    """
+    literals: tuple  # 表达式前后的字面量，比表达式多一个
+    keys: tuple  # 表达式的内容
+    matches: tuple  # 表达式的匹配对象，用于处理替换值中的转义
+    header: tuple  # 从每个表达式开始到结尾，是否包含h$
+    exact: bool  # 表达式中没有换行，逐个替换与一次性拼接的结果一致
+
+
+_SYNTAX = {
+    'param': re.compile(r'{{(.*?)}}', re.S),
+    'customize': re.compile(r'%{{(.*?)}}', re.S),
+    'func': re.compile(r'{(.*?)}', re.S),
+}
+
+
+def _compile(x: str, syntax: str) -> _Plan:
+    """
+    编译替换计划
+    :param x:
+    :param syntax:
+    :return:
+    """
+    matches = tuple(_SYNTAX[syntax].finditer(x))
+    ends = [0] + [m.end() for m in matches]
+    starts = [m.start() for m in matches] + [len(x)]
+    return _Plan(
+        literals=tuple(x[ends[i]:starts[i]] for i in range(len(starts))),
+        keys=tuple(m.group(1) for m in matches),
+        matches=matches,
+        header=tuple('h$' in x[m.start():] for m in matches),
+        exact=all('\n' not in m.group(0) for m in matches),
+    )
+
+
+# 按字符串内容缓存替换计划
+_compile_cache = functools.lru_cache(maxsize=4096)(_compile)
+
+
+def _repl(match: re.Match, value: str) -> str:
+    """
+    替换值按re.sub的规则处理转义
+    """
+    return match.expand(value) if '\\' in value else value
+
+
+def _inert(value: str, syntax: str) -> bool:
+    """
+    替换值不会产生新的表达式，可以直接拼接
+    """
+    if syntax == 'customize' and '%' in value:
+        return False
+    return '{' not in value and '}' not in value
+
+
+def _has_header(text: str, has: bool, last: str) -> (bool, str):
+    """
+    拼接片段后，已拼接的内容是否包含h$
+    """
+    if not text:
+        return has, last
+    return has or 'h$' in text or (last == 'h' and text[0] == '$'), text[-1]
+
+
+async def _replace_param(x: str, api_list: list, value_type: str = None):
+    """
+    接口上下级数据关联的参数提取
+    """
+    plan = _compile_cache(x, 'param')
+    if not plan.exact:
+        return await _param_one_by_one(x=x, replace_values=plan.keys, api_list=api_list, value_type=value_type)
+
+    parts, has, last = [], False, ''
+    for i, replace in enumerate(plan.keys):
+        parts.append(plan.literals[i])
+        has, last = _has_header(plan.literals[i], has, last)
+        try:
+            new_value = await _header_str_param(x=replace, api_list=api_list, is_header=has or plan.header[i])
+        except IndexError:
+            new_value = ''
+
+        if value_type == 'url' or isinstance(new_value, (str, float, int)):
+            value = _repl(plan.matches[i], str(new_value))
+            if _inert(value, 'param'):
+                parts.append(value)
+                has, last = _has_header(value, has, last)
+                continue
+
+        # 替换值会影响后面表达式的匹配，剩下的逐个替换
+        return await _param_one_by_one(
+            x=''.join(parts) + x[plan.matches[i].start():],
+            replace_values=plan.keys[i:],
+            api_list=api_list,
+            value_type=value_type,
+            values=(new_value,)
+        )
+
+    parts.append(plan.literals[-1])
+    return ''.join(parts)
+
+
+async def _param_one_by_one(x: str, replace_values: tuple, api_list: list, value_type: str = None, values=()):
+    """
+    逐个替换接口上下级数据关联的参数
+    :param values: 已经计算过的替换值
+    """
+    for i, replace in enumerate(replace_values):
+        if i < len(values):
+            new_value = values[i]
+        else:
             try:
-                # if 'h$' in x:
-                #     new_value = await _header_str_param(x=replace, response=response_headers)
-                # else:
-                #     new_value = await _header_str_param(x=replace, response=response)
                 is_header: bool = True if 'h$' in x else False
                 new_value = await _header_str_param(x=replace, api_list=api_list, is_header=is_header)
             except IndexError:
                 new_value = ''
 
-            if value_type == 'url':
-                x = re.sub("{{(.*?)}}", str(new_value), x, count=1)
-                continue
+        if value_type == 'url':
+            x = re.sub("{{(.*?)}}", str(new_value), x, count=1)
+            continue
 
-            if isinstance(new_value, (str, float, int)):
-                if isinstance(new_value, (float, int)) and [_ for _ in COUNT if _ in x]:
-                    x = re.sub("{{(.*?)}}", str(new_value), x, count=1)
-                else:
-                    x = re.sub("{{(.*?)}}", str(new_value), x, count=1)
-            else:
-                x = new_value
+        if isinstance(new_value, (str, float, int)):
+            x = re.sub("{{(.*?)}}", str(new_value), x, count=1)
+        else:
+            x = new_value
 
-    # 自定参数提取
-    if "%{{" in x and "}}" in x:
-        replace_key: List[str] = re.compile(r'%{{(.*?)}}', re.S).findall(x)
-        for key in replace_key:
-            value = customize.get(key, '_')
-            if value == '_':
-                customize_info = await conf_crud.get_customize(
-                    db=db,
-                    key=key
-                )
-                value = customize_info[0].value if customize_info else None
+    return x
 
-            if value_type == 'url':
-                x = re.sub("%{{(.*?)}}", str(value), x, count=1)
-            else:
-                x = re.sub("%{{(.*?)}}", str(value), x, count=1)
 
-    # 假数据提取
-    if isinstance(x, str) and "{" in x and "}" in x:
-        replace_values: List[str] = re.compile(r'{(.*?)}', re.S).findall(x)
-        for replace in replace_values:
-            if replace == 'get_code':
-                x = code
-            elif 'get_extract' in replace:
-                x = extract
-            else:
-                new_value = await _header_str_func(x=replace, faker=faker)
-                if new_value is None:
-                    return x
+async def _replace_customize(db: AsyncSession, x: str, customize: dict, cache: bool = True):
+    """
+    自定参数提取
+    """
+    plan = _compile_cache(x, 'customize') if cache else None
+    if plan is None or not plan.exact:
+        return await _customize_one_by_one(
+            db=db,
+            x=x,
+            replace_key=_SYNTAX['customize'].findall(x),
+            customize=customize
+        )
+
+    parts = []
+    for i, key in enumerate(plan.keys):
+        parts.append(plan.literals[i])
+        value = await _customize_value(db=db, key=key, customize=customize)
+        repl = _repl(plan.matches[i], str(value))
+        if _inert(repl, 'customize'):
+            parts.append(repl)
+            continue
+
+        # 替换值会影响后面表达式的匹配，剩下的逐个替换
+        return await _customize_one_by_one(
+            db=db,
+            x=''.join(parts) + x[plan.matches[i].start():],
+            replace_key=plan.keys[i:],
+            customize=customize,
+            values=(value,)
+        )
+
+    parts.append(plan.literals[-1])
+    return ''.join(parts)
+
 
-                if value_type == 'url':
-                    x = re.sub("{(.*?)}", str(new_value), x, count=1)
+async def _customize_one_by_one(db: AsyncSession, x: str, replace_key: list, customize: dict, values=()):
+    """
+    逐个替换自定参数
+    :param values: 已经计算过的替换值
+    """
+    for i, key in enumerate(replace_key):
+        value = values[i] if i < len(values) else await _customize_value(db=db, key=key, customize=customize)
+        x = re.sub("%{{(.*?)}}", str(value), x, count=1)
+
+    return x
+
+
+async def _customize_value(db: AsyncSession, key: str, customize: dict):
+    """
+    获取自定参数的值，环境配置中没有时从数据库查询；执行用例时传入的CustomizeMap已包含数据库中的参数
+    """
+    if isinstance(customize, CustomizeMap):
+        return customize.get(key)
+
+    value = customize.get(key, '_')
+    if value == '_':
+        customize_info = await conf_crud.get_customize(
+            db=db,
+            key=key
+        )
+        value = customize_info[0].value if customize_info else None
+
+    return value
+
+
+async def _replace_func(
+        x: str,
+        faker: FakerData,
+        value_type: str = None,
+        code: str = None,
+        extract: str = '',
+        cache: bool = True
+):
+    """
+    假数据提取
+    """
+    plan = _compile_cache(x, 'func') if cache else None
+    if plan is None or not plan.exact:
+        return await _func_one_by_one(
+            x=x,
+            replace_values=_SYNTAX['func'].findall(x),
+            faker=faker,
+            value_type=value_type,
+            code=code,
+            extract=extract
+        )
+
+    parts, length = [], 0
+    for i, replace in enumerate(plan.keys):
+        parts.append(plan.literals[i])
+        length += len(plan.literals[i])
+        values = ()
+        if replace != 'get_code' and 'get_extract' not in replace:
+            new_value = await _header_str_func(x=replace, faker=faker)
+            if new_value is None:
+                return ''.join(parts) + x[plan.matches[i].start():]
+
+            # 表达式不是整个字符串时，替换值直接拼接
+            if value_type == 'url' or len(replace) + 2 != length + len(x) - plan.matches[i].start():
+                value = _repl(plan.matches[i], str(new_value))
+                if _inert(value, 'func'):
+                    parts.append(value)
+                    length += len(value)
                     continue
+            elif i == len(plan.keys) - 1:
+                # 最后一个表达式就是整个字符串，直接返回替换值，保留原类型
+                return new_value
+            values = (new_value,)
+
+        # 整个字符串被替换，或替换值会影响后面表达式的匹配，剩下的逐个替换
+        return await _func_one_by_one(
+            x=''.join(parts) + x[plan.matches[i].start():],
+            replace_values=plan.keys[i:],
+            faker=faker,
+            value_type=value_type,
+            code=code,
+            extract=extract,
+            values=values
+        )
+
+    parts.append(plan.literals[-1])
+    return ''.join(parts)
+
+
+async def _func_one_by_one(
+        x: str,
+        replace_values: tuple,
+        faker: FakerData,
+        value_type: str = None,
+        code: str = None,
+        extract: str = '',
+        values=()
+):
+    """
+    逐个替换假数据
+    :param values: 已经计算过的替换值
+    """
+    for i, replace in enumerate(replace_values):
+        if replace == 'get_code':
+            x = code
+        elif 'get_extract' in replace:
+            x = extract
+        else:
+            new_value = values[i] if i < len(values) else await _header_str_func(x=replace, faker=faker)
+            if new_value is None:
+                return x
+
+            if value_type == 'url':
+                x = re.sub("{(.*?)}", str(new_value), x, count=1)
+                continue
 
-                if len(replace) + 2 == len(x):
-                    x = new_value
-                else:
-                    x = re.sub("{(.*?)}", str(new_value), x, count=1)
+            if len(replace) + 2 == len(x):
+                x = new_value
+            else:
+                x = re.sub("{(.*?)}", str(new_value), x, count=1)
 
     return x
 
@@ -266,7 +528,7 @@ async def _header_str_param(x: str, api_list: list, is_header: bool):
         else:
             return ''
 
-    value = jsonpath.jsonpath(
+    value = jsonpath_extract(
         api_list[
             int(num)
         ]['response_info'][-1]['headers'] if is_header else api_list[int(num)]['response_info'][-1]['response'],
@@ -300,23 +562,23 @@ async def _header_adjoin(seek_name: str, seek_value: str, compare: str, extract_
     :param response_data: 响应内容
     :return:
     """
-    path_list = jsonpath.jsonpath(response_data, f'$..{seek_name}', result_type='IPATH')
+    path_list = jsonpath_extract(response_data, f'$..{seek_name}', result_type='IPATH')
 
     if not path_list:
         return []
 
     value_list = []
     for path in path_list:
-        json_data = jsonpath.jsonpath(response_data, f"$.{'.'.join(path)}")
+        json_data = jsonpath_extract(response_data, f"$.{'.'.join(path)}")
         if compare == 'in' and json_data and seek_value in json_data[0]:
             path[-1] = extract_key
-            data = jsonpath.jsonpath(response_data, f"$.{'.'.join(path)}")
+            data = jsonpath_extract(response_data, f"$.{'.'.join(path)}")
             value_list.append(data[0] if data else None)
             continue
 
         if compare == '==' and json_data and seek_value == json_data[0]:
             path[-1] = extract_key
-            data = jsonpath.jsonpath(response_data, f"$.{'.'.join(path)}")
+            data = jsonpath_extract(response_data, f"$.{'.'.join(path)}")
             value_list.append(data[0] if data else None)
             continue
 